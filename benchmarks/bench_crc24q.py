@@ -0,0 +1,56 @@
+# Verify the table-driven CRC-24Q against the original bit-by-bit implementation,
+# then compare their speed.
+#
+# Usage: python benchmarks/bench_crc24q.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ubx_hla.checksums import crc24q, crc24q_update
+
+def crc24q_bitwise(data, crc=0):
+    """
+    The original Hla.csum_rtcm loop: 8 iterations per byte
+    """
+    for value in data:
+        crc ^= value << 16 # XOR-in incoming
+        for i in range(8):
+            crc <<= 1
+            if (crc & 0x1000000):
+                crc ^= 0x1864CFB # CRC-24Q
+        crc &= 0xFFFFFF
+    return crc
+
+def verify(trials=2000, seed=1):
+    rng = random.Random(seed)
+    for trial in range(trials):
+        data = bytes(rng.getrandbits(8) for i in range(rng.randint(0, 1100)))
+        seed_crc = rng.getrandbits(24) if trial % 2 else 0
+        expected = crc24q_bitwise(data, seed_crc)
+        # Whole chunk, bytes / bytearray / memoryview
+        assert crc24q(data, seed_crc) == expected, trial
+        assert crc24q(bytearray(data), seed_crc) == expected, trial
+        assert crc24q(memoryview(data), seed_crc) == expected, trial
+        # Split into two chunks
+        split = rng.randint(0, len(data))
+        assert crc24q(memoryview(data)[split:], crc24q(data[:split], seed_crc)) == expected, trial
+        # One byte at a time
+        crc = seed_crc
+        for value in data:
+            crc = crc24q_update(crc, value)
+        assert crc == expected, trial
+    print('CRC-24Q table matches the bitwise implementation on {} random inputs'.format(trials))
+
+def main():
+    verify()
+    data = bytes(random.Random(2).getrandbits(8) for i in range(100000))
+    for name, function in (('bitwise', crc24q_bitwise), ('table', crc24q)):
+        seconds = min(timeit.repeat(lambda: function(data), number=1, repeat=5))
+        print('{:<8} {:8.1f} ns/byte {:8.2f} MB/s'.format(name, seconds / len(data) * 1e9, len(data) / seconds / 1e6))
+
+if __name__ == '__main__':
+    main()
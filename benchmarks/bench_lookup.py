@@ -0,0 +1,77 @@
+# Microbenchmark: per-byte cost of finding the payload decoder for a UBX message
+#
+# Compares the list.index class/ID lookups which analyze_ubx used to make on every
+# payload byte with the reverse dictionaries and the per-message decoder dispatch.
+#
+# Usage: python benchmarks/bench_lookup.py
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ubx_hla.core import Decoder
+
+NAV_PVT = (0x01, 0x07)
+REPEAT = 200000
+
+class_key_list = list(Decoder.UBX_CLASS.keys())
+class_val_list = list(Decoder.UBX_CLASS.values())
+id_key_list = list(Decoder.UBX_ID.keys())
+id_val_list = list(Decoder.UBX_ID.values())
+
+def get_ubx_class_list(class_name):
+    if class_name in class_val_list:
+        return class_key_list[class_val_list.index(class_name)]
+    return None
+
+def get_ubx_class_and_id_list(class_name, id_name):
+    if (class_name, id_name) in id_val_list:
+        return id_key_list[id_val_list.index((class_name, id_name))]
+    return (None,None)
+
+def route_list(msg_class, msg_id):
+    # The comparisons analyze_ubx made for every NAV-PVT payload byte before it reached the PVT fields
+    for class_name in ("ACK", "CFG", "MON", "NAV"):
+        if msg_class == get_ubx_class_list(class_name):
+            break
+    for id_name in ("POSECEF", "POSLLH", "PVT"):
+        if (msg_class, msg_id) == get_ubx_class_and_id_list("NAV", id_name):
+            return id_name
+
+def ubx_message(msg_class, msg_id, payload):
+    body = bytes([msg_class, msg_id, len(payload) & 0xFF, len(payload) >> 8]) + payload
+    sum1 = sum2 = 0
+    for value in body:
+        sum1 = (sum1 + value) & 0xFF
+        sum2 = (sum2 + sum1) & 0xFF
+    return b'\xb5\x62' + body + bytes([sum1, sum2])
+
+
+def report(name, seconds, count):
+    print('{:<40} {:8.1f} ns/byte'.format(name, seconds / count * 1e9))
+
+def main():
+    decoder = Decoder()
+    decoder.msg_class, decoder.ID = NAV_PVT
+
+    report('list.index class/ID routing (before)',
+           timeit.timeit(lambda: route_list(*NAV_PVT), number=REPEAT), REPEAT)
+    report('get_ubx_class_and_id (dict)',
+           timeit.timeit(lambda: decoder.get_ubx_class_and_id("NAV", "PVT"), number=REPEAT), REPEAT)
+    # The dispatch lookup is made once per message, so its cost is shared by all 92 payload bytes
+    report('decoder dispatch (per message / 92)',
+           timeit.timeit(lambda: decoder.ubx_decoders.get(NAV_PVT, decoder.analyze_fields), number=REPEAT), REPEAT * 92)
+
+    frames = [('data', {'data': bytes([value])}, i, i + 1)
+              for i, value in enumerate(ubx_message(*NAV_PVT, bytes(range(92))) * 100)]
+    decode = decoder.decode_frame
+    def run():
+        for frame in frames:
+            decode(*frame)
+    report('Decoder.decode_frame, NAV-PVT stream',
+           min(timeit.repeat(run, number=1, repeat=5)), len(frames))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Memory benchmark: feed a multi-million byte stream through Decoder.decode_frame and
+# sample the resident set size as it goes. RSS should stay flat.
+#
+# The stream is back-to-back RTCM3 messages. A valid RTCM message returns the
+# state machine to looking_for_B5_dollar_D3 without a sync loss, which is the
+# traffic that used to grow the per-byte message string without limit.
+#
+# Usage: python benchmarks/bench_memory.py [megabytes]
+
+import os
+import random
+import resource
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ubx_hla.core import Decoder
+from ubx_hla.checksums import crc24q
+
+def rss_kb():
+    """
+    Current resident set size in kB (peak RSS if /proc is not available)
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def rtcm_message(msg_type, length, rng):
+    payload = bytes([msg_type >> 4, (msg_type & 0x0F) << 4]) + bytes(rng.getrandbits(8) for i in range(length - 2))
+    message = bytes([0xD3, length >> 8, length & 0xFF]) + payload
+    return message + crc24q(message).to_bytes(3, 'big')
+
+def frames(total_bytes):
+    rng = random.Random(1)
+    messages = [rtcm_message(msg_type, rng.randint(20, 600), rng) for msg_type in (1005, 1077, 1087, 1097, 1127)]
+    sent = 0
+    while sent < total_bytes:
+        for message in messages:
+            for value in message:
+                yield ('data', {'data': bytes([value])}, sent, sent + 1)
+                sent += 1
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    total_bytes = int(megabytes * 1000000)
+    decoder = Decoder()
+
+    sample_every = max(total_bytes // 10, 1)
+    print('{:>12} {:>10}'.format('bytes', 'RSS kB'))
+    for count, frame in enumerate(frames(total_bytes)):
+        decoder.decode_frame(*frame)
+        if count % sample_every == 0:
+            print('{:>12} {:>10}'.format(count, rss_kb()))
+    print('{:>12} {:>10}'.format(total_bytes, rss_kb()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# Generate a synthetic capture of mixed UBX, NMEA and RTCM messages with some noise, check that
+# ubx_hla.parallel gives the same output as single-process decoding, and time it with 1 to N processes.
+#
+# Usage: python benchmarks/bench_parallel.py [--mb MB] [--processes N] [--chunk-mb MB]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ubx_hla.checksums import crc24q, nmea_checksum, ubx_checksum
+from ubx_hla.parallel import decode_file
+from ubx_hla.stream import read_file
+
+def ubx(msg_class, msg_id, payload):
+    body = bytes([msg_class, msg_id]) + len(payload).to_bytes(2, 'little') + payload
+    return b'\xb5\x62' + body + bytes(ubx_checksum(body))
+
+def nmea(sentence):
+    return b'$' + sentence + b'*%02X\r\n' % nmea_checksum(sentence)
+
+def rtcm(payload):
+    frame = b'\xd3' + len(payload).to_bytes(2, 'big') + payload
+    return frame + crc24q(frame).to_bytes(3, 'big')
+
+def generate(path, size, seed=1):
+    rng = random.Random(seed)
+    pieces = [
+        ubx(0x01, 0x07, bytes(rng.getrandbits(8) for i in range(92))), # NAV-PVT
+        ubx(0x01, 0x35, bytes(rng.getrandbits(8) for i in range(8 + 12 * 30))), # NAV-SAT
+        nmea(b'GNGGA,092725.00,4717.11399,N,00833.91590,E,1,08,1.01,499.6,M,48.0,M,,'),
+        nmea(b'GNRMC,083559.00,A,4717.11437,N,00833.91522,E,0.004,77.52,091202,,,A,V'),
+        rtcm(bytes([0x43, 0x50]) + bytes(rng.getrandbits(8) for i in range(200))), # 1077
+        rtcm(bytes([0x3e, 0xd0]) + bytes(rng.getrandbits(8) for i in range(17))), # 1005
+    ]
+    with open(path, 'wb') as capture:
+        written = 0
+        while written < size:
+            block = b''.join(rng.choice(pieces) for i in range(1000))
+            block += bytes(rng.getrandbits(8) for i in range(rng.randint(0, 64))) # Line noise
+            capture.write(block)
+            written += len(block)
+
+def key(message):
+    return message[:6] + (bytes(message.payload),)
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel decoding scaling benchmark')
+    parser.add_argument('--mb', type=float, default=64, help='size of the synthetic capture in MB')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='maximum number of processes')
+    parser.add_argument('--chunk-mb', type=float, default=4, help='chunk size in MiB')
+    args = parser.parse_args()
+    chunk_size = int(args.chunk_mb * (1 << 20))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'capture.bin')
+        generate(path, int(args.mb * 1e6))
+        size = os.path.getsize(path)
+
+        begin = time.perf_counter()
+        expected = [key(message) for message in read_file(path, include_invalid=True)]
+        single = time.perf_counter() - begin
+        print('{:>10} {:8.2f} s {:8.2f} MB/s {:>10} messages'.format('single', single, size / single / 1e6, len(expected)))
+
+        for processes in range(1, args.processes + 1):
+            begin = time.perf_counter()
+            result = [key(message) for message in decode_file(path, processes, chunk_size, include_invalid=True)]
+            seconds = time.perf_counter() - begin
+            assert result == expected, 'parallel output differs with {} processes'.format(processes)
+            print('{:>10} {:8.2f} s {:8.2f} MB/s {:8.2f}x'.format('{} proc'.format(processes), seconds,
+                                                                  size / seconds / 1e6, single / seconds))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Benchmark suite: drive synthetic receiver traffic (see traffic.py) through Hla.decode, using the
+# stand-in saleae package, and report the throughput and peak memory of each scenario.
+#
+# Scenarios: UBX NAV-PVT + NAV-SAT + RXM-RAWX at 10 Hz, NMEA GGA / RMC / GSV bursts, RTCM 1005 + MSM7,
+# a mix of all three, the mix over I2C (0xFD bytes-available polls and another device on the bus)
+# and the 10 Hz UBX over SPI (MISO padded with 0xFF). Each is run with Detail per-field and per-message.
+#
+# bytes/s is the receiver's data (not the I2C or SPI framing). frames/s is the AnalyzerFrames returned.
+# Peak memory is measured by tracemalloc in a separate pass, as tracing slows the decoder down.
+# --instrument adds a pass with the Instrumentation setting on, and shows the bytes and bytes/s of the
+# message types which took the most time.
+#
+# Usage: python benchmarks/bench_suite.py [--seconds S] [--repeat N] [--only NAME] [--no-memory] [--instrument]
+#                                         [--output results.json] [--compare baseline.json]
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'standin'))
+
+from saleae.analyzers import AnalyzerFrame, new_analyzer
+from HighLevelAnalyzer import Hla
+
+import traffic
+
+# name: (stream, frames, frames keyword arguments)
+SCENARIOS = {
+    'uart-ubx-10hz': (traffic.ubx_stream, traffic.uart_frames, {}),
+    'uart-nmea-gsv': (traffic.nmea_stream, traffic.uart_frames, {'baud_rate': 38400}),
+    'uart-rtcm-msm7': (traffic.rtcm_stream, traffic.uart_frames, {}),
+    'uart-mixed': (traffic.mixed_stream, traffic.uart_frames, {}),
+    'i2c-mixed': (traffic.mixed_stream, traffic.i2c_frames, {}),
+    'spi-ubx-10hz': (traffic.ubx_stream, traffic.spi_frames, {}),
+}
+
+DETAILS = ('per-field', 'per-message')
+
+def run(frames, detail, instrumentation='off'):
+    """
+    Decode the frames with a new analyzer. Return the number of AnalyzerFrames returned, and the analyzer
+    """
+    analyzer = new_analyzer(Hla, detail=detail, i2c_address=0x42, instrumentation=instrumentation)
+    decode = analyzer.decode
+    emitted = 0
+    for frame in frames:
+        result = decode(frame)
+        if result is not None:
+            emitted += len(result) if isinstance(result, list) else 1
+    return emitted, analyzer
+
+def bench(name, detail, seconds, repeat, memory, instrument):
+    stream, to_frames, kwargs = SCENARIOS[name]
+    bursts, rate = stream(seconds)
+    frames = [AnalyzerFrame(frame_type, start, end, data)
+              for frame_type, data, start, end in to_frames(bursts, rate, **kwargs)]
+    stream_bytes = sum(len(burst) for burst in bursts)
+
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        emitted = run(frames, detail)[0]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {
+        'bytes': stream_bytes,
+        'frames_in': len(frames),
+        'frames_out': emitted,
+        'seconds': round(best, 4),
+        'bytes_per_s': round(stream_bytes / best),
+        'frames_per_s': round(emitted / best),
+    }
+    if memory:
+        tracemalloc.start()
+        run(frames, detail)
+        result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    if instrument:
+        result['instrumentation'] = run(frames, detail, 'on')[1].decoder.instrumentation.report()
+    return result
+
+def git_describe():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def change(new, old):
+    return '{:+.1f}%'.format((new - old) * 100 / old) if old else ''
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput and peak memory of Hla.decode on synthetic traffic')
+    parser.add_argument('--seconds', type=float, default=10, help='seconds of receiver traffic per scenario')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per scenario (the fastest is reported)')
+    parser.add_argument('--only', action='append', choices=sorted(SCENARIOS), help='run only this scenario')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--instrument', action='store_true',
+                        help='add the decoder instrumentation counters of each scenario to the results')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='show the change from the results in this JSON file')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+
+    results = {}
+    print('{:<28} {:>10} {:>12} {:>12} {:>10} {:>9} {:>9}'.format(
+        'scenario', 'bytes', 'bytes/s', 'frames/s', 'peak kB', 'bytes/s', 'peak'))
+    for name in args.only or SCENARIOS:
+        for detail in DETAILS:
+            key = name + '/' + detail
+            result = bench(name, detail, args.seconds, args.repeat, not args.no_memory, args.instrument)
+            results[key] = result
+            old = baseline.get(key, {})
+            print('{:<28} {:>10} {:>12} {:>12} {:>10} {:>9} {:>9}'.format(
+                key, result['bytes'], result['bytes_per_s'], result['frames_per_s'], result.get('peak_kb', ''),
+                change(result['bytes_per_s'], old.get('bytes_per_s')),
+                change(result['peak_kb'], old.get('peak_kb')) if 'peak_kb' in result else ''))
+            if args.instrument:
+                for message, counters in list(result['instrumentation']['messages'].items())[:5]:
+                    print('    {:<24} {:>10} {:>12}'.format(message, counters['bytes'],
+                                                            round(counters['bytes'] / counters['seconds'])
+                                                            if counters['seconds'] else ''))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'version': git_describe(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seconds': args.seconds,
+                'results': results,
+            }, file, indent=2)
+            file.write('\n')
+
+if __name__ == '__main__':
+    main()
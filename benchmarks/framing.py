@@ -0,0 +1,85 @@
+# Framing cross-check: ubx_hla.stream (bytes.find and whole-message checks) and ubx_hla.core.Decoder
+# (the analyzer's byte-by-byte state machine) share the framing rules in ubx_hla.framing, and must
+# accept exactly the same messages.
+#
+# Each trial splices whole, truncated and bit-flipped messages from traffic.py's mixed stream with
+# runs of header-like bytes (0xB5, 0x62, '$', 0xD3, '*', CR, LF), decodes the result both ways and
+# compares the (start, end) byte positions of the valid messages. The Decoder is given one time unit
+# per byte and is flushed at the end of the data, as the Scanner treats the end of the data as final.
+# golden.py check runs the default trials as its "framing" case.
+#
+# Usage: python benchmarks/framing.py [--trials N] [--seed S]
+
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from ubx_hla.core import Decoder
+from ubx_hla.stream import iter_messages
+
+import traffic
+
+HEADER_LIKE = (0xB5, 0x62, 0x24, 0xD3, 0x2A, 0x0D, 0x0A)
+TRIALS = 300
+SEED = 1
+
+def decoder_messages(data):
+    decoder = Decoder(detail='per-message')
+    records = decoder.decode_many(data, [(i, i + 1) for i in range(len(data))]) + decoder.flush()
+    return [(start, end) for record_type, start, end, record_data in records
+            if record_type in ('ubx', 'nmea', 'rtcm') and record_data['checksum'] == 'OK']
+
+def scanner_messages(data):
+    return [(message.offset, message.offset + message.length) for message in iter_messages(data)]
+
+def trial_data(rng, messages):
+    data = bytearray()
+    for i in range(rng.randrange(5, 60)):
+        message = bytearray(rng.choice(messages))
+        choice = rng.randrange(6)
+        if choice == 0: # Cut off
+            message = message[:rng.randrange(len(message))]
+        elif choice == 1: # Not a message
+            message = bytes(rng.choice(HEADER_LIKE + (rng.randrange(256),)) for j in range(rng.randrange(1, 12)))
+        elif choice == 2: # One bit flipped
+            message[rng.randrange(len(message))] ^= 1 << rng.randrange(8)
+        data += message
+    return bytes(data)
+
+def differences(trials=TRIALS, seed=SEED):
+    """
+    Run the trials. Returns a line for each trial where the Decoder and the Scanner differ
+    """
+    rng = random.Random(seed)
+    bursts, rate = traffic.mixed_stream(0.3)
+    stream = b''.join(bursts)
+    messages = [stream[message.offset:message.offset + message.length] for message in iter_messages(stream)]
+    messages.append(traffic.nmea(b'GPTXT,01,01,02,\x01\x7f$')) # Characters the Decoder accepts in a sentence
+
+    lines = []
+    for trial in range(trials):
+        data = trial_data(rng, messages)
+        expected, actual = decoder_messages(data), scanner_messages(data)
+        if expected != actual:
+            lines.append('trial {}: Decoder only {}, Scanner only {}'.format(
+                trial, sorted(set(expected) - set(actual))[:3], sorted(set(actual) - set(expected))[:3]))
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that ubx_hla.stream and ubx_hla.core accept the same messages')
+    parser.add_argument('--trials', type=int, default=TRIALS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    lines = differences(args.trials, args.seed)
+    for line in lines:
+        print(line)
+    print('{} of {} trials differ'.format(len(lines), args.trials))
+    sys.exit(1 if lines else 0)
+
+if __name__ == '__main__':
+    main()
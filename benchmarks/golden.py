@@ -0,0 +1,268 @@
+# Golden-output regression corpus: recorded Logic2 frame sequences (async serial, I2C and SPI) with
+# the frames Hla.decode returned for them.
+#
+# record saves the synthetic traffic from traffic.py as frame sequences in benchmarks/golden, and the
+# expected output of each case (a frame sequence and the analyzer settings) from its reference:
+#   baseline: the original analyzer, HighLevelAnalyzer.py at git revision BASELINE. Used for the
+#             messages it decodes (ACK, CFG-PRT/MSG/RST, MON-HW/VER, NAV-POSECEF/POSLLH/PVT/STATUS/
+#             TIMEGPS, RXM-PMP and INF) with its settings. The start and end time and the displayed
+#             string of each frame are recorded, as its frame types and data differ from the rewrite
+#   current:  the working tree, for the decoding, settings and error handling added since BASELINE
+#             (e.g. NAV-SAT, RXM-RAWX, NMEA fields, RTCM, CFG-VAL keys, ESF and HNR, resynchronisation,
+#             per-message frames). The type, times, displayed string and data of each frame are recorded.
+#             Re-record these cases only when their output is meant to change
+# check decodes the recorded frames again and compares the output with the recording, showing the
+# first differences of each case. A rewrite of the decoder should leave every case IDENTICAL.
+# check also runs the framing cross-check (framing.py) as its "framing" case, unless cases are named:
+# ubx_hla.stream.Scanner must find the same messages as the analyzer's Decoder.
+# Record a larger corpus (e.g. --scale 100, several million bytes) into another directory before the
+# rewrite, to check it on more traffic than is kept in the repository.
+#
+# Usage: python benchmarks/golden.py record [--scale N] [--corpus DIR] [--baseline REVISION] [CASE ...]
+#        python benchmarks/golden.py check [--corpus DIR] [--diffs N] [--processes N] [CASE ...]
+
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import types
+from multiprocessing import Pool
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'standin'))
+
+from saleae.analyzers import AnalyzerFrame, new_analyzer
+from HighLevelAnalyzer import Hla
+
+import framing
+import traffic
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+BASELINE = '67d398a' # The original analyzer, before the rewrite
+CURRENT = 'current'
+
+def mixed_corrupt(seconds):
+    return traffic.corrupt(*traffic.mixed_stream(seconds))
+
+def stalled_uart_frames(bursts, rate):
+    return traffic.uart_frames(bursts, rate, stalls=0.3)
+
+def two_module_i2c_frames(bursts, rate):
+    # A second module at 0x43 sends the configuration traffic
+    return traffic.i2c_frames(bursts, rate, second=(0x43,) + traffic.config_stream(len(bursts) / rate))
+
+# Recorded frame sequences. name: (stream, frames, seconds of traffic)
+STREAMS = {
+    'uart-ubx': (traffic.ubx_stream, traffic.uart_frames, 0.5),
+    'uart-nmea': (traffic.nmea_stream, traffic.uart_frames, 4),
+    'uart-rtcm': (traffic.rtcm_stream, traffic.uart_frames, 2),
+    'uart-mixed': (traffic.mixed_stream, traffic.uart_frames, 1),
+    'uart-config': (traffic.config_stream, traffic.uart_frames, 3),
+    'uart-config-M6': (traffic.config_stream_m6, traffic.uart_frames, 3),
+    'uart-sensor': (traffic.sensor_stream, traffic.uart_frames, 1),
+    'uart-corrupt': (mixed_corrupt, stalled_uart_frames, 2),
+    'i2c-mixed': (traffic.mixed_stream, traffic.i2c_frames, 1),
+    'i2c-config': (traffic.config_stream, traffic.i2c_frames, 3),
+    'i2c-two-modules': (traffic.mixed_stream, two_module_i2c_frames, 1),
+    'spi-ubx': (traffic.ubx_stream, traffic.spi_frames, 0.5),
+    'spi-config': (traffic.config_stream, traffic.spi_frames, 1),
+}
+
+# name: (frame sequence, analyzer settings, reference)
+CASES = {
+    'uart-config': ('uart-config', {}, BASELINE),
+    'uart-config-M6': ('uart-config-M6', {'ublox_module': 'M6'}, BASELINE),
+    'i2c-config': ('i2c-config', {}, BASELINE),
+    'spi-config': ('spi-config', {}, BASELINE),
+    'uart-ubx-per-field': ('uart-ubx', {}, CURRENT),
+    'uart-ubx-per-message': ('uart-ubx', {'detail': 'per-message'}, CURRENT),
+    'uart-nmea-per-field': ('uart-nmea', {}, CURRENT),
+    'uart-rtcm-per-field': ('uart-rtcm', {}, CURRENT),
+    'uart-mixed-per-field': ('uart-mixed', {}, CURRENT),
+    'uart-mixed-per-message': ('uart-mixed', {'detail': 'per-message'}, CURRENT),
+    'uart-config-per-message': ('uart-config', {'detail': 'per-message'}, CURRENT),
+    'uart-config-M6-per-message': ('uart-config-M6', {'ublox_module': 'M6', 'detail': 'per-message'}, CURRENT),
+    'uart-sensor-per-field': ('uart-sensor', {}, CURRENT),
+    'uart-sensor-per-message': ('uart-sensor', {'detail': 'per-message'}, CURRENT),
+    'uart-corrupt-per-field': ('uart-corrupt', {}, CURRENT),
+    'uart-corrupt-per-message': ('uart-corrupt', {'detail': 'per-message'}, CURRENT),
+    'uart-corrupt-statistics': ('uart-corrupt', {'statistics_interval': 0.5}, CURRENT),
+    'uart-corrupt-timeout': ('uart-corrupt', {'baud_rate': 460800, 'timeout_periods': 20}, CURRENT),
+    'i2c-mixed-per-field': ('i2c-mixed', {}, CURRENT),
+    'i2c-mixed-per-message': ('i2c-mixed', {'detail': 'per-message'}, CURRENT),
+    'i2c-two-addresses': ('i2c-two-modules', {'i2c_addresses': '0x42, 0x43'}, CURRENT),
+    'spi-ubx-per-field': ('spi-ubx', {}, CURRENT),
+    'spi-ubx-both': ('spi-ubx', {'spi_channel': 'both'}, CURRENT),
+}
+
+FRAMES = '.frames.json.gz' # The input frames of a sequence
+EXPECTED = '.expected.json.gz' # The settings and output of a case
+
+BYTES_KEYS = ('data', 'address', 'miso', 'mosi') # Input frame data which is bytes
+
+FIELD = re.compile(r'\{\{\{?data\.(\w+)\}?\}\}')
+
+def to_json(value):
+    """
+    JSON for the values in frame data which are not JSON types
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+def text(analyzer_class, frame):
+    """
+    The string Logic2 shows for a frame: its result_types format, filled in from its data.
+    The original analyzer only has 'message' frames, without a format: they show their str
+    """
+    fmt = analyzer_class.result_types.get(frame.type, {}).get('format', '{{data.str}}')
+    return FIELD.sub(lambda match: str(frame.data.get(match.group(1), '')), fmt)
+
+def baseline_analyzer(revision):
+    """
+    The Hla class of HighLevelAnalyzer.py at a git revision
+    """
+    source = subprocess.run(['git', 'show', revision + ':HighLevelAnalyzer.py'], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    module = types.ModuleType('HighLevelAnalyzer_' + revision)
+    exec(compile(source, 'HighLevelAnalyzer.py@' + revision, 'exec'), module.__dict__)
+    return module.Hla
+
+def decode(settings, frames, analyzer_class=Hla):
+    """
+    Decode the input frames with a new analyzer. Return the output as JSON lists:
+    [type, start_time, end_time, text, data]
+    """
+    analyzer = new_analyzer(analyzer_class, **dict({'i2c_address': 0x42}, **settings))
+    output = []
+    for frame in frames:
+        result = analyzer.decode(frame)
+        if result is None:
+            continue
+        for out in result if isinstance(result, list) else [result]:
+            output.append([out.type, out.start_time, out.end_time, text(analyzer_class, out), out.data])
+    return json.loads(json.dumps(output, default=to_json))
+
+def compared(output, reference):
+    """
+    The part of each output frame which is compared with a reference: all of it, or for the
+    original analyzer the start and end time and the displayed string
+    """
+    if reference == CURRENT:
+        return output
+    return [row[1:4] for row in output]
+
+def save(path, value):
+    with gzip.open(path, 'wt') as file:
+        json.dump(value, file, default=to_json, separators=(',', ':'))
+
+def record_frames(name, scale, corpus):
+    stream, to_frames, seconds = STREAMS[name]
+    bursts, rate = stream(seconds * scale)
+    frames = to_frames(bursts, rate)
+    save(os.path.join(corpus, name + FRAMES), [[frame_type, start, end, data] for frame_type, data, start, end in frames])
+
+def load_frames(path):
+    with gzip.open(path, 'rt') as file:
+        recorded = json.load(file)
+    frames = []
+    for frame_type, start, end, data in recorded:
+        for key in BYTES_KEYS:
+            if key in data:
+                data[key] = bytes.fromhex(data[key])
+        frames.append(AnalyzerFrame(frame_type, start, end, data))
+    return frames
+
+def load_case(corpus, name):
+    with gzip.open(os.path.join(corpus, name + EXPECTED), 'rt') as file:
+        case = json.load(file)
+    return case['frames'], case['settings'], case['reference'], case['expected']
+
+def record_case(name, corpus, baseline):
+    """
+    Record the expected output of a case from its reference. baseline is the git revision and the Hla
+    class of the original analyzer
+    """
+    frames_name, settings, reference = CASES[name]
+    frames = load_frames(os.path.join(corpus, frames_name + FRAMES))
+    if reference == CURRENT:
+        expected = decode(settings, frames)
+    else:
+        reference, baseline_class = baseline
+        expected = compared(decode(settings, frames, baseline_class), reference)
+    save(os.path.join(corpus, name + EXPECTED),
+         {'frames': frames_name, 'settings': settings, 'reference': reference, 'expected': expected})
+    return len(frames), len(expected)
+
+def check(task):
+    """
+    Worker: decode one case and compare it with its recording. Returns the input and output frame
+    counts, the number of output frames which differ, the first diffs (index, expected, actual) and the reference
+    """
+    corpus, name, max_diffs = task
+    frames_name, settings, reference, expected = load_case(corpus, name)
+    frames = load_frames(os.path.join(corpus, frames_name + FRAMES))
+    actual = compared(decode(settings, frames), reference)
+    diffs = [(index, old, new) for index, (old, new) in enumerate(zip(expected, actual)) if old != new]
+    differing = len(diffs) + abs(len(expected) - len(actual))
+    return len(frames), len(expected), len(actual), differing, diffs[:max_diffs], reference
+
+def recorded_cases(corpus):
+    return sorted(name[:-len(EXPECTED)] for name in os.listdir(corpus) if name.endswith(EXPECTED))
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or check the golden output of Hla.decode')
+    parser.add_argument('command', choices=('record', 'check'))
+    parser.add_argument('cases', nargs='*', help='the cases to record or check (default: all)')
+    parser.add_argument('--corpus', default=CORPUS, help='the corpus directory')
+    parser.add_argument('--scale', type=float, default=1, help='record: multiply the length of each case')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='record: the git revision of the original analyzer (default: %(default)s)')
+    parser.add_argument('--diffs', type=int, default=3, help='check: differences shown per case')
+    parser.add_argument('--processes', type=int, help='check: number of processes (default: one per CPU)')
+    args = parser.parse_intermixed_args()
+
+    if args.command == 'record':
+        os.makedirs(args.corpus, exist_ok=True)
+        names = args.cases or list(CASES)
+        baseline = args.baseline, baseline_analyzer(args.baseline)
+        for frames_name in sorted(set(CASES[name][0] for name in names)):
+            record_frames(frames_name, args.scale, args.corpus)
+        for name in names:
+            frames_in, frames_out = record_case(name, args.corpus, baseline)
+            print('{:<28} {:>9} frames in {:>9} frames out  {}'.format(
+                name, frames_in, frames_out, CASES[name][2] if CASES[name][2] == CURRENT else args.baseline))
+        return
+
+    names = args.cases or recorded_cases(args.corpus)
+    failed = 0
+    with Pool(args.processes) as pool:
+        framing_lines = None if args.cases else pool.apply_async(framing.differences)
+        for name, result in zip(names, pool.imap(check, [(args.corpus, name, args.diffs) for name in names])):
+            frames_in, frames_expected, frames_out, differing, diffs, reference = result
+            status = 'IDENTICAL' if not differing else 'DIFF ({} frames)'.format(differing)
+            print('{:<28} {:>9} frames in {:>9} frames out  {:<9} {}'.format(name, frames_in, frames_out, reference, status))
+            if frames_expected != frames_out:
+                print('  expected {} frames out'.format(frames_expected))
+            for index, old, new in diffs:
+                print('  [{}] expected {}'.format(index, old))
+                print('  [{}] actual   {}'.format(index, new))
+            failed += bool(differing)
+        if framing_lines is not None:
+            lines = framing_lines.get()
+            status = 'IDENTICAL' if not lines else 'DIFF ({} trials)'.format(len(lines))
+            print('{:<28} {:>9} trials{:>33} {}'.format('framing', framing.TRIALS, '', status))
+            for line in lines[:args.diffs]:
+                print('  ' + line)
+            failed += bool(lines)
+            names.append('framing')
+    print('{} of {} cases differ'.format(failed, len(names)))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+# Synthetic receiver traffic for the benchmarks: UBX, NMEA and RTCM3 messages with plausible
+# contents and sizes, and the Logic2 frames (async serial, I2C, SPI) which carry them.
+#
+# Frames are (type, data, start_time, end_time) tuples, with times in seconds - the arguments of
+# ubx_hla.core.Decoder.decode_frame. See bench_suite.py
+
+import math
+import os
+import random
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ubx_hla.checksums import crc24q, nmea_checksum, ubx_checksum
+
+def ubx(msg_class, msg_id, payload):
+    body = bytes([msg_class, msg_id]) + len(payload).to_bytes(2, 'little') + payload
+    return b'\xb5\x62' + body + bytes(ubx_checksum(body))
+
+def nmea(sentence):
+    return b'$' + sentence + b'*%02X\r\n' % nmea_checksum(sentence)
+
+def rtcm(payload):
+    frame = b'\xd3' + len(payload).to_bytes(2, 'big') + payload
+    return frame + crc24q(frame).to_bytes(3, 'big')
+
+class BitWriter:
+    """
+    Build an RTCM3 message body MSB first
+    """
+
+    def __init__(self):
+        self.value = 0
+        self.count = 0
+
+    def add(self, bits, value):
+        self.value = (self.value << bits) | (value & ((1 << bits) - 1))
+        self.count += bits
+
+    def to_bytes(self):
+        pad = -self.count % 8
+        return (self.value << pad).to_bytes((self.count + pad) // 8, 'big')
+
+class Sky:
+    """
+    The satellites in view: (gnssId, svId, elevation, azimuth, C/N0), moving a little each epoch
+    """
+
+    GNSS = ((0, 'GP', 32), (2, 'GA', 36), (3, 'GB', 46), (6, 'GL', 24)) # gnssId, NMEA talker, satellites
+
+    def __init__(self, rng, count=32):
+        self.rng = rng
+        self.satellites = []
+        for gnss_id, talker, total in self.GNSS:
+            for sv_id in rng.sample(range(1, total + 1), count // len(self.GNSS)):
+                self.satellites.append([gnss_id, sv_id, rng.randint(5, 85), rng.randint(0, 359), rng.randint(20, 50)])
+
+    def step(self):
+        for satellite in self.satellites:
+            satellite[3] = (satellite[3] + 1) % 360
+            satellite[4] = max(10, min(55, satellite[4] + self.rng.randint(-1, 1)))
+
+def nav_pvt(epoch, rng):
+    itow = epoch * 100
+    return ubx(0x01, 0x07, struct.pack(
+        '<IHBBBBBBIiBBBBiiiiIIiiiiiIIHH4sihH',
+        itow, 2024, 1, 1, 12, 0, epoch // 10 % 60, 0x37, 20, 0, 3, 0x01, 0xEA, 24,
+        85000000 + rng.randint(-50, 50), 470000000 + rng.randint(-50, 50), 500000, 450000, 1200, 1800,
+        rng.randint(-20, 20), rng.randint(-20, 20), rng.randint(-20, 20), 15, 0, 300, 100000, 110, 0,
+        bytes(4), 0, 0, 0))
+
+def nav_sat(epoch, sky):
+    payload = struct.pack('<IBB2s', epoch * 100, 1, len(sky.satellites), bytes(2))
+    for gnss_id, sv_id, elevation, azimuth, cno in sky.satellites:
+        payload += struct.pack('<BBBbhhI', gnss_id, sv_id, cno, elevation, azimuth, 0, 0x1F)
+    return ubx(0x01, 0x35, payload)
+
+def rxm_rawx(epoch, sky):
+    measurements = [satellite for satellite in sky.satellites for signal in range(2)]
+    payload = struct.pack('<dHbBBB2s', epoch * 0.1, 2300, 18, len(measurements), 0x01, 1, bytes(2))
+    for index, (gnss_id, sv_id, elevation, azimuth, cno) in enumerate(measurements):
+        payload += struct.pack('<ddfBBBBHBBBBBB', 2.2e7 + sv_id * 1e4, 1.1e8 + epoch, -1200.5,
+                               gnss_id, sv_id, index % 2, 0, 64500, cno, 3, 4, 5, 0x0F, 0)
+    return ubx(0x02, 0x15, payload)
+
+def nmea_epoch(epoch, sky):
+    """
+    GGA and RMC, then a burst of GSV sentences for each GNSS
+    """
+    time = b'12%02d%02d.00' % (epoch // 600 % 60, epoch // 10 % 60)
+    sentences = [
+        nmea(b'GNGGA,' + time + b',4717.11399,N,00833.91590,E,1,12,0.99,499.6,M,48.0,M,,'),
+        nmea(b'GNRMC,' + time + b',A,4717.11437,N,00833.91522,E,0.004,77.52,091202,,,A,V'),
+    ]
+    for gnss_id, talker, total in Sky.GNSS:
+        satellites = [satellite for satellite in sky.satellites if satellite[0] == gnss_id]
+        count = math.ceil(len(satellites) / 4)
+        for number in range(count):
+            fields = b''.join(b',%02d,%02d,%03d,%02d' % tuple(satellite[1:])
+                              for satellite in satellites[number * 4:number * 4 + 4])
+            sentences.append(nmea(talker.encode() + b'GSV,%d,%d,%02d' % (count, number + 1, len(satellites)) + fields + b',1'))
+    return b''.join(sentences)
+
+def msm7(msg_type, epoch, satellites, rng):
+    """
+    An MSM7 message with valid header, satellite and cell masks, and random observations
+    """
+    signals = (2, 16) # e.g. L1 C/A and L2C
+    writer = BitWriter()
+    writer.add(12, msg_type)
+    writer.add(12, 0) # stationId
+    writer.add(30, epoch * 100)
+    writer.add(1, 0) # multipleMessage
+    writer.add(3, 0) # iods
+    writer.add(7, 0)
+    writer.add(2, 0)
+    writer.add(2, 0)
+    writer.add(1, 0)
+    writer.add(3, 0)
+    sat_mask = 0
+    for sv_id in satellites:
+        sat_mask |= 1 << (64 - sv_id)
+    writer.add(64, sat_mask)
+    sig_mask = 0
+    for signal in signals:
+        sig_mask |= 1 << (32 - signal)
+    writer.add(32, sig_mask)
+    cells = len(satellites) * len(signals)
+    writer.add(cells, (1 << cells) - 1)
+    writer.add(36 * len(satellites) + 80 * cells, rng.getrandbits(36 * len(satellites) + 80 * cells))
+    return rtcm(writer.to_bytes())
+
+def rtcm_epoch(epoch, rng):
+    """
+    Station ARP (1005) every 10 epochs, and MSM7 for GPS, GLONASS, Galileo and BeiDou
+    """
+    messages = []
+    if epoch % 10 == 0:
+        writer = BitWriter()
+        for bits, value in ((12, 1005), (12, 0), (6, 0), (4, 0xF), (38, 38751234567), (2, 0), (38, -6123456789),
+                            (2, 0), (38, 45000000000)):
+            writer.add(bits, value)
+        messages.append(rtcm(writer.to_bytes()))
+    for msg_type, count in ((1077, 10), (1087, 8), (1097, 9), (1127, 12)):
+        messages.append(msm7(msg_type, epoch, sorted(rng.sample(range(1, 37), count)), rng))
+    return b''.join(messages)
+
+def nav_epoch(epoch, rng):
+    """
+    NAV-POSECEF, NAV-POSLLH, NAV-STATUS and NAV-TIMEGPS
+    """
+    itow = epoch * 1000
+    return (ubx(0x01, 0x01, struct.pack('<IiiiI', itow, 428312345 + rng.randint(-50, 50), 65432109 + rng.randint(-50, 50),
+                                        465301234 + rng.randint(-50, 50), 150))
+            + ubx(0x01, 0x02, struct.pack('<IiiiiII', itow, 85000000 + rng.randint(-50, 50), 470000000 + rng.randint(-50, 50),
+                                          500000, 450000, 1200, 1800))
+            + ubx(0x01, 0x03, struct.pack('<IBBBBII', itow, 3, 0xDD, 0x00, 0x08, 25000, 100000 + itow))
+            + ubx(0x01, 0x20, struct.pack('<IihbBI', itow, rng.randint(-500000, 500000), 2300, 18, 0x07, 20)))
+
+def mon_hw(m6, rng):
+    """
+    MON-HW: 17 VP bytes on M8 (60 bytes), 25 on M6 (68 bytes)
+    """
+    return (struct.pack('<IIIIHHBBBBI', 0x0001EFFF, 0, 0x00010000, 0x0001E7EF, rng.randint(80, 120),
+                        rng.randint(2500, 3500), 2, 1, 0x85, 0, 0x000E0FFF)
+            + bytes(range(0x20, 0x20 + (25 if m6 else 17)))
+            + struct.pack('<B2sIII', rng.randint(0, 20), bytes(2), 0, 0x000F6910, 0))
+
+def mon_ver(m6):
+    """
+    MON-VER: swVersion, hwVersion, romVersion (M6 only) and extensions, NUL padded
+    """
+    strings = [(b'7.03 (45969)', 30), (b'00040007', 10)] if m6 else [(b'ROM CORE 3.01 (107888)', 30), (b'00080000', 10)]
+    if m6:
+        strings.append((b'7.03 (45969)', 30))
+    strings += [(b'FWVER=SPG 3.01', 30), (b'PROTVER=18.00', 30), (b'GPS;GLO;GAL;BDS', 30)]
+    return b''.join(text.ljust(size, b'\x00') for text, size in strings)
+
+def rxm_pmp(version, rng):
+    """
+    RXM-PMP: version 0 has 504 bytes of user data, version 1 numBytesUserData
+    """
+    header = struct.pack('<IIIHBB', 123456, 0xE15AE893, 0xE15AE893, 0x1234, 0, 3)
+    trailer = struct.pack('<HBB', 12, 120, 0)
+    if version == 0:
+        return b'\x00' + bytes(3) + header + bytes(rng.getrandbits(8) for i in range(504)) + trailer
+    user_data = bytes(rng.getrandbits(8) for i in range(rng.randint(20, 60)))
+    return struct.pack('<BBH', 1, 0, len(user_data)) + header + trailer + user_data
+
+def config_messages(m6, rng):
+    """
+    A host configuring and polling the receiver, and the receiver's replies: CFG-PRT, CFG-MSG and
+    CFG-RST with ACK-ACK and ACK-NACK, MON-HW and MON-VER, RXM-PMP and INF
+    """
+    return b''.join((
+        ubx(0x06, 0x00, b'\x01'), # CFG-PRT poll for UART1
+        ubx(0x06, 0x00, struct.pack('<BBHIIHHHH', 1, 0, 0, 0x000008D0, 460800, 0x0007, 0x0003, 0, 0)),
+        ubx(0x05, 0x01, b'\x06\x00'), # ACK-ACK CFG-PRT
+        ubx(0x06, 0x01, b'\x01\x07'), # CFG-MSG poll for NAV-PVT
+        ubx(0x06, 0x01, b'\x01\x07\x01'), # NAV-PVT every epoch on this port
+        ubx(0x06, 0x01, bytes([0xF0, 0x00, 0, 1, 0, 1, 0, 0])), # GGA on UART1 and USB
+        ubx(0x05, 0x00, b'\x06\x01'), # ACK-NACK CFG-MSG
+        ubx(0x0A, 0x09, mon_hw(m6, rng)),
+        ubx(0x0A, 0x04, mon_ver(m6)),
+        ubx(0x02, 0x72, rxm_pmp(0, rng)),
+        ubx(0x02, 0x72, rxm_pmp(1, rng)),
+        ubx(0x04, 0x02, b'ANTSUPERV=AC SD PDoS SR'),
+        ubx(0x04, 0x01, b'ANTSTATUS=SHORT'),
+        ubx(0x04, 0x00, b'Invalid configuration'),
+        ubx(0x06, 0x04, struct.pack('<HBB', 0xFFFF, 1, 0)), # CFG-RST cold start
+    ))
+
+def cfg_val_messages():
+    """
+    CFG-VALSET with values of each size, CFG-VALGET poll (keys) and response (keys and values),
+    CFG-VALDEL, each acknowledged. Includes an unknown key, and a key cut off by the end of the payload
+    """
+    items = (struct.pack('<IB', 0x10110013, 1) # CFG-NAVSPG-INIFIX3D, L
+             + struct.pack('<IB', 0x20910007, 1) # CFG-MSGOUT-UBX_NAV_PVT_UART1, U1
+             + struct.pack('<IH', 0x30210001, 100) # CFG-RATE-MEAS, U2
+             + struct.pack('<II', 0x40520001, 460800) # CFG-UART1-BAUDRATE, U4
+             + struct.pack('<Iq', 0x50FE0001, -2)) # Unknown key, 8 bytes
+    keys = b''.join(items[offset:offset + 4] for offset in (0, 5, 10, 16, 24))
+    return b''.join((
+        ubx(0x06, 0x8A, b'\x00\x01\x00\x00' + items), # VALSET to RAM
+        ubx(0x05, 0x01, b'\x06\x8A'),
+        ubx(0x06, 0x8B, b'\x00\x00\x00\x00' + keys), # VALGET poll from RAM
+        ubx(0x06, 0x8B, b'\x01\x00\x00\x00' + items), # VALGET response
+        ubx(0x05, 0x01, b'\x06\x8B'),
+        ubx(0x06, 0x8C, b'\x00\x06\x00\x00' + keys[:8]), # VALDEL from BBR and Flash
+        ubx(0x05, 0x01, b'\x06\x8C'),
+        ubx(0x06, 0x8A, b'\x00\x01\x00\x00' + items[:5] + items[10:15]), # Cut off part way through a value
+    ))
+
+def sensor_messages(epoch, rng):
+    """
+    ESF-MEAS, ESF-RAW, ESF-STATUS and ESF-INS, and HNR-PVT, HNR-ATT and HNR-INS
+    """
+    itow = epoch * 100
+    gyro = [(data_type << 24) | (rng.randint(-2000, 2000) & 0xFFFFFF) for data_type in (14, 13, 5)]
+    accel = [(data_type << 24) | (rng.randint(-10000, 10000) & 0xFFFFFF) for data_type in (16, 17, 18)]
+    ticks = [(data_type << 24) | (1 << 23 if data_type == 8 else 0) | (epoch * 10 % 0x7FFFFF) for data_type in (8, 9)]
+    meas = gyro + accel + ticks
+    return b''.join((
+        ubx(0x10, 0x02, struct.pack('<IHH', itow, (len(meas) << 11) | 0x08, 0)
+            + b''.join(struct.pack('<I', data) for data in meas) + struct.pack('<I', itow + 3)),
+        ubx(0x10, 0x03, bytes(4) + b''.join(struct.pack('<II', data, itow * 10 + index) for index, data in enumerate(gyro + accel))),
+        ubx(0x10, 0x10, struct.pack('<IB7sB2sB', itow, 2, bytes(7), 1, bytes(2), 3)
+            + bytes([0xCE, 0x03, 100, 0, 0xD0, 0x03, 100, 0, 0x08, 0x01, 10, 0x04])),
+        ubx(0x10, 0x15, struct.pack('<I4sIiiiiii', 0x0000003F, bytes(4), itow, *[rng.randint(-5000, 5000) for i in range(6)])),
+        ubx(0x28, 0x00, struct.pack('<IHBBBBBBiBB2siiiiiiii4sIIII', itow, 2024, 1, 1, 12, 0, epoch // 10 % 60, 0x07, 0, 3,
+                                    0xDD, bytes(2), 85000000, 470000000, 500000, 450000, 120, 125, 1500000, 1500000,
+                                    bytes(4), 1200, 1800, 300, 100000)),
+        ubx(0x28, 0x01, struct.pack('<IB3siiiIII', itow, 1, bytes(3), 150000, -20000, 1500000, 50000, 50000, 100000)),
+        ubx(0x28, 0x02, struct.pack('<I4sIiiiiii', 0x0000003F, bytes(4), itow, *[rng.randint(-5000, 5000) for i in range(6)])),
+    ))
+
+def config_stream(seconds, module='M8', seed=1):
+    """
+    NAV-POSECEF, NAV-POSLLH, NAV-PVT, NAV-STATUS and NAV-TIMEGPS at 1 Hz, with a configuration
+    exchange (config_messages) every epoch. MON-HW and MON-VER follow the layout of module
+    """
+    rng = random.Random(seed)
+    return [nav_epoch(epoch, rng) + nav_pvt(epoch * 10, rng) + config_messages(module == 'M6', rng)
+            for epoch in range(int(seconds))], 1
+
+def config_stream_m6(seconds, seed=1):
+    return config_stream(seconds, 'M6', seed)
+
+def sensor_stream(seconds, seed=1):
+    """
+    ESF and HNR at 10 Hz, with the CFG-VALSET, VALGET and VALDEL exchange once per second
+    """
+    rng = random.Random(seed)
+    bursts = []
+    for epoch in range(int(seconds * 10)):
+        burst = sensor_messages(epoch, rng)
+        if epoch % 10 == 0:
+            burst += cfg_val_messages()
+        bursts.append(burst)
+    return bursts, 10
+
+def ubx_stream(seconds, rate=10, seed=1):
+    """
+    NAV-PVT, NAV-SAT and RXM-RAWX at rate Hz. Returns a list of bursts, one per epoch
+    """
+    rng = random.Random(seed)
+    sky = Sky(rng)
+    bursts = []
+    for epoch in range(int(seconds * rate)):
+        sky.step()
+        bursts.append(nav_pvt(epoch, rng) + nav_sat(epoch, sky) + rxm_rawx(epoch, sky))
+    return bursts, rate
+
+def nmea_stream(seconds, seed=1):
+    rng = random.Random(seed)
+    sky = Sky(rng)
+    bursts = []
+    for epoch in range(int(seconds)):
+        sky.step()
+        bursts.append(nmea_epoch(epoch, sky))
+    return bursts, 1
+
+def rtcm_stream(seconds, seed=1):
+    rng = random.Random(seed)
+    return [rtcm_epoch(epoch, rng) for epoch in range(int(seconds))], 1
+
+def mixed_stream(seconds, seed=1):
+    """
+    UBX at 10 Hz, with NMEA and RTCM once per second
+    """
+    rng = random.Random(seed)
+    sky = Sky(rng)
+    bursts = []
+    for epoch in range(int(seconds * 10)):
+        sky.step()
+        burst = nav_pvt(epoch, rng) + nav_sat(epoch, sky)
+        if epoch % 10 == 0:
+            burst += nmea_epoch(epoch, sky) + rtcm_epoch(epoch // 10, rng)
+        bursts.append(burst)
+    return bursts, 10
+
+def corrupt(bursts, rate, seed=1, probability=0.3):
+    """
+    Damage some of the bursts: a flipped bit (checksum error), a lost byte, or noise between messages
+    """
+    rng = random.Random(seed)
+    damaged = []
+    for burst in bursts:
+        burst = bytearray(burst)
+        if rng.random() < probability:
+            burst[rng.randrange(len(burst))] ^= 1 << rng.randrange(8)
+        if rng.random() < probability:
+            del burst[rng.randrange(len(burst))]
+        if rng.random() < probability:
+            position = rng.randrange(len(burst))
+            burst[position:position] = bytes(rng.getrandbits(8) for i in range(rng.randint(1, 40)))
+        damaged.append(bytes(burst))
+    return damaged, rate
+
+def uart_frames(bursts, rate, baud_rate=460800, stalls=0, seed=1):
+    """
+    Async serial data frames. Each burst starts at the beginning of its epoch. A fraction stalls of
+    the bursts pause for 100 byte periods before a random byte, as if the transmitter had stalled
+    """
+    rng = random.Random(seed)
+    period = 10 / baud_rate
+    frames = []
+    for epoch, burst in enumerate(bursts):
+        time = epoch / rate
+        stall = rng.randrange(len(burst)) if stalls and rng.random() < stalls else None
+        for index, value in enumerate(burst):
+            if index == stall:
+                time += period * 100
+            frames.append(('data', {'data': bytes([value])}, time, time + period * 0.9))
+            time += period
+    return frames
+
+def polls(bursts, rate, poll_rate):
+    """
+    Yield the number of each poll, and the epoch of the burst which arrived since the previous poll (or None)
+    """
+    last = None
+    for poll in range(int(len(bursts) / rate * poll_rate)):
+        epoch = int(poll * rate / poll_rate)
+        yield poll, epoch if epoch != last else None
+        last = epoch
+
+def i2c_frames(bursts, rate, address=0x42, clock=400000, poll_rate=50, chunk=255, second=None):
+    """
+    I2C traffic as a host polls a u-blox module: write 0xFD, read the two Bytes-Available bytes,
+    then read the data in chunks. Polls with nothing available are included. Traffic to another
+    device (0x50) is interleaved with each poll. second is (address, bursts, rate) of a second
+    module on the bus, which is polled after the first
+    """
+    period = 9 / clock
+    frames = []
+    time = 0.0
+
+    def add(frame_type, data):
+        nonlocal time
+        frames.append((frame_type, data, time, time + period * 0.9))
+        time += period
+
+    modules = [(address, bursts, rate)] + ([second] if second else [])
+    pending = [bytearray() for module in modules]
+    for module_polls in zip(*[polls(module_bursts, module_rate, poll_rate) for address, module_bursts, module_rate in modules]):
+        time = max(time, module_polls[0][0] / poll_rate)
+        add('address', {'address': bytes([0x50]), 'read': False}) # Another device
+        add('data', {'data': b'\x00'})
+        for (address, module_bursts, module_rate), (poll, epoch), data in zip(modules, module_polls, pending):
+            if epoch is not None:
+                data += module_bursts[epoch]
+            add('address', {'address': bytes([address]), 'read': False})
+            add('data', {'data': b'\xfd'})
+            add('address', {'address': bytes([address]), 'read': True})
+            available = len(data)
+            add('data', {'data': bytes([available >> 8])})
+            add('data', {'data': bytes([available & 0xFF])})
+            while data:
+                add('address', {'address': bytes([address]), 'read': True})
+                for value in data[:chunk]:
+                    add('data', {'data': bytes([value])})
+                del data[:chunk]
+    return frames
+
+def spi_frames(bursts, rate, clock=5000000, transfer=512, poll_rate=20):
+    """
+    SPI transfers of a fixed size. MISO carries the data, padded with the 0xFF idle byte.
+    MOSI is idle (0xFF)
+    """
+    period = 8 / clock
+    frames = []
+    pending = bytearray()
+    time = 0.0
+    for poll, epoch in polls(bursts, rate, poll_rate):
+        time = max(time, poll / poll_rate)
+        if epoch is not None:
+            pending += bursts[epoch]
+        while True:
+            data = pending[:transfer]
+            del pending[:transfer]
+            for value in data.ljust(transfer, b'\xff'):
+                frames.append(('result', {'miso': bytes([value]), 'mosi': b'\xff'}, time, time + period * 0.9))
+                time += period
+            if not pending:
+                break
+    return frames
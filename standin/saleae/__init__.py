@@ -0,0 +1,8 @@
+"""
+A stand-in for the parts of the Logic2 saleae package which the analyzer uses, so that
+HighLevelAnalyzer.py can be imported and run without Logic2 (e.g. in CI):
+
+PYTHONPATH=standin python -c "import HighLevelAnalyzer"
+
+Times are plain numbers (seconds). Only the decoder in ubx_hla.core is exercised - not Logic2.
+"""
@@ -0,0 +1,54 @@
+"""
+Stand-in for saleae.analyzers
+"""
+
+class AnalyzerFrame:
+    def __init__(self, type, start_time, end_time, data=None):
+        self.type = type
+        self.start_time = start_time
+        self.end_time = end_time
+        self.data = data
+
+    def __repr__(self):
+        return 'AnalyzerFrame({!r}, {!r}, {!r}, {!r})'.format(self.type, self.start_time, self.end_time, self.data)
+
+class HighLevelAnalyzer:
+    pass
+
+class Setting:
+    """
+    A setting. Logic2 replaces it with the setting's value on each analyzer instance.
+    Here, set the value with setattr before calling __init__, or it is the default
+    """
+    default = None
+
+    def __init__(self, label='', **kwargs):
+        self.label = label
+        self.kwargs = kwargs
+
+class StringSetting(Setting):
+    default = ''
+
+class NumberSetting(Setting):
+    default = 0
+
+class ChoicesSetting(Setting):
+    def __init__(self, choices, label='', **kwargs):
+        super().__init__(label, **kwargs)
+        self.choices = choices
+        self.default = choices[0]
+
+def new_analyzer(cls, **settings):
+    """
+    Create an analyzer, as Logic2 does: the settings are set on the instance before __init__.
+    Settings which are not given take their default (the first choice, 0 or '')
+    """
+    analyzer = cls.__new__(cls)
+    for name in dir(cls):
+        setting = getattr(cls, name)
+        if isinstance(setting, Setting):
+            setattr(analyzer, name, settings.pop(name, setting.default))
+    if settings:
+        raise TypeError('Unknown settings: ' + ', '.join(settings))
+    analyzer.__init__()
+    return analyzer
@@ -0,0 +1,8 @@
+"""
+Stand-in for saleae.data. Times are plain numbers of seconds, so a GraphTimeDelta is a float
+"""
+
+class GraphTimeDelta(float):
+    def __new__(cls, second=0.0, millisecond=0.0, microsecond=0.0, nanosecond=0.0, picosecond=0.0):
+        return super().__new__(cls, second + millisecond * 1e-3 + microsecond * 1e-6 + nanosecond * 1e-9
+                               + picosecond * 1e-12)
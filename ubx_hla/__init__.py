@@ -0,0 +1,3 @@
+"""
+Saleae-independent parts of the SparkFun u-blox UBX High Level Analyzer
+"""
@@ -0,0 +1,450 @@
+"""
+u-blox Generation 9 configuration keys (CFG-VALSET, CFG-VALGET and CFG-VALDEL)
+
+A key ID is 32 bits: bits 28-30 give the size of the value, bits 16-23 the group and
+bits 0-11 the item. The key names are stored as compact text tables which are only parsed
+the first time a key is looked up, so importing this module costs almost nothing.
+"""
+
+import struct
+
+# Value size in bytes, from key bits 28-30. Size 1 is a single bit, stored in one byte
+CFG_VALUE_SIZE = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8}
+
+# One key per line: key ID (hex), value type and name (without the "CFG-" prefix)
+#   L: boolean, U: unsigned, I: signed, E: enumeration, X: bitfield, R: floating point
+CFG_KEYS = """
+10220001 L ODO-USE_ODO
+10220002 L ODO-USE_COG
+10220003 L ODO-OUTLPVEL
+10220004 L ODO-OUTLPCOG
+20220005 E ODO-PROFILE
+20220021 U ODO-COGMAXSPEED
+20220022 U ODO-COGMAXPOSACC
+20220031 U ODO-VELLPGAIN
+20220032 U ODO-COGLPGAIN
+20030001 E TMODE-MODE
+20030002 E TMODE-POS_TYPE
+40030003 I TMODE-ECEF_X
+40030004 I TMODE-ECEF_Y
+40030005 I TMODE-ECEF_Z
+20030006 I TMODE-ECEF_X_HP
+20030007 I TMODE-ECEF_Y_HP
+20030008 I TMODE-ECEF_Z_HP
+40030009 I TMODE-LAT
+4003000a I TMODE-LON
+4003000b I TMODE-HEIGHT
+2003000c I TMODE-LAT_HP
+2003000d I TMODE-LON_HP
+2003000e I TMODE-HEIGHT_HP
+4003000f U TMODE-FIXED_POS_ACC
+40030010 U TMODE-SVIN_MIN_DUR
+40030011 U TMODE-SVIN_ACC_LIMIT
+30050001 I TP-ANT_CABLEDELAY
+40050002 U TP-PERIOD_TP1
+40050003 U TP-PERIOD_LOCK_TP1
+40050004 U TP-LEN_TP1
+40050005 U TP-LEN_LOCK_TP1
+40050006 I TP-USER_DELAY_TP1
+10050007 L TP-TP1_ENA
+10050008 L TP-SYNC_GNSS_TP1
+10050009 L TP-USE_LOCKED_TP1
+1005000a L TP-ALIGN_TO_TOW_TP1
+1005000b L TP-POL_TP1
+2005000c E TP-TIMEGRID_TP1
+20050023 E TP-PULSE_DEF
+40050024 U TP-FREQ_TP1
+40050025 U TP-FREQ_LOCK_TP1
+20050030 E TP-PULSE_LENGTH_DEF
+10080001 L SFCORE-USE_SF
+30090001 U RTCM-DF003_OUT
+30090008 U RTCM-DF003_IN
+20090009 E RTCM-DF003_IN_FILTER
+20110011 E NAVSPG-FIXMODE
+10110013 L NAVSPG-INIFIX3D
+30110017 U NAVSPG-WKNROLLOVER
+10110019 L NAVSPG-USE_PPP
+2011001c E NAVSPG-UTCSTANDARD
+20110021 E NAVSPG-DYNMODEL
+10110025 L NAVSPG-ACKAIDING
+10110061 L NAVSPG-USE_USRDAT
+50110062 R NAVSPG-USRDAT_MAJA
+50110063 R NAVSPG-USRDAT_FLAT
+40110064 R NAVSPG-USRDAT_DX
+40110065 R NAVSPG-USRDAT_DY
+40110066 R NAVSPG-USRDAT_DZ
+40110067 R NAVSPG-USRDAT_ROTX
+40110068 R NAVSPG-USRDAT_ROTY
+40110069 R NAVSPG-USRDAT_ROTZ
+4011006a R NAVSPG-USRDAT_SCALE
+201100a1 U NAVSPG-INFIL_MINSVS
+201100a2 U NAVSPG-INFIL_MAXSVS
+201100a3 U NAVSPG-INFIL_MINCNO
+201100a4 I NAVSPG-INFIL_MINELEV
+201100aa U NAVSPG-INFIL_NCNOTHRS
+201100ab U NAVSPG-INFIL_CNOTHRS
+301100b1 U NAVSPG-OUTFIL_PDOP
+301100b2 U NAVSPG-OUTFIL_TDOP
+301100b3 U NAVSPG-OUTFIL_PACC
+301100b4 U NAVSPG-OUTFIL_TACC
+301100b5 U NAVSPG-OUTFIL_FACC
+401100c1 I NAVSPG-CONSTR_ALT
+401100c2 U NAVSPG-CONSTR_ALTVAR
+201100c4 U NAVSPG-CONSTR_DGNSSTO
+201100d6 E NAVSPG-SIGATTCOMP
+20140011 E NAVHPG-DGNSSMODE
+30210001 U RATE-MEAS
+30210002 U RATE-NAV
+20210003 E RATE-TIMEREF
+20210004 U RATE-NAV_PRIO
+20250038 U MOT-GNSSSPEED_THRS
+3025003b U MOT-GNSSDIST_THRS
+10310001 L SIGNAL-GPS_L1CA_ENA
+10310003 L SIGNAL-GPS_L2C_ENA
+10310004 L SIGNAL-GPS_L5_ENA
+10310005 L SIGNAL-SBAS_L1CA_ENA
+10310007 L SIGNAL-GAL_E1_ENA
+10310009 L SIGNAL-GAL_E5A_ENA
+1031000a L SIGNAL-GAL_E5B_ENA
+1031000d L SIGNAL-BDS_B1_ENA
+1031000e L SIGNAL-BDS_B2_ENA
+1031000f L SIGNAL-BDS_B1C_ENA
+10310012 L SIGNAL-QZSS_L1CA_ENA
+10310014 L SIGNAL-QZSS_L1S_ENA
+10310015 L SIGNAL-QZSS_L2C_ENA
+10310017 L SIGNAL-QZSS_L5_ENA
+10310018 L SIGNAL-GLO_L1_ENA
+1031001a L SIGNAL-GLO_L2_ENA
+1031001d L SIGNAL-NAVIC_L5_ENA
+1031001f L SIGNAL-GPS_ENA
+10310020 L SIGNAL-SBAS_ENA
+10310021 L SIGNAL-GAL_ENA
+10310022 L SIGNAL-BDS_ENA
+10310024 L SIGNAL-QZSS_ENA
+10310025 L SIGNAL-GLO_ENA
+10310026 L SIGNAL-NAVIC_ENA
+10310028 L SIGNAL-BDS_B2A_ENA
+10360002 L SBAS-USE_TESTMODE
+10360003 L SBAS-USE_RANGING
+10360004 L SBAS-USE_DIFFCORR
+10360005 L SBAS-USE_INTEGRITY
+50360006 X SBAS-PRNSCANMASK
+10370005 L QZSS-USE_SLAS_DGNSS
+10370006 L QZSS-USE_SLAS_TESTMODE
+10370007 L QZSS-USE_SLAS_RAIM_UNCORR
+30370008 U QZSS-SLAS_MAX_BASELINE
+20410001 U ITFM-BBTHRESHOLD
+20410002 U ITFM-CWTHRESHOLD
+1041000d L ITFM-ENABLE
+20410010 E ITFM-ANTSETTING
+10410013 L ITFM-ENABLE_AUX
+20510001 U I2C-ADDRESS
+10510002 L I2C-EXTENDEDTIMEOUT
+10510003 L I2C-ENABLED
+40520001 U UART1-BAUDRATE
+20520002 E UART1-STOPBITS
+20520003 E UART1-DATABITS
+20520004 E UART1-PARITY
+10520005 L UART1-ENABLED
+40530001 U UART2-BAUDRATE
+20530002 E UART2-STOPBITS
+20530003 E UART2-DATABITS
+20530004 E UART2-PARITY
+10530005 L UART2-ENABLED
+10530006 L UART2-REMAP
+20640001 U SPI-MAXFF
+10640002 L SPI-CPOLARITY
+10640003 L SPI-CPHASE
+10640005 L SPI-EXTENDEDTIMEOUT
+10640006 L SPI-ENABLED
+10650001 L USB-ENABLED
+10650002 L USB-SELFPOW
+3065000a U USB-VENDOR_ID
+3065000b U USB-PRODUCT_ID
+3065000c U USB-POWER
+10710001 L I2CINPROT-UBX
+10710002 L I2CINPROT-NMEA
+10710004 L I2CINPROT-RTCM3X
+10710005 L I2CINPROT-SPARTN
+10720001 L I2COUTPROT-UBX
+10720002 L I2COUTPROT-NMEA
+10720004 L I2COUTPROT-RTCM3X
+10730001 L UART1INPROT-UBX
+10730002 L UART1INPROT-NMEA
+10730004 L UART1INPROT-RTCM3X
+10730005 L UART1INPROT-SPARTN
+10740001 L UART1OUTPROT-UBX
+10740002 L UART1OUTPROT-NMEA
+10740004 L UART1OUTPROT-RTCM3X
+10750001 L UART2INPROT-UBX
+10750002 L UART2INPROT-NMEA
+10750004 L UART2INPROT-RTCM3X
+10750005 L UART2INPROT-SPARTN
+10760001 L UART2OUTPROT-UBX
+10760002 L UART2OUTPROT-NMEA
+10760004 L UART2OUTPROT-RTCM3X
+10770001 L USBINPROT-UBX
+10770002 L USBINPROT-NMEA
+10770004 L USBINPROT-RTCM3X
+10770005 L USBINPROT-SPARTN
+10780001 L USBOUTPROT-UBX
+10780002 L USBOUTPROT-NMEA
+10780004 L USBOUTPROT-RTCM3X
+10790001 L SPIINPROT-UBX
+10790002 L SPIINPROT-NMEA
+10790004 L SPIINPROT-RTCM3X
+10790005 L SPIINPROT-SPARTN
+107a0001 L SPIOUTPROT-UBX
+107a0002 L SPIOUTPROT-NMEA
+107a0004 L SPIOUTPROT-RTCM3X
+20920001 X INFMSG-UBX_I2C
+20920002 X INFMSG-UBX_UART1
+20920003 X INFMSG-UBX_UART2
+20920004 X INFMSG-UBX_USB
+20920005 X INFMSG-UBX_SPI
+20920006 X INFMSG-NMEA_I2C
+20920007 X INFMSG-NMEA_UART1
+20920008 X INFMSG-NMEA_UART2
+20920009 X INFMSG-NMEA_USB
+2092000a X INFMSG-NMEA_SPI
+20930001 E NMEA-PROTVER
+20930002 E NMEA-MAXSVS
+10930003 L NMEA-COMPAT
+10930004 L NMEA-CONSIDER
+10930005 L NMEA-LIMIT82
+10930006 L NMEA-HIGHPREC
+20930007 E NMEA-SVNUMBERING
+10930011 L NMEA-FILT_GPS
+10930012 L NMEA-FILT_SBAS
+10930013 L NMEA-FILT_GAL
+10930015 L NMEA-FILT_QZSS
+10930016 L NMEA-FILT_GLO
+10930017 L NMEA-FILT_BDS
+10930021 L NMEA-OUT_INVFIX
+10930022 L NMEA-OUT_MSKFIX
+10930023 L NMEA-OUT_INVTIME
+10930024 L NMEA-OUT_INVDATE
+10930025 L NMEA-OUT_ONLYGPS
+10930026 L NMEA-OUT_FROZENCOG
+20930031 E NMEA-MAINTALKERID
+20930032 E NMEA-GSVTALKERID
+30930033 U NMEA-BDSTALKERID
+10a20001 L TXREADY-ENABLED
+10a20002 L TXREADY-POLARITY
+20a20003 U TXREADY-PIN
+30a20004 U TXREADY-THRESHOLD
+20a20005 E TXREADY-INTERFACE
+10a3002e L HW-ANT_CFG_VOLTCTRL
+10a3002f L HW-ANT_CFG_SHORTDET
+10a30030 L HW-ANT_CFG_SHORTDET_POL
+10a30031 L HW-ANT_CFG_OPENDET
+10a30032 L HW-ANT_CFG_OPENDET_POL
+10a30033 L HW-ANT_CFG_PWRDOWN
+10a30034 L HW-ANT_CFG_PWRDOWN_POL
+10a30035 L HW-ANT_CFG_RECOVER
+20a30036 U HW-ANT_SUP_SWITCH_PIN
+20a30037 U HW-ANT_SUP_SHORT_PIN
+20a30038 U HW-ANT_SUP_OPEN_PIN
+20a30054 E HW-ANT_SUP_ENGINE
+20a70001 E SPARTN-USE_SOURCE
+40b10011 U PMP-CENTER_FREQUENCY
+30b10012 U PMP-SEARCH_WINDOW
+30b10013 E PMP-DATA_RATE
+10b10014 L PMP-USE_DESCRAMBLER
+30b10015 U PMP-DESCRAMBLER_INIT
+10b10016 L PMP-USE_SERVICE_ID
+30b10017 U PMP-SERVICE_ID
+10b10019 L PMP-USE_PRESCRAMBLING
+50b1001a U PMP-UNIQUE_WORD
+20d00001 E PM-OPERATEMODE
+40d00002 U PM-POSUPDATEPERIOD
+40d00003 U PM-ACQPERIOD
+40d00004 U PM-GRIDOFFSET
+30d00005 U PM-ONTIME
+20d00006 U PM-MINACQTIME
+20d00007 U PM-MAXACQTIME
+10d00008 L PM-DONOTENTEROFF
+10d00009 L PM-WAITTIMEFIX
+10d0000a L PM-UPDATEEPH
+20d0000b E PM-EXTINTSEL
+10d0000c L PM-EXTINTWAKE
+10d0000d L PM-EXTINTBACKUP
+10d0000e L PM-EXTINTINACTIVE
+40d0000f U PM-EXTINTINACTIVITY
+10d00010 L PM-LIMITPEAKCURR
+"""
+
+# CFG-MSGOUT: the output rate of a message on each port (U1). One line per message:
+# the key ID for I2C, then the name. The other ports follow in MSGOUT_PORTS order
+CFG_MSGOUT_KEYS = """
+209100a6 NMEA_ID_DTM
+209100dd NMEA_ID_GBS
+209100ba NMEA_ID_GGA
+209100c9 NMEA_ID_GLL
+209100b5 NMEA_ID_GNS
+209100ce NMEA_ID_GRS
+209100bf NMEA_ID_GSA
+209100d3 NMEA_ID_GST
+209100c4 NMEA_ID_GSV
+20910400 NMEA_ID_RLM
+209100ab NMEA_ID_RMC
+209100e7 NMEA_ID_VLW
+209100b0 NMEA_ID_VTG
+209100d8 NMEA_ID_ZDA
+209100ec PUBX_ID_POLYP
+209100f1 PUBX_ID_POLYS
+209100f6 PUBX_ID_POLYT
+209102bd RTCM_3X_TYPE1005
+2091035e RTCM_3X_TYPE1074
+209102cc RTCM_3X_TYPE1077
+20910363 RTCM_3X_TYPE1084
+209102d1 RTCM_3X_TYPE1087
+20910368 RTCM_3X_TYPE1094
+20910318 RTCM_3X_TYPE1097
+2091036d RTCM_3X_TYPE1124
+209102d6 RTCM_3X_TYPE1127
+20910303 RTCM_3X_TYPE1230
+209102fe RTCM_3X_TYPE4072_0
+20910381 RTCM_3X_TYPE4072_1
+2091010f UBX_ESF_ALG
+20910114 UBX_ESF_INS
+20910277 UBX_ESF_MEAS
+2091029f UBX_ESF_RAW
+20910105 UBX_ESF_STATUS
+20910259 UBX_LOG_INFO
+2091034f UBX_MON_COMMS
+209101b4 UBX_MON_HW
+209101b9 UBX_MON_HW2
+20910354 UBX_MON_HW3
+209101a5 UBX_MON_IO
+20910196 UBX_MON_MSGPP
+20910359 UBX_MON_RF
+209101a0 UBX_MON_RXBUF
+20910187 UBX_MON_RXR
+2091038b UBX_MON_SPAN
+2091069d UBX_MON_SYS
+2091019b UBX_MON_TXBUF
+20910079 UBX_NAV_AOPSTATUS
+2091001f UBX_NAV_ATT
+20910065 UBX_NAV_CLOCK
+20910083 UBX_NAV_COV
+20910038 UBX_NAV_DOP
+20910313 UBX_NAV_EELL
+2091015f UBX_NAV_EOE
+209100a1 UBX_NAV_GEOFENCE
+2091002e UBX_NAV_HPPOSECEF
+20910033 UBX_NAV_HPPOSLLH
+2091007e UBX_NAV_ODO
+20910010 UBX_NAV_ORB
+20910415 UBX_NAV_PL
+20910024 UBX_NAV_POSECEF
+20910029 UBX_NAV_POSLLH
+20910006 UBX_NAV_PVT
+2091008d UBX_NAV_RELPOSNED
+20910015 UBX_NAV_SAT
+2091006a UBX_NAV_SBAS
+20910345 UBX_NAV_SIG
+20910336 UBX_NAV_SLAS
+2091001a UBX_NAV_STATUS
+20910088 UBX_NAV_SVIN
+20910051 UBX_NAV_TIMEBDS
+20910056 UBX_NAV_TIMEGAL
+2091004c UBX_NAV_TIMEGLO
+20910047 UBX_NAV_TIMEGPS
+20910060 UBX_NAV_TIMELS
+20910386 UBX_NAV_TIMEQZSS
+2091005b UBX_NAV_TIMEUTC
+2091003d UBX_NAV_VELECEF
+20910042 UBX_NAV_VELNED
+209106b6 UBX_RXM_COR
+20910204 UBX_RXM_MEASX
+2091031d UBX_RXM_PMP
+2091033f UBX_RXM_QZSSL6
+209102a4 UBX_RXM_RAWX
+2091025e UBX_RXM_RLM
+20910268 UBX_RXM_RTCM
+20910231 UBX_RXM_SFRBX
+20910605 UBX_RXM_SPARTN
+20910634 UBX_SEC_SIG
+20910178 UBX_TIM_TM2
+2091017d UBX_TIM_TP
+20910092 UBX_TIM_VRFY
+"""
+
+MSGOUT_PORTS = ('I2C', 'UART1', 'UART2', 'USB', 'SPI')
+
+_cfg_keys = None # Key ID to (name, type). Built on first use by cfg_keys()
+
+def cfg_keys():
+    """
+    Return the key ID to (name, type) lookup, parsing the tables the first time
+    """
+    global _cfg_keys
+    if _cfg_keys is None:
+        keys = {}
+        for line in CFG_KEYS.splitlines():
+            if line:
+                key, kind, name = line.split()
+                keys[int(key, 16)] = ('CFG-' + name, kind)
+        for line in CFG_MSGOUT_KEYS.splitlines():
+            if line:
+                key, name = line.split()
+                key = int(key, 16)
+                for port, port_name in enumerate(MSGOUT_PORTS):
+                    keys[key + port] = ('CFG-MSGOUT-{}_{}'.format(name, port_name), 'U')
+        _cfg_keys = keys
+    return _cfg_keys
+
+def cfg_value_size(key):
+    """
+    Return the size in bytes of the value of a key, or None if the size bits are invalid
+    """
+    return CFG_VALUE_SIZE.get((key >> 28) & 0x07)
+
+def cfg_key_info(key):
+    """
+    Return the (name, type) of a key. Unknown keys are named by their group and item IDs
+    and are typed as unsigned, or bitfield if they are larger than 4 bytes
+    """
+    info = cfg_keys().get(key)
+    if info is None:
+        kind = 'L' if (key >> 28) & 0x07 == 1 else 'X' if (key >> 28) & 0x07 == 5 else 'U'
+        info = ('CFG-0x{:02X}-0x{:03X}'.format((key >> 16) & 0xFF, key & 0xFFF), kind)
+    return info
+
+def cfg_value(kind, data):
+    """
+    Return the value of a key from its little-endian bytes: an int, or a float for type 'R'
+    """
+    if kind == 'R':
+        return struct.unpack('<f' if len(data) == 4 else '<d', data)[0]
+    return int.from_bytes(data, 'little', signed=(kind == 'I'))
+
+def cfg_frame_value(kind, data):
+    """
+    Return the value of a key for frame data: as cfg_value, but an unsigned or bitfield value of 8 bytes
+    is a hex string, as it may not fit in the signed 64-bit integers which frame data can hold
+    """
+    value = cfg_value(kind, data)
+    if len(data) == 8 and kind in ('U', 'X'):
+        return hex(value)
+    return value
+
+def iter_cfg_data(data, with_values=True):
+    """
+    Yield the (offset, key, size) of each key in a block of cfgData (key, value, key, value, ...) or,
+    if with_values is False, of keys. size is the value size (0 if with_values is False),
+    or None if the key is invalid, in which case it is the last key yielded.
+    A key or value which runs past the end of data is not yielded
+    """
+    offset = 0
+    length = len(data)
+    while offset + 4 <= length:
+        key = int.from_bytes(data[offset:offset + 4], 'little')
+        size = cfg_value_size(key) if with_values else 0
+        if size is not None and offset + 4 + size > length:
+            return
+        yield offset, key, size
+        if size is None:
+            return
+        offset += 4 + size
@@ -0,0 +1,90 @@
+"""
+Checksums used by the UBX, NMEA and RTCM protocols
+"""
+
+import sys
+from array import array
+from itertools import accumulate
+
+def ubx_checksum(data):
+    """
+    Return the UBX checksum (CK_A, CK_B) of a chunk of bytes (Class to the end of the payload).
+    CK_A is the sum of the bytes. CK_B is the sum of the running CK_A values.
+    """
+    return sum(data) & 0xFF, sum(accumulate(data)) & 0xFF
+
+def nmea_checksum(data):
+    """
+    Return the NMEA checksum of a chunk of bytes (between the '$' and the '*'): the Ex-Or of all the bytes
+    """
+    # Fold the bytes in half, as one big integer, until only one byte is left
+    value = int.from_bytes(data, 'little')
+    length = len(data)
+    while length > 1:
+        half = (length + 1) >> 1
+        value = (value & ((1 << (half << 3)) - 1)) ^ (value >> (half << 3))
+        length = half
+    return value
+
+# CRC-24Q Polynomial:
+# gi = 1 for i = 0, 1, 3, 4, 5, 6, 7, 10, 11, 14, 17, 18, 23, 24
+# 0b 1 1000 0110 0100 1100 1111 1011
+CRC24Q_POLY = 0x1864CFB
+
+def make_crc24q_table():
+    """
+    Return the 256 entry CRC-24Q lookup table: the CRC of each byte value, with seed 0
+    """
+    table = []
+    for value in range(256):
+        crc = value << 16
+        for i in range(8):
+            crc <<= 1
+            if (crc & 0x1000000):
+                crc ^= CRC24Q_POLY
+        table.append(crc & 0xFFFFFF)
+    return table
+
+CRC24Q_TABLE = make_crc24q_table()
+
+def crc24q_update(crc, value):
+    """
+    Add a single byte to a CRC-24Q
+    """
+    return ((crc << 8) & 0xFFFFFF) ^ CRC24Q_TABLE[(crc >> 16) ^ value]
+
+crc24q_table16 = None # 65536 entry table for two bytes at a time. Built by crc24q on first use
+
+def make_crc24q_table16():
+    """
+    Return the 65536 entry CRC-24Q lookup table: the CRC of each pair of bytes (first byte in the MS byte)
+    """
+    table = CRC24Q_TABLE
+    return [((table[pair >> 8] << 8) & 0xFFFFFF) ^ table[(table[pair >> 8] >> 16) ^ (pair & 0xFF)]
+            for pair in range(65536)]
+
+def crc24q(data, crc=0):
+    """
+    Add a chunk of bytes (bytes, bytearray, memoryview or mmap) to a CRC-24Q.
+    The RTCM seed is 0. Pass the previous result as crc to continue over several chunks.
+    Long chunks are processed two bytes at a time.
+    """
+    global crc24q_table16
+    length = len(data)
+    if length >= 64:
+        if crc24q_table16 is None:
+            crc24q_table16 = make_crc24q_table16()
+        table16 = crc24q_table16
+        pairs = array('H')
+        pairs.frombytes(data[:length & ~1])
+        if sys.byteorder == 'little':
+            pairs.byteswap() # Put the first byte of each pair in the MS byte
+        for pair in pairs:
+            crc = ((crc << 16) & 0xFFFFFF) ^ table16[(crc >> 8) ^ pair]
+        if not length & 1:
+            return crc
+        data = data[length - 1:]
+    table = CRC24Q_TABLE
+    for value in data:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ value]
+    return crc
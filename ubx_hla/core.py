@@ -0,0 +1,1952 @@
+"""
+The decoder for the SparkFun u-blox UBX High Level Analyzer, without Logic2
+
+Decoder holds the UBX, NMEA and RTCM state machine and the payload decoders. decode_many decodes
+a run of data bytes. decode_frame decodes the data of one async serial, I2C or SPI frame, given
+as its Logic2 type and data dict. Both return result records: (type, start_time, end_time, data)
+tuples, which are the AnalyzerFrame arguments. The times can be Logic2 GraphTimes, or numbers
+(e.g. seconds) - see Decoder.__init__. HighLevelAnalyzer.Hla is the Logic2 adapter.
+"""
+
+import struct
+from collections import deque
+from itertools import chain
+
+from .cfg_keys import cfg_frame_value, cfg_key_info, cfg_value_size, iter_cfg_data
+from .checksums import CRC24Q_TABLE
+from .instrument import Instrumentation
+from .statistics import StreamStatistics
+from .rtcm import RTCM_FIELDS, BitReader
+from .nmea import parse_sentence
+from .messages import UBX_CLASS, UBX_ID, UBX_CLASS_BY_NAME, UBX_ID_BY_NAME, UBX_MAX_PAYLOAD, UBX_MAX_PAYLOAD_DEFAULT
+from .framing import (HEADER_BYTES, NMEA_END, NMEA_HEX, NMEA_MAX_CHARACTERS, NMEA_MAX_LENGTH, NMEA_START,
+                      NMEA_TERMINATOR, RTCM_MAX_LENGTH, RTCM_PREAMBLE, UBX_SYNC, rtcm_length, ubx_payload_limit)
+
+BITS_PER_BYTE = 10 # Async serial start bit, 8 data bits and stop bit. I2C (9) and SPI (8) are a little shorter
+BYTE_PERIOD_SAMPLES = 1000 # Number of byte periods measured when the baud rate is 0
+
+def parse_i2c_addresses(text):
+    """
+    Return the list of I2C addresses in a string of decimal or 0x hex addresses, separated by commas or spaces
+    """
+    addresses = []
+    for address in text.replace(',', ' ').split():
+        try:
+            number = int(address, 0)
+        except ValueError:
+            number = 0
+        if not 1 <= number <= 127:
+            raise ValueError('Invalid I2C address: ' + address)
+        if number not in addresses:
+            addresses.append(number)
+    return addresses
+
+# UBX payload field schemas
+#
+# Each field is described by a tuple: (offset, size, kind, name, format)
+#   kind:   'U' unsigned, 'S' signed, 'R' floating point, 'C' character string, 'X' array of single bytes,
+#           'B' block of bytes
+#   format: 'hex' or 'dec'. Only used by 'U' and 'X'
+# The name of an 'X' field is a format string which is passed the array index.
+# Messages with a variable layout are described by a function which returns the fields
+# for a given payload length, u-blox module and message version (payload byte 0).
+
+def cfg_prt_fields(length, module, version):
+    # there are both messages with lengths 1 and 20 on M6 _and_ M8, they almost completely match
+    if length == 1:
+        return ((0, 1, 'U', 'portID ', 'hex'),)
+    if length != 20:
+        return ()
+    m6 = module == 'M6'
+    return (
+        (0, 1, 'U', 'portID ', 'hex'),
+        (1, 1, 'U', 'reserved0 ' if m6 else 'reserved1 ', 'hex'), # called 'reserved0' on M6 and 'reserved1' on M8
+        (2, 2, 'U', 'txReady ', 'hex'),
+        (4, 4, 'U', 'mode ', 'hex'),
+        (8, 4, 'U', 'baudrate ', 'dec'),
+        (12, 2, 'U', 'inProtoMask ', 'hex'),
+        (14, 2, 'U', 'outProtoMask ', 'hex'),
+        (16, 2, 'U', 'reserved4 ' if m6 else 'flags ', 'hex'), # called 'reserved4' on M6 and 'flags' on M8
+        (18, 2, 'U', 'reserved5 ' if m6 else 'reserved2 ', 'hex'), # called 'reserved5' on M6 and 'reserved2' on M8
+    )
+
+def cfg_msg_fields(length, module, version):
+    # there are messages with lengths 2, 3 and 8 on M6 _and_ M8, the field sizes and names completely match
+    if length not in [2, 3, 8]:
+        return ()
+    fields = (
+        (0, 1, 'U', 'msgClass ', 'hex'), # datasheet states U1, but hex makes more sense to interpret
+        (1, 1, 'U', 'msgId ', 'hex'), # datasheet states U1, but hex makes more sense to interpret
+    )
+    if length in [3, 8]:
+        fields += ((2, 1, 'U', 'rate ', 'dec'),)
+    if length == 8:
+        fields += tuple((p, 1, 'U', 'rate ', 'dec') for p in range(3, 7+1))
+    return fields
+
+def cfg_val_fields(length, module, version):
+    # CFG-VALSET and VALDEL: version 1 has a transaction byte. The keys (and values) are decoded by analyze_cfg_val
+    fields = (
+        (0, 1, 'U', 'version ', 'dec'),
+        (1, 1, 'U', 'layers ', 'hex'),
+    )
+    if version == 1:
+        fields += ((2, 1, 'U', 'transaction ', 'hex'),)
+    return fields
+
+def cfg_rst_fields(length, module, version):
+    # there are messages with length 4 on M6 _and_ M8, the field sizes and names completely match
+    if length != 4:
+        return ()
+    return (
+        (0, 2, 'U', 'navBbrMask ', 'hex'),
+        (2, 1, 'U', 'resetMode ', 'dec'),
+        (3, 1, 'U', 'reserved1 ', 'dec'),
+    )
+
+def mon_hw_fields(length, module, version):
+    # M8: 60 Bytes (VP is 17 bytes). M6: 68 Bytes (VP is 25 bytes).
+    lastByte = length - 1
+    return (
+        (0, 4, 'U', 'pinSel ', 'hex'),
+        (4, 4, 'U', 'pinBank ', 'hex'),
+        (8, 4, 'U', 'pinDir ', 'hex'),
+        (12, 4, 'U', 'pinVal ', 'hex'),
+        (16, 2, 'U', 'noisePerMS ', 'dec'),
+        (18, 2, 'U', 'agcCnt ', 'dec'),
+        (20, 1, 'U', 'aStatus ', 'dec'),
+        (21, 1, 'U', 'aPower ', 'dec'),
+        (22, 1, 'U', 'flags ', 'hex'),
+        (23, 1, 'U', 'reserved1 ', 'hex'),
+        (24, 4, 'U', 'usedMask ', 'hex'),
+        (28, lastByte - 15 - 28 + 1, 'X', 'VP{} ', 'dec'),
+        (lastByte - 14, 1, 'U', 'jamInd ', 'dec'),
+        (lastByte - 13, 2, 'U', 'reserved2 ', 'hex'),
+        (lastByte - 11, 4, 'U', 'pinIrq ', 'hex'),
+        (lastByte - 7, 4, 'U', 'pullH ', 'hex'),
+        (lastByte - 3, 4, 'U', 'pullL ', 'hex'),
+    )
+
+def mon_ver_fields(length, module, version):
+    # M6 sends swVersion[30], hwVersion[10], romVersion[30], extension[30 * N]
+    # M8 sends swVersion[30], hwVersion[10], extension[30 * N]
+    fields = (
+        (0, 30, 'C', 'swVersion ', None),
+        (30, 10, 'C', 'hwVersion ', None),
+    )
+    startByte = 40
+    if module == 'M6':
+        fields += ((40, 30, 'C', 'romVersion ', None),)
+        startByte = 70
+    fields += tuple((s, 30, 'C', 'extension ', None) for s in range(startByte, length, 30))
+    return fields
+
+def rxm_pmp_fields(length, module, version):
+    fields = (
+        (0, 1, 'U', 'version ', 'dec'),
+        (4, 4, 'U', 'timeTag ', 'dec'),
+        (8, 4, 'U', 'uniqueWord[0] ', 'hex'),
+        (12, 4, 'U', 'uniqueWord[1] ', 'hex'),
+        (16, 2, 'U', 'serviceIdentifier ', 'dec'),
+        (18, 1, 'U', 'spare ', 'dec'),
+        (19, 1, 'U', 'uniqueWordBitErrors ', 'dec'),
+    )
+    if version == 0x01:
+        return fields + (
+            (1, 1, 'U', 'reserved0 ', 'hex'),
+            (2, 2, 'U', 'numBytesUserData ', 'dec'),
+            (20, 2, 'U', 'fecBits ', 'dec'),
+            (22, 1, 'U', 'ebno ', 'dec'),
+            (23, 1, 'U', 'reserved1 ', 'hex'),
+            (24, length - 24, 'B', 'userData', None),
+        )
+    else:  # PMP version == 0
+        return fields + (
+            (1, 3, 'U', 'reserved0 ', 'hex'),
+            (20, 504, 'B', 'userData', None),
+            (524, 2, 'U', 'fecBits ', 'dec'),
+            (526, 1, 'U', 'ebno ', 'dec'),
+            (527, 1, 'U', 'reserved1 ', 'hex'),
+        )
+
+def inf_fields(length, module, version):
+    return ((0, length, 'C', '', None),)
+
+# ESF-INS and HNR-INS have the same layout
+INS_FIELDS = (
+    (0, 4, 'U', 'bitfield0 ', 'hex'),
+    (8, 4, 'U', 'iTOW ', 'dec'),
+    (12, 4, 'S', 'xAngRate ', None),
+    (16, 4, 'S', 'yAngRate ', None),
+    (20, 4, 'S', 'zAngRate ', None),
+    (24, 4, 'S', 'xAccel ', None),
+    (28, 4, 'S', 'yAccel ', None),
+    (32, 4, 'S', 'zAccel ', None),
+)
+
+# ESF sensor data types: (name, scale). Wheel ticks have no scale
+ESF_DATA_TYPES = {
+    5: ('gyroZ', 2 ** -12), # deg/s
+    6: ('wheelFL', None),
+    7: ('wheelFR', None),
+    8: ('wheelRL', None),
+    9: ('wheelRR', None),
+    10: ('ticks', None),
+    11: ('speed', 1e-3), # m/s
+    12: ('gyroTemp', 1e-2), # deg C
+    13: ('gyroY', 2 ** -12),
+    14: ('gyroX', 2 ** -12),
+    16: ('accelX', 2 ** -10), # m/s^2
+    17: ('accelY', 2 ** -10),
+    18: ('accelZ', 2 ** -10),
+}
+
+def esf_data_summary(values):
+    # ESF-MEAS and ESF-RAW data: bits 0-23 are the dataField, bits 24-29 the dataType.
+    # The dataField is signed, except for wheel ticks: a 23-bit count and a direction bit
+    data = values['data']
+    data_type = (data >> 24) & 0x3F
+    field = data & 0xFFFFFF
+    name, scale = ESF_DATA_TYPES.get(data_type, ('type{}'.format(data_type), 1))
+    values['dataType'] = data_type
+    values['sensor'] = name
+    if scale is None:
+        values['value'] = field & 0x7FFFFF
+        values['backward'] = field >> 23
+        return '{} {}{}'.format(name, values['value'], ' backward' if values['backward'] else '')
+    if field & 0x800000:
+        field -= 0x1000000
+    values['value'] = round(field * scale, 6)
+    return '{} {}'.format(name, values['value'])
+
+def esf_raw_summary(values):
+    return '{} sTtag {}'.format(esf_data_summary(values), values['sTtag'])
+
+def esf_meas_count(payload):
+    return payload[5] >> 3 # numMeas: bits 11-15 of flags
+
+def esf_status_summary(values):
+    # sensStatus1: bits 0-5 are the type, bit 6 used, bit 7 ready. sensStatus2: bits 0-1 are calibStatus
+    status = values['sensStatus1']
+    values['sensor'] = ESF_DATA_TYPES.get(status & 0x3F, ('type{}'.format(status & 0x3F),))[0]
+    return '{} used {} ready {} calib {} freq {} faults 0x{:02X}'.format(
+        values['sensor'], (status >> 6) & 1, status >> 7, values['sensStatus2'] & 0x03, values['freq'], values['faults'])
+
+def decode_field_values(data, fields):
+    """
+    Return the values of the fields in a chunk of payload, keyed by field name.
+    A name which the schema repeats (e.g. the CFG-MSG rate of each port) is keyed as name[0], name[1], ...
+    Fields which start past the end of the chunk are skipped
+    """
+    length = len(data)
+    values = {}
+    counts = {}
+    for field in fields:
+        counts[field[3]] = counts.get(field[3], 0) + 1
+    repeats = {}
+    for offset, size, kind, name, fmt in fields:
+        if offset >= length:
+            continue
+        field = data[offset:offset + size]
+        key = name.strip()
+        if counts[name] > 1:
+            repeat = repeats.get(name, 0)
+            repeats[name] = repeat + 1
+            key = '{}[{}]'.format(key, repeat)
+        if kind == 'U':
+            values[key] = int.from_bytes(field, 'little')
+        elif kind == 'S':
+            values[key] = int.from_bytes(field, 'little', signed=True)
+        elif kind == 'R' and len(field) == size:
+            values[key] = struct.unpack('<d' if size == 8 else '<f', field)[0]
+        elif kind == 'C':
+            values[key or 'text'] = field.decode('latin-1').rstrip('\x00') # Strip the NUL padding
+        elif kind == 'X':
+            for index, value in enumerate(field):
+                values[name.format(index).strip()] = value
+        else:
+            values[key] = bytes(field)
+    return values
+
+class Decoder:
+    """
+    Decode the UBX, NMEA and RTCM messages in the data bytes of async serial, I2C and SPI frames
+    """
+
+    # The framing rules are in ubx_hla.framing, shared with ubx_hla.stream.Scanner
+    sync_char_1, sync_char_2 = UBX_SYNC # UBX preamble sync 1 and 2
+    dollar = NMEA_START[0] # NMEA start delimiter
+    asterix = NMEA_END[0] # NMEA checksum delimiter
+    carriage_return, line_feed = NMEA_TERMINATOR
+    rtcm_preamble = RTCM_PREAMBLE[0] # RTCM preamble
+    header_bytes = HEADER_BYTES
+
+    # Bytes kept for re-scanning after a checksum or framing failure: the largest frame (UBX header,
+    # payload and checksum), and the byte after a timeout gap. A failed frame always starts with its header
+    lookback_size = max(UBX_MAX_PAYLOAD_DEFAULT, *UBX_MAX_PAYLOAD.values()) + 9
+
+    # Sync 'state machine'
+    looking_for_B5_dollar_D3    = 0 # Looking for UBX 0xB5, NMEA '$' or RTCM 0xD3
+    looking_for_sync_2          = 1 # Looking for UBX sync char 2 0x62
+    looking_for_class           = 2 # Looking for UBX class byte
+    looking_for_ID              = 3 # Looking for UBX ID byte
+    looking_for_length_LSB      = 4 # Looking for UBX length bytes
+    looking_for_length_MSB      = 5
+    processing_UBX_payload      = 6 # Processing the UBX payload. Keep going until length bytes have been processed
+    looking_for_checksum_A      = 7 # Looking for UBX checksum bytes
+    looking_for_checksum_B      = 8
+    sync_lost                   = 9 # Go into this state if sync is lost (bad checksum etc.)
+    looking_for_asterix         = 10 # Looking for NMEA '*'
+    looking_for_csum1           = 11 # Looking for NMEA checksum bytes
+    looking_for_csum2           = 12
+    looking_for_term1           = 13 # Looking for NMEA terminating bytes (CR and LF)
+    looking_for_term2           = 14
+    looking_for_RTCM_len1       = 15 # Looking for RTCM length byte (2 MS bits)
+    looking_for_RTCM_len2       = 16 # Looking for RTCM length byte (8 LS bits)
+    looking_for_RTCM_type1      = 17 # Looking for RTCM Type byte (8 MS bits, first byte of the payload)
+    looking_for_RTCM_type2      = 18 # Looking for RTCM Type byte (4 LS bits, second byte of the payload)
+    processing_RTCM_payload     = 19 # Processing RTCM payload bytes
+    looking_for_RTCM_csum1      = 20 # Looking for the first 8 bits of the CRC-24Q checksum
+    looking_for_RTCM_csum2      = 21 # Looking for the second 8 bits of the CRC-24Q checksum
+    looking_for_RTCM_csum3      = 22 # Looking for the third 8 bits of the CRC-24Q checksum
+
+    # Mini state machine to avoid I2C Bytes-Available being decoded as data
+    decode_normal = 0       # Decode bytes as normal
+    write_seen_check_FD = 1 # Go into this state when a _write_ to i2c_address is seen
+    FD_seen_check_read = 2  # Go into this state if 0xFD is seen immediately after the write
+    ignore_avail_LSB = 3    # Ignore this byte - it is the LSB of Bytes-Available
+    ignore_avail_MSB = 4    # Ignore this byte - it is the MSB of Bytes-Available
+
+    # UBX Class and ID names and reverse lookups - see ubx_hla.messages
+    UBX_CLASS = UBX_CLASS
+    UBX_ID = UBX_ID
+    UBX_CLASS_BY_NAME = UBX_CLASS_BY_NAME
+    UBX_ID_BY_NAME = UBX_ID_BY_NAME
+
+    # UBX payload field schemas - see cfg_prt_fields for the format
+    UBX_FIELDS = {
+        # ACK - decoded by analyze_ack in per-field mode
+        ("ACK", "ACK"): (
+            (0, 1, 'U', 'clsID ', 'hex'),
+            (1, 1, 'U', 'msgID ', 'hex'),
+        ),
+        ("ACK", "NACK"): (
+            (0, 1, 'U', 'clsID ', 'hex'),
+            (1, 1, 'U', 'msgID ', 'hex'),
+        ),
+        # CFG
+        ("CFG", "MSG"): cfg_msg_fields,
+        ("CFG", "PRT"): cfg_prt_fields,
+        ("CFG", "RST"): cfg_rst_fields,
+        ("CFG", "VALDEL"): cfg_val_fields,
+        ("CFG", "VALGET"): (
+            (0, 1, 'U', 'version ', 'dec'),
+            (1, 1, 'U', 'layer ', 'dec'),
+            (2, 2, 'U', 'position ', 'dec'),
+        ),
+        ("CFG", "VALSET"): cfg_val_fields,
+        # ESF - the repeated blocks are decoded by analyze_blocks
+        ("ESF", "INS"): INS_FIELDS,
+        ("ESF", "MEAS"): (
+            (0, 4, 'U', 'timeTag ', 'dec'),
+            (4, 2, 'U', 'flags ', 'hex'),
+            (6, 2, 'U', 'providerId ', 'dec'), # id. Renamed as it would hide the message ID in per-message mode
+        ),
+        ("ESF", "RAW"): (
+            (0, 4, 'U', 'reserved1 ', 'hex'),
+        ),
+        ("ESF", "STATUS"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 1, 'U', 'version ', 'dec'),
+            (12, 1, 'U', 'fusionMode ', 'dec'),
+            (15, 1, 'U', 'numSens ', 'dec'),
+        ),
+        # HNR
+        ("HNR", "ATT"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 1, 'U', 'version ', 'dec'),
+            (8, 4, 'S', 'roll ', None),
+            (12, 4, 'S', 'pitch ', None),
+            (16, 4, 'S', 'heading ', None),
+            (20, 4, 'U', 'accRoll ', 'dec'),
+            (24, 4, 'U', 'accPitch ', 'dec'),
+            (28, 4, 'U', 'accHeading ', 'dec'),
+        ),
+        ("HNR", "INS"): INS_FIELDS,
+        ("HNR", "PVT"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 2, 'U', 'year ', 'dec'),
+            (6, 1, 'U', 'month ', 'dec'),
+            (7, 1, 'U', 'day ', 'dec'),
+            (8, 1, 'U', 'hour ', 'dec'),
+            (9, 1, 'U', 'min ', 'dec'),
+            (10, 1, 'U', 'sec ', 'dec'),
+            (11, 1, 'U', 'valid ', 'hex'),
+            (12, 4, 'S', 'nano ', None),
+            (16, 1, 'U', 'gpsFix ', 'dec'),
+            (17, 1, 'U', 'flags ', 'hex'),
+            (20, 4, 'S', 'lon ', None),
+            (24, 4, 'S', 'lat ', None),
+            (28, 4, 'S', 'height ', None),
+            (32, 4, 'S', 'hMSL ', None),
+            (36, 4, 'S', 'gSpeed ', None),
+            (40, 4, 'S', 'speed ', None),
+            (44, 4, 'S', 'headMot ', None),
+            (48, 4, 'S', 'headVeh ', None),
+            (52, 4, 'U', 'hAcc ', 'dec'),
+            (56, 4, 'U', 'vAcc ', 'dec'),
+            (60, 4, 'U', 'sAcc ', 'dec'),
+            (64, 4, 'U', 'headAcc ', 'dec'),
+        ),
+        # INF
+        ("INF", "ERROR"): inf_fields,
+        ("INF", "NOTICE"): inf_fields,
+        ("INF", "WARNING"): inf_fields,
+        # MON
+        ("MON", "HW"): mon_hw_fields,
+        ("MON", "RF"): (
+            (0, 1, 'U', 'version ', 'dec'),
+            (1, 1, 'U', 'nBlocks ', 'dec'),
+        ),
+        ("MON", "VER"): mon_ver_fields,
+        # NAV
+        ("NAV", "POSECEF"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 4, 'S', 'ecefX ', None),
+            (8, 4, 'S', 'ecefY ', None),
+            (12, 4, 'S', 'ecefZ ', None),
+            (16, 4, 'U', 'pAcc ', 'dec'),
+        ),
+        ("NAV", "POSLLH"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 4, 'S', 'lon ', None),
+            (8, 4, 'S', 'lat ', None),
+            (12, 4, 'S', 'height ', None),
+            (16, 4, 'S', 'hMSL ', None),
+            (20, 4, 'U', 'hAcc ', 'dec'),
+            (24, 4, 'U', 'vAcc ', 'dec'),
+        ),
+        ("NAV", "PVT"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 2, 'U', 'year ', 'dec'),
+            (6, 1, 'U', 'month ', 'dec'),
+            (7, 1, 'U', 'day ', 'dec'),
+            (8, 1, 'U', 'hour ', 'dec'),
+            (9, 1, 'U', 'min ', 'dec'),
+            (10, 1, 'U', 'sec ', 'dec'),
+            (11, 1, 'U', 'valid ', 'hex'),
+            (12, 4, 'U', 'tAcc ', 'dec'),
+            (16, 4, 'S', 'nano ', None),
+            (20, 1, 'U', 'fixType ', 'dec'),
+            (21, 1, 'U', 'flags ', 'hex'),
+            (22, 1, 'U', 'flags2 ', 'hex'),
+            (23, 1, 'U', 'numSV ', 'dec'),
+            (24, 4, 'S', 'lon ', None),
+            (28, 4, 'S', 'lat ', None),
+            (32, 4, 'S', 'height ', None),
+            (36, 4, 'S', 'hMSL ', None),
+            (40, 4, 'U', 'hAcc ', 'dec'),
+            (44, 4, 'U', 'vAcc ', 'dec'),
+            (48, 4, 'S', 'velN ', None),
+            (52, 4, 'S', 'velE ', None),
+            (56, 4, 'S', 'velD ', None),
+            (60, 4, 'S', 'gSpeed ', None),
+            (64, 4, 'S', 'headMot ', None),
+            (68, 4, 'U', 'sAcc ', 'dec'),
+            (72, 4, 'U', 'headAcc ', 'dec'),
+            (76, 2, 'U', 'pDOP ', 'dec'),
+            (78, 2, 'U', 'flags3 ', 'hex'),
+            (80, 4, 'U', 'reserved0 ', 'hex'),
+            (84, 4, 'S', 'headVeh ', None),
+            (88, 2, 'S', 'magDec ', None),
+            (90, 2, 'S', 'magAcc ', None),
+        ),
+        ("NAV", "SAT"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 1, 'U', 'version ', 'dec'),
+            (5, 1, 'U', 'numSvs ', 'dec'),
+        ),
+        ("NAV", "SIG"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 1, 'U', 'version ', 'dec'),
+            (5, 1, 'U', 'numSigs ', 'dec'),
+        ),
+        ("NAV", "STATUS"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 1, 'U', 'gpsFix ', 'hex'),
+            (5, 1, 'U', 'flags ', 'hex'),
+            (6, 1, 'U', 'fixStat ', 'hex'),
+            (7, 1, 'U', 'flags2 ', 'hex'),
+            (8, 4, 'U', 'ttff ', 'dec'),
+            (12, 4, 'U', 'msss ', 'dec'),
+        ),
+        ("NAV", "SVIN"): (
+            (0, 1, 'U', 'version ', 'dec'),
+            (4, 4, 'U', 'iTOW ', 'dec'),
+            (8, 4, 'U', 'dur ', 'dec'),
+            (12, 4, 'S', 'meanX ', None),
+            (16, 4, 'S', 'meanY ', None),
+            (20, 4, 'S', 'meanZ ', None),
+            (24, 1, 'S', 'meanXHP ', None),
+            (25, 1, 'S', 'meanYHP ', None),
+            (26, 1, 'S', 'meanZHP ', None),
+            (28, 4, 'U', 'meanAcc ', 'dec'),
+            (32, 4, 'U', 'obs ', 'dec'),
+            (36, 1, 'U', 'valid ', 'dec'),
+            (37, 1, 'U', 'active ', 'dec'),
+        ),
+        ("NAV", "TIMEGPS"): (
+            (0, 4, 'U', 'iTOW ', 'dec'),
+            (4, 4, 'S', 'fTOW ', None),
+            (8, 2, 'S', 'week ', None),
+            (10, 1, 'S', 'leapS ', None),
+            (11, 1, 'U', 'valid ', 'hex'),
+            (12, 4, 'U', 'tAcc ', 'hex'),
+        ),
+        # RXM
+        ("RXM", "PMP"): rxm_pmp_fields,
+        ("RXM", "RAWX"): (
+            (0, 8, 'R', 'rcvTow ', None),
+            (8, 2, 'U', 'week ', 'dec'),
+            (10, 1, 'S', 'leapS ', None),
+            (11, 1, 'U', 'numMeas ', 'dec'),
+            (12, 1, 'U', 'recStat ', 'hex'),
+            (13, 1, 'U', 'version ', 'dec'),
+        ),
+    }
+
+    # Messages with a header (described by UBX_FIELDS) followed by repeated blocks:
+    # (offset of the first block, block size, block name, summary format, block field schema)
+    # and optionally (block count function, trailer field schema)
+    # Each block is shown as one frame. The summary is formatted with the block's field values,
+    # or is a function which is passed them (and may add to them).
+    # The block count function is passed the payload header. Without one, the blocks fill the payload.
+    # The trailer fields follow the last block
+    UBX_BLOCKS = {
+        ("ESF", "MEAS"): (8, 4, 'data', esf_data_summary, (
+            (0, 4, 'U', 'data ', 'hex'),
+        ), esf_meas_count, (
+            (0, 4, 'U', 'calibTtag ', 'dec'),
+        )),
+        ("ESF", "RAW"): (4, 8, 'data', esf_raw_summary, (
+            (0, 4, 'U', 'data ', 'hex'),
+            (4, 4, 'U', 'sTtag ', 'dec'),
+        )),
+        ("ESF", "STATUS"): (16, 4, 'sens', esf_status_summary, (
+            (0, 1, 'U', 'sensStatus1 ', 'hex'),
+            (1, 1, 'U', 'sensStatus2 ', 'hex'),
+            (2, 1, 'U', 'freq ', 'dec'),
+            (3, 1, 'U', 'faults ', 'hex'),
+        )),
+        ("MON", "RF"): (4, 24, 'rf', 'id {blockId} noise {noisePerMS} agc {agcCnt} jam {jamInd}', (
+            (0, 1, 'U', 'blockId ', 'dec'),
+            (1, 1, 'U', 'flags ', 'hex'),
+            (2, 1, 'U', 'antStatus ', 'dec'),
+            (3, 1, 'U', 'antPower ', 'dec'),
+            (4, 4, 'U', 'postStatus ', 'hex'),
+            (12, 2, 'U', 'noisePerMS ', 'dec'),
+            (14, 2, 'U', 'agcCnt ', 'dec'),
+            (16, 1, 'U', 'jamInd ', 'dec'),
+            (17, 1, 'S', 'ofsI ', None),
+            (18, 1, 'U', 'magI ', 'dec'),
+            (19, 1, 'S', 'ofsQ ', None),
+            (20, 1, 'U', 'magQ ', 'dec'),
+        )),
+        ("NAV", "SAT"): (8, 12, 'sv', '{gnssId}:{svId} cno {cno} elev {elev} azim {azim}', (
+            (0, 1, 'U', 'gnssId ', 'dec'),
+            (1, 1, 'U', 'svId ', 'dec'),
+            (2, 1, 'U', 'cno ', 'dec'),
+            (3, 1, 'S', 'elev ', None),
+            (4, 2, 'S', 'azim ', None),
+            (6, 2, 'S', 'prRes ', None),
+            (8, 4, 'U', 'flags ', 'hex'),
+        )),
+        ("NAV", "SIG"): (8, 16, 'sig', '{gnssId}:{svId} sig {sigId} cno {cno} quality {qualityInd}', (
+            (0, 1, 'U', 'gnssId ', 'dec'),
+            (1, 1, 'U', 'svId ', 'dec'),
+            (2, 1, 'U', 'sigId ', 'dec'),
+            (3, 1, 'U', 'freqId ', 'dec'),
+            (4, 2, 'S', 'prRes ', None),
+            (6, 1, 'U', 'cno ', 'dec'),
+            (7, 1, 'U', 'qualityInd ', 'dec'),
+            (8, 1, 'U', 'corrSource ', 'dec'),
+            (9, 1, 'U', 'ionoModel ', 'dec'),
+            (10, 2, 'U', 'sigFlags ', 'hex'),
+        )),
+        ("RXM", "RAWX"): (16, 32, 'meas', '{gnssId}:{svId} sig {sigId} cno {cno} pr {prMes:.3f}', (
+            (0, 8, 'R', 'prMes ', None),
+            (8, 8, 'R', 'cpMes ', None),
+            (16, 4, 'R', 'doMes ', None),
+            (20, 1, 'U', 'gnssId ', 'dec'),
+            (21, 1, 'U', 'svId ', 'dec'),
+            (22, 1, 'U', 'sigId ', 'dec'),
+            (23, 1, 'U', 'freqId ', 'dec'),
+            (24, 2, 'U', 'locktime ', 'dec'),
+            (26, 1, 'U', 'cno ', 'dec'),
+            (27, 1, 'U', 'prStdev ', 'hex'),
+            (28, 1, 'U', 'cpStdev ', 'hex'),
+            (29, 1, 'U', 'doStdev ', 'hex'),
+            (30, 1, 'U', 'trkStat ', 'hex'),
+        )),
+    }
+
+    # Payload decoders for messages which are not (only) described by UBX_FIELDS.
+    # Any other message is decoded by analyze_fields
+    UBX_DECODERS = {
+        ("ACK", "ACK"): 'analyze_ack',
+        ("ACK", "NACK"): 'analyze_ack',
+        ("RXM", "PMP"): 'analyze_versioned_fields', # field layout depends on the version byte
+        ("CFG", "VALDEL"): 'analyze_cfg_val',
+        ("CFG", "VALGET"): 'analyze_cfg_val',
+        ("CFG", "VALSET"): 'analyze_cfg_val',
+    }
+
+    # Per-message mode: methods which return the values of the parts of a payload which
+    # UBX_FIELDS cannot describe. They are added to the values of the fields
+    UBX_VALUE_DECODERS = {
+        ("CFG", "VALDEL"): 'cfg_val_values',
+        ("CFG", "VALGET"): 'cfg_val_values',
+        ("CFG", "VALSET"): 'cfg_val_values',
+    }
+
+    # Output formatting options, for Logic2
+    result_types = {
+        'message': {
+            'format': '{{{data.str}}}'
+        },
+        'error': {
+            'format': 'Error!'
+        },
+        # Decoded fields. The value is an int, so it can be post-processed from the data table
+        'field': {
+            'format': '{{data.field}} {{data.value}}'
+        },
+        'hex_field': {
+            'format': '{{data.field}} {{data.hex}}'
+        },
+        # One repeated block of a message, e.g. one satellite of NAV-SAT
+        'block': {
+            'format': '{{data.block}} {{data.summary}}'
+        },
+        # Several fields completed by the same byte (RTCM fields are not byte-aligned)
+        'fields': {
+            'format': '{{data.summary}}'
+        },
+        # A frame with an impossible length. Decoding resumes at the next header
+        'length_error': {
+            'format': 'INVALID {{data.protocol}} LENGTH {{data.length}} > {{data.limit}}'
+        },
+        # A frame whose next byte did not arrive within the inter-byte timeout
+        'timeout': {
+            'format': 'TIMEOUT after {{data.bytes}} bytes'
+        },
+        # Whole messages, in per-message mode
+        'ubx': {
+            'format': '{{data.class}}-{{data.id}} {{data.checksum}}'
+        },
+        'nmea': {
+            'format': '{{data.sentence}} {{data.checksum}}'
+        },
+        'rtcm': {
+            'format': 'RTCM {{data.type}} {{data.checksum}}'
+        },
+        # Message rates and errors every Statistics Interval. See ubx_hla/statistics.py
+        'statistics': {
+            'format': 'Statistics: {{data.summary}}'
+        },
+        # Decoder instrumentation counters. See ubx_hla/instrument.py
+        'instrumentation': {
+            'format': 'Instrumentation: {{data.bytes}} bytes in {{data.seconds}} s. {{data.summary}}'
+        },
+    }
+
+    def __init__(self, i2c_address=0x42, i2c_addresses='', spi_channel='miso', ublox_module='M8',
+                 detail='per-field', baud_rate=0, timeout_periods=0, time_delta=float, instrument=False,
+                 instrument_interval=10, statistics_interval=0):
+        """
+        The settings are those of the Logic2 analyzer. time_delta converts seconds to the type of the
+        difference between two times: GraphTimeDelta for Logic2 GraphTimes, float for times in seconds.
+        If instrument is True, the bytes, frames and decode time of each state and message type are
+        counted in self.instrumentation, and summarised every instrument_interval seconds of capture time.
+        If statistics_interval is not 0, a statistics frame shows the message rates and errors every
+        statistics_interval seconds of capture time
+        """
+        self.i2c_address = i2c_address
+        self.i2c_addresses = i2c_addresses
+        self.spi_channel = spi_channel
+        self.ublox_module = ublox_module
+        self.detail = detail
+        self.baud_rate = baud_rate
+        self.timeout_periods = timeout_periods
+        self.time_delta = time_delta
+
+        self.init_decoder()
+
+        # I2C: each address has its own decoder context (decode state, checksums, Bytes-Available
+        # state machine), so one pass over the bus decodes every device. This instance is the context
+        # of the first address. The others are created by new_context
+        addresses = parse_i2c_addresses(self.i2c_addresses or '') or [self.i2c_address]
+        self.i2c_contexts = {addresses[0]: self}
+        for address in addresses[1:]:
+            self.i2c_contexts[address] = self.new_context()
+        self.tag_address = len(addresses) > 1  # Add the address to the data of each frame
+
+        # For I2C, we need a way to ignore any traffic to/from other devices on the bus otherwise
+        # it can confuse the decoder. Only analyze data when self.context is not None.
+        self.context = self
+        self.context_address = addresses[0]
+
+        # SPI: the channels to decode, and their contexts. In 'both' mode, MOSI has its own context
+        if self.spi_channel == 'both':
+            self.spi_contexts = (('miso', self), ('mosi', self.new_context()))
+        else:
+            self.spi_contexts = ((self.spi_channel, self),)
+
+        contexts = set(self.i2c_contexts.values()) | set(context for channel, context in self.spi_contexts)
+        self.contexts = contexts
+        self.report_end = None  # End time of the last statistics or instrumentation frame
+
+        # Stream statistics: every context counts its messages and failures in the same StreamStatistics
+        if statistics_interval:
+            statistics = StreamStatistics(self, contexts, statistics_interval)
+            for context in contexts:
+                context.statistics = statistics
+            statistics.install(self)
+
+        # Instrumentation is installed here, or not at all: without it, decoding is unchanged
+        self.instrumentation = None
+        if instrument:
+            self.instrumentation = Instrumentation(self, instrument_interval)
+            self.instrumentation.install(self, contexts)
+
+    def new_context(self):
+        """
+        Return a decoder with the same settings as this one, and its own state
+        """
+        context = type(self).__new__(type(self))
+        for setting in ('i2c_address', 'i2c_addresses', 'spi_channel', 'ublox_module', 'detail', 'baud_rate',
+                        'timeout_periods', 'time_delta'):
+            setattr(context, setting, getattr(self, setting))
+        context.init_decoder()
+        return context
+
+    def init_decoder(self):
+        """
+        Initialize the decoder state
+        """
+
+        self.ID = None
+
+        # Per-message mode: emit one frame per message, with the decoded fields as data columns,
+        # instead of one frame per field or byte
+        self.per_message = self.detail == 'per-message'
+        self.message_start_time = None  # Start time of the first byte (0xB5, '$' or 0xD3) of the message
+
+        # The decode state machine
+        self.decode_state = self.sync_lost
+
+        # For I2C, we need a way to ignore the two Bytes-Available bytes read from register 0xFD
+        # to prevent them from being decoded as data
+        self.bytes_avail_state = self.decode_normal
+
+        self.this_is_byte = None
+        self.bytes_to_process = None
+        self.length_MSB = None
+        self.length_LSB = None
+        self.msg_class = None
+        self.ack_class = None
+        self.payload = bytearray()  # The payload of the UBX message being processed
+
+        # Resynchronisation: when a frame fails, the bytes after its first byte are re-scanned for
+        # the next UBX, NMEA or RTCM header, so a real message hidden inside the bad frame is not lost
+        self.lookback = deque(maxlen=self.lookback_size)  # (value, (start_time, end_time)) of each byte
+        self.recovering = False  # True if the current message started in replayed bytes
+        self.pending = []  # Records held back from the first header byte inside the current frame (see decode_many)
+        self.holding = False  # True if the records of the current frame are being held in pending
+        self.last_record_end = None  # End time of the last record returned by decode_many
+        self.bytes_skipped = 0  # Bytes which were not part of a UBX, NMEA or RTCM frame
+        self.frames_recovered = 0  # Valid messages found by replaying the bytes of a failed frame
+        self.statistics = None  # StreamStatistics, if the message rates and errors are counted
+        self.length_error = None  # (protocol, length, limit) of the last frame with an impossible length
+
+        # Inter-byte timeout: a frame is abandoned if the gap before one of its bytes is longer than
+        # timeout_periods byte periods. The byte period comes from the baud rate / clock speed setting,
+        # or is measured: the shortest time between the starts of two bytes of the same frame
+        self.maximum_delay = None  # A time_delta, or None if there is no timeout (yet)
+        self.byte_period = float('inf')  # Seconds
+        self.period_samples = 0  # Byte periods still to be measured
+        if self.timeout_periods:
+            if self.baud_rate:
+                self.byte_period = BITS_PER_BYTE / self.baud_rate
+                self.maximum_delay = self.time_delta(self.byte_period * self.timeout_periods)
+            else:
+                self.period_samples = BYTE_PERIOD_SAMPLES
+
+        self.field_table = None
+        self.field_tables = {}  # Compiled field tables, keyed by class, ID, length and version
+
+        # Payload decoder dispatch, keyed by (Class, ID). The decoder is selected once per message
+        self.ubx_decoder = self.analyze_fields
+        self.ubx_decoders = {}
+        for names, decoder in self.UBX_DECODERS.items():
+            self.ubx_decoders[self.get_ubx_class_and_id(*names)] = getattr(self, decoder)
+        self.ubx_value_decoders = {}
+        for names, decoder in self.UBX_VALUE_DECODERS.items():
+            self.ubx_value_decoders[self.get_ubx_class_and_id(*names)] = getattr(self, decoder)
+        for names in self.UBX_BLOCKS:
+            self.ubx_decoders[self.get_ubx_class_and_id(*names)] = self.analyze_blocks
+            self.ubx_value_decoders[self.get_ubx_class_and_id(*names)] = self.block_values
+        self.blocks = None  # UBX_BLOCKS layout of the message being decoded by analyze_blocks
+        self.blocks_end = None  # Payload index of the trailer, after the last block
+
+        # CFG-VALSET, VALGET and VALDEL: the key (and value) being decoded by analyze_cfg_val
+        self.cfg_has_values = False
+        self.cfg_item_start = None  # Payload index of the first byte of the key. -1 after an invalid key
+        self.cfg_item_end = None  # Payload index of the last byte of the value
+        self.cfg_key = None
+        self.start_time = None
+        self.last_end_time = None  # End time of the last data byte
+        self.sentence = bytearray()  # The NMEA sentence being processed, up to and including the '*'
+        self.sentence_record = None  # Index in pending of the sentence frame, replaced by its fields once it is valid
+        self.sum1 = 0  # Clear the checksum
+        self.sum2 = 0
+
+        self.nmea_sum = 0
+
+        self.rtcm_type = 0
+        self.rtcm_sum = 0
+        self.rtcm_reader = None  # BitReader for the body of the RTCM message, if its type is decoded
+        self.rtcm_decoder = self.skip_payload  # RTCM payload decoder, selected once the type is known
+        self.rtcm_field_start = None  # Start time of the first byte of the next RTCM field frame
+
+    def get_fields(self, length, version=None):
+        """
+        Return the field schema of the current message, for this payload length and version
+        """
+        fields = self.UBX_FIELDS.get(self.UBX_ID.get((self.msg_class, self.ID)), ())
+        if callable(fields):
+            fields = fields(length, self.ublox_module, version)
+        return fields
+
+    def get_field_table(self, version=None):
+        """
+        Return the byte-offset to field lookup for the current message.
+        Each entry is the (first byte, last byte, kind, name, format) of the field which owns that
+        payload byte, or None if the byte is not decoded. The name is stripped of its trailing space.
+        Tables are compiled on first use.
+        """
+        length = self.length_LSB + (self.length_MSB << 8)
+        key = (self.msg_class, self.ID, length, version)
+        table = self.field_tables.get(key)
+        if table is None:
+            table = [None] * length
+            for offset, size, kind, name, fmt in self.get_fields(length, version):
+                field = (offset, offset + size - 1, kind, name.strip(), fmt)
+                for byte in range(offset, min(offset + size, length)):
+                    if table[byte] is None:  # First field to claim a byte wins
+                        table[byte] = field
+            self.field_tables[key] = table
+        return table
+
+    def field_data(self, field):
+        """
+        Return the frame type and data of a completed field from the stored payload.
+        Numbers are stored as ints and formatted by result_types. Only 'hex' fields are formatted here
+        """
+        start_byte, end_byte, kind, name, fmt = field
+        if kind == 'U':
+            value = int.from_bytes(self.payload[start_byte:end_byte + 1], 'little')
+            if fmt == 'hex':
+                return 'hex_field', {'field': name, 'value': value, 'hex': hex(value)}
+            return 'field', {'field': name, 'value': value}  # Default to 'dec' (decimal)
+        elif kind == 'S':
+            value = int.from_bytes(self.payload[start_byte:end_byte + 1], 'little', signed=True)
+            return 'field', {'field': name, 'value': value}
+        elif kind == 'R':
+            value = struct.unpack('<d' if end_byte - start_byte == 7 else '<f', self.payload[start_byte:end_byte + 1])[0]
+            return 'field', {'field': name, 'value': value}
+        elif kind == 'C':
+            text = self.payload[start_byte:end_byte + 1].decode('latin-1')
+            return 'message', {'str': name + ' ' + text if name else text}
+        return 'message', {'str': name}
+
+    def field_values(self):
+        """
+        Return the values of all the fields in the stored payload, keyed by field name.
+        Used in per-message mode. Schema functions are passed payload byte 0 as the version
+        """
+        payload = self.payload
+        length = len(payload)
+        values = decode_field_values(payload, self.get_fields(length, payload[0] if length else None))
+        value_decoder = self.ubx_value_decoders.get((self.msg_class, self.ID))
+        if value_decoder is not None:
+            values.update(value_decoder())
+        return values
+
+    def block_summary(self, data):
+        """
+        Return the field values and the summary string of one repeated block
+        """
+        values = decode_field_values(data, self.blocks[4])
+        summary = self.blocks[3]
+        return values, summary(values) if callable(summary) else summary.format(**values)
+
+    def get_blocks_end(self, payload, length):
+        """
+        Return the payload index after the last repeated block, from the payload header and the payload length
+        """
+        if len(self.blocks) > 5:
+            return min(self.blocks[0] + self.blocks[1] * self.blocks[5](payload), length)
+        return length
+
+    def block_values(self):
+        """
+        Return the summaries of the repeated blocks in the stored payload, as one string separated by semicolons,
+        and the values of the trailer fields
+        """
+        self.blocks = self.UBX_BLOCKS[self.UBX_ID[self.msg_class, self.ID]]
+        block_offset, block_size, block_name = self.blocks[:3]
+        payload = self.payload
+        if len(payload) <= block_offset:
+            return {block_name: ''}
+        end = self.get_blocks_end(payload, len(payload))
+        summaries = [self.block_summary(payload[start:start + block_size])[1]
+                     for start in range(block_offset, end - block_size + 1, block_size)]
+        values = {block_name: '; '.join(summaries)}
+        if len(self.blocks) > 6:
+            values.update(decode_field_values(payload[end:], self.blocks[6]))
+        return values
+
+    def cfg_val_has_values(self, version):
+        """
+        CFG-VALSET and CFG-VALGET responses (version 1) carry keys and values.
+        CFG-VALDEL and CFG-VALGET polls (version 0) only carry keys
+        """
+        names = self.UBX_ID.get((self.msg_class, self.ID))
+        return names == ("CFG", "VALSET") or (names == ("CFG", "VALGET") and version == 1)
+
+    def cfg_val_values(self):
+        """
+        Return the values of the keys in the stored CFG-VALSET, VALGET or VALDEL payload, keyed by key name.
+        If there are only keys, they are returned as one comma-separated string
+        """
+        payload = self.payload
+        if len(payload) < 4:
+            return {}
+        with_values = self.cfg_val_has_values(payload[0])
+        values = {}
+        keys = []
+        end = 4  # The end of the last complete key or value
+        for offset, key, size in iter_cfg_data(payload[4:], with_values):
+            name, kind = cfg_key_info(key)
+            if size is None:
+                values['invalid key'] = key
+                end = len(payload)
+            elif with_values:
+                values[name] = cfg_frame_value(kind, payload[offset + 8:offset + 8 + size])
+            else:
+                keys.append(name)
+            if size is not None:
+                end = offset + 8 + size
+        if keys:
+            values['keys'] = ', '.join(keys)
+        if end < len(payload):  # A key or value cut off by the end of the payload
+            values['invalid length'] = '0x' + bytes(payload[end:]).hex().upper()
+        return values
+
+    def ubx_message(self, end_time, checksum):
+        """
+        Return the per-message record for the current UBX message
+        """
+        names = self.UBX_ID.get((self.msg_class, self.ID))
+        if names is None:
+            names = (self.UBX_CLASS.get(self.msg_class, "0x{:02X}".format(self.msg_class)), "0x{:02X}".format(self.ID))
+        data = {'class': names[0], 'id': names[1], 'length': len(self.payload), 'checksum': checksum}
+        if checksum == 'OK':
+            data.update(self.field_values())
+        return ('ubx', self.message_start_time, end_time, data)
+
+    def nmea_message(self, end_time, checksum):
+        """
+        Return the per-message record for the current NMEA sentence
+        """
+        sentence = self.sentence[:-1]
+        data = {'sentence': sentence.decode('latin-1'), 'checksum': checksum}
+        if checksum == 'OK':
+            parsed = parse_sentence(sentence)
+            if parsed is not None:
+                data['talker'], data['type'], fields = parsed
+                data.update((name, value) for first, last, name, value in fields)
+        return ('nmea', self.message_start_time, end_time, data)
+
+    def nmea_field_records(self):
+        """
+        Return the per-field records of the current NMEA sentence, or None if its talker or type is
+        not decoded. The character times come from lookback, which holds the frame from its '$'
+        """
+        sentence = self.sentence[:-1]
+        parsed = parse_sentence(sentence)
+        if parsed is None:
+            return None
+        starts = [0]  # Index of the first and last character of each comma-separated field
+        ends = []
+        for index, value in enumerate(sentence):
+            if value == 0x2C:  # ','
+                ends.append(index - 1)
+                starts.append(index + 1)
+        ends.append(len(sentence) - 1)
+        times = [item[1] for item in self.lookback][1:]  # (start_time, end_time) of each character
+        records = [('message', times[0][0], times[ends[0]][1], {'str': sentence[:ends[0] + 1].decode('latin-1')})]
+        for first, last, name, value in parsed[2]:
+            records.append(('field', times[starts[first]][0], times[max(ends[first], ends[last])][1],
+                            {'field': name, 'value': value}))
+        return records
+
+    def rtcm_message(self, end_time, length, checksum):
+        """
+        Return the per-message record for the current RTCM message
+        """
+        data = {'length': length, 'checksum': checksum}
+        if length >= 2:
+            data['type'] = self.rtcm_type
+            if checksum == 'OK' and self.rtcm_reader is not None:
+                reader = self.rtcm_reader
+                data.update((name, reader.frame_value(name, value)) for name, value in reader.values.items())
+        return ('rtcm', self.message_start_time, end_time, data)
+
+    def discard(self, record):
+        """
+        Replaces records.append for the per-byte records in per-message mode
+        """
+        pass
+
+    def skip_payload(self, index, value, start_time, end_time):
+        """
+        The UBX payload decoder in per-message mode. The fields are decoded when the message is complete
+        """
+        return None
+
+    def analyze_rtcm_byte(self, index, value, start_time, end_time):
+        """
+        Show an RTCM payload byte which is not decoded
+        """
+        return ('message', start_time, end_time, {'str': "0x{:02X}".format(value)})
+
+    def feed_rtcm(self, index, value, start_time, end_time):
+        """
+        The RTCM payload decoder in per-message mode. The field values are collected for rtcm_message
+        """
+        self.rtcm_reader.feed(value)
+        return None
+
+    def analyze_rtcm_fields(self, index, value, start_time, end_time):
+        """
+        Feed an RTCM payload byte to the BitReader and show the fields it completes. A frame covers
+        the bytes since the previous frame. The bytes after the last field are shown as before
+        """
+        reader = self.rtcm_reader
+        if reader.finished:
+            return self.analyze_rtcm_byte(index, value, start_time, end_time)
+        if self.rtcm_field_start is None:
+            self.rtcm_field_start = start_time
+        done = reader.feed(value)
+        if not done:
+            return None
+        field_start = self.rtcm_field_start
+        self.rtcm_field_start = None
+        if len(done) == 1:
+            name, value, fmt = done[0]
+            if fmt == 'hex':
+                return ('hex_field', field_start, end_time,
+                        {'field': name, 'value': reader.frame_value(name, value), 'hex': hex(value)})
+            return ('field', field_start, end_time, {'field': name, 'value': value})
+        data = {'summary': ' '.join('{} {}'.format(name, hex(value) if fmt == 'hex' else value)
+                                    for name, value, fmt in done)}
+        for name, value, fmt in done:
+            data[name] = reader.frame_value(name, value)
+        return ('fields', field_start, end_time, data)
+
+    def analyze_fields(self, index, value, start_time, end_time):
+        """
+        Extract the field (if any) which owns payload byte index, using the compiled field table
+        """
+        field = self.field_table[index]
+        if field is None:
+            return ('message', start_time, end_time, {'str': '.'}) # default to printing a dot for any undecoded bytes
+
+        start_byte, end_byte, kind, name, fmt = field
+        if kind == 'X':
+            if fmt == 'hex':
+                return ('hex_field', start_time, end_time,
+                        {'field': name.format(index - start_byte), 'value': value, 'hex': "0x{:02X}".format(value)})
+            return ('field', start_time, end_time, {'field': name.format(index - start_byte), 'value': value})  # Default to 'dec' (decimal)
+        if index == start_byte:
+            self.start_time = start_time
+        if index == end_byte:
+            frame_type, data = self.field_data(field)
+            return (frame_type, self.start_time, end_time, data)
+        return None
+
+    def analyze_versioned_fields(self, index, value, start_time, end_time):
+        """
+        As analyze_fields, but select the field table using the version byte (payload byte 0)
+        """
+        if index == 0:
+            self.field_table = self.get_field_table(value)
+        return self.analyze_fields(index, value, start_time, end_time)
+
+    def analyze_ack(self, index, value, start_time, end_time):
+        """
+        Show the Class and ID of ACK-ACK and ACK-NACK messages
+        """
+        if index == 0:
+            self.ack_class = value
+            if value in self.UBX_CLASS:
+                class_str = self.UBX_CLASS[value]
+            else:
+                class_str = 'Class'
+            return ('message', start_time, end_time, {'str': class_str})
+        elif index == 1:
+            if (self.ack_class, value) in self.UBX_ID:
+                id_str = self.UBX_ID[self.ack_class, value][1]
+            else:
+                id_str = 'ID'
+            return ('message', start_time, end_time, {'str': id_str})
+        else:
+            return ('message', start_time, end_time, {'str': '?'})
+
+    def analyze_blocks(self, index, value, start_time, end_time):
+        """
+        Decode a message with a header and repeated blocks (UBX_BLOCKS). The header is decoded by
+        analyze_fields. Each block is shown as one frame, with its fields as data. The block and
+        the position in it are worked out from the payload index
+        """
+        if index == 0:
+            self.blocks = self.UBX_BLOCKS[self.UBX_ID[self.msg_class, self.ID]]
+        block_offset, block_size = self.blocks[:2]
+        if index < block_offset:
+            return self.analyze_fields(index, value, start_time, end_time)
+        if index == block_offset:
+            self.blocks_end = self.get_blocks_end(self.payload, self.length_LSB + (self.length_MSB << 8))
+        if index >= self.blocks_end:
+            return self.analyze_trailer(index, start_time, end_time)
+        block, position = divmod(index - block_offset, block_size)
+        if position == 0:
+            self.start_time = start_time
+        if position == block_size - 1:
+            values, summary = self.block_summary(self.payload[index + 1 - block_size:index + 1])
+            data = {'block': '{}[{}]'.format(self.blocks[2], block), 'summary': summary}
+            data.update(values)
+            return ('block', self.start_time, end_time, data)
+        return None
+
+    def analyze_trailer(self, index, start_time, end_time):
+        """
+        Decode the trailer fields (UBX_BLOCKS) which follow the last repeated block
+        """
+        position = index - self.blocks_end
+        trailer = self.blocks[6] if len(self.blocks) > 6 else ()
+        for offset, size, kind, name, fmt in trailer:
+            if offset <= position < offset + size:
+                if position == offset:
+                    self.start_time = start_time
+                if position == offset + size - 1:
+                    frame_type, data = self.field_data((index + 1 - size, index, kind, name.strip(), fmt))
+                    return (frame_type, self.start_time, end_time, data)
+                return None
+        return ('message', start_time, end_time, {'str': '.'})
+
+    def analyze_cfg_val(self, index, value, start_time, end_time):
+        """
+        Decode CFG-VALSET, VALGET and VALDEL: the header fields, then one frame per key and value,
+        or per key. The value size comes from bits 28-30 of the key. A key or value cut off by the
+        end of the payload is shown as INVALID LENGTH, with its bytes
+        """
+        if index < 4:
+            if index == 0:
+                self.cfg_has_values = self.cfg_val_has_values(value)
+                self.cfg_item_start = 4
+                self.cfg_item_end = None
+            return self.analyze_versioned_fields(index, value, start_time, end_time)
+        if self.cfg_item_start < 0:
+            return ('message', start_time, end_time, {'str': '.'})  # The rest of the payload follows an invalid key
+        if index == self.cfg_item_start:
+            self.start_time = start_time
+            self.cfg_item_end = None  # Not known until the whole key has arrived
+        elif index == self.cfg_item_start + 3:
+            key = int.from_bytes(self.payload[index - 3:index + 1], 'little')
+            size = cfg_value_size(key) if self.cfg_has_values else 0
+            if size is None:
+                self.cfg_item_start = -1
+                return ('message', self.start_time, end_time, {'str': 'Invalid key 0x{:08X}'.format(key)})
+            self.cfg_key = key
+            self.cfg_item_end = index + size
+        if index == self.cfg_item_end:
+            value_start = self.cfg_item_start + 4
+            self.cfg_item_start = index + 1
+            name, kind = cfg_key_info(self.cfg_key)
+            if not self.cfg_has_values:
+                return ('message', self.start_time, end_time, {'str': name})
+            value = cfg_frame_value(kind, self.payload[value_start:index + 1])
+            if kind == 'X':
+                hex_value = value if isinstance(value, str) else hex(value)  # 8-byte values are already hex
+                return ('hex_field', self.start_time, end_time, {'field': name, 'value': value, 'hex': hex_value})
+            return ('field', self.start_time, end_time, {'field': name, 'value': value})
+        if index == self.length_LSB + (self.length_MSB << 8) - 1:  # The payload ends inside a key or value
+            item = self.payload[self.cfg_item_start:index + 1]
+            if len(item) < 4:
+                text = 'INVALID LENGTH key 0x{}'.format(bytes(item).hex().upper())
+            else:
+                text = 'INVALID LENGTH {} {} of {} bytes 0x{}'.format(
+                    cfg_key_info(self.cfg_key)[0], len(item) - 4, self.cfg_item_end - self.cfg_item_start - 3,
+                    bytes(item[4:]).hex().upper())
+            return ('message', self.start_time, end_time, {'str': text})
+        return None
+
+    def get_ubx_class(self, class_name):
+        return self.UBX_CLASS_BY_NAME.get(class_name)
+
+    def get_ubx_class_and_id(self, class_name, id_name):
+        return self.UBX_ID_BY_NAME.get((class_name, id_name), (None,None))
+
+    def analyze_ubx(self, index, value, start_time, end_time):
+        """
+        Analyze payload byte index according to the UBX interface description,
+        using the payload decoder selected when the length bytes arrived
+        """
+        return self.ubx_decoder(index, value, start_time, end_time)
+
+    def decode_many(self, values, timestamps):
+        """
+        Decode a run of data bytes. timestamps holds the (start_time, end_time) of each byte.
+        Returns a list of result records: (type, start_time, end_time, data) tuples, which are
+        the AnalyzerFrame arguments. The per-byte state lives in local variables during the run
+        and is stored back when the run is complete, so the run can be split anywhere.
+        """
+
+        # For UBX messages:
+        # Sync Char 1: 0xB5
+        # Sync Char 2: 0x62
+        # Class byte
+        # ID byte
+        # Length: two bytes, little endian
+        # Payload: length bytes
+        # Checksum: two bytes
+
+        # For NMEA messages:
+        # Starts with a '$'
+        # The next five characters indicate the message type (stored in nmea_char_1 to nmea_char_5)
+        # Message fields are comma-separated
+        # Followed by an '*'
+        # Then a two character checksum (the logical exclusive-OR of all characters between the $ and the * as ASCII hex)
+        # Ends with CR LF
+
+        # For RTCM messages:
+        # Byte0 is 0xD3
+        # Byte1 contains 6 unused bits plus the 2 MS bits of the message length
+        # Byte2 contains the remainder of the message length
+        # Byte3 contains the first 8 bits of the message type
+        # Byte4 contains the last 4 bits of the message type and (optionally) the first 4 bits of the sub type
+        # Byte5 contains (optionally) the last 8 bits of the sub type
+        # Payload
+        # Checksum: three bytes CRC-24Q (calculated from Byte0 to the end of the payload, with seed 0)
+
+        # Per-field records are emitted as the bytes arrive. If a frame fails, the bytes from the first
+        # header byte inside it are decoded again, so the records from that byte on are held in pending
+        # until the frame is complete. So are the NMEA sentence's, which is replaced by its fields
+        records = []
+        per_message = self.per_message
+        pending = self.pending
+        emit_live = records.append
+        hold = pending.append
+        emit = self.discard if per_message else hold if self.holding else emit_live
+        emit_message = records.append # Per-message records
+        statistics = self.statistics
+
+        # The states and characters which are checked for every byte
+        sync_lost = self.sync_lost
+        looking_for_B5_dollar_D3 = self.looking_for_B5_dollar_D3
+        processing_UBX_payload = self.processing_UBX_payload
+        looking_for_asterix = self.looking_for_asterix
+        processing_RTCM_payload = self.processing_RTCM_payload
+        sync_char_1 = self.sync_char_1
+        dollar = self.dollar
+        rtcm_preamble = self.rtcm_preamble
+        header_bytes = self.header_bytes
+        nmea_max_chars = NMEA_MAX_CHARACTERS
+        crc_table = CRC24Q_TABLE
+
+        state = self.decode_state
+        this_is_byte = self.this_is_byte
+        bytes_to_process = self.bytes_to_process
+        sum1 = self.sum1
+        sum2 = self.sum2
+        nmea_sum = self.nmea_sum
+        rtcm_sum = self.rtcm_sum
+        payload = self.payload
+        sentence = self.sentence
+        ubx_decoder = self.ubx_decoder
+        rtcm_decoder = self.rtcm_decoder
+        end_time = self.last_end_time
+
+        lookback = self.lookback
+        lookback_append = lookback.append
+        recovering = self.recovering
+        bytes_skipped = self.bytes_skipped
+
+        maximum_delay = self.maximum_delay
+        byte_period = self.byte_period
+        period_samples = self.period_samples
+        timeout_periods = self.timeout_periods
+        check_gaps = maximum_delay is not None or period_samples > 0
+
+        items = zip(values, timestamps)
+        live = items # The live bytes, or the byte after a timeout gap followed by the live bytes
+        source = live # Or the bytes being replayed after a failure
+
+        while True:
+            failure = None
+            for item in source:
+                # Check the gap since the previous byte of the frame. end_time is still that byte's
+                # (The state is only compared once a gap is found)
+                if check_gaps and lookback:
+                    start_time = item[1][0]
+                    if period_samples and state != sync_lost and state != looking_for_B5_dollar_D3:
+                        period_samples -= 1
+                        period = float(start_time - lookback[-1][1][0])
+                        if 0 < period < byte_period:
+                            byte_period = period
+                            maximum_delay = self.time_delta(byte_period * timeout_periods)
+                    if (maximum_delay is not None and start_time - end_time > maximum_delay
+                            and state != sync_lost and state != looking_for_B5_dollar_D3):
+                        lookback_append(item)
+                        end_time = item[1][1]
+                        state = sync_lost
+                        failure = "TIMEOUT"
+                        break
+
+                value, (start_time, end_time) = item
+                lookback_append(item)
+                if (emit is emit_live and value in header_bytes
+                        and state != looking_for_B5_dollar_D3 and state != sync_lost):
+                    emit = hold # A header byte inside the frame
+
+                # Process UBX payload
+                if state == processing_UBX_payload:
+                    sum1 = (sum1 + value) & 0xFF
+                    sum2 = (sum2 + sum1) & 0xFF
+                    payload.append(value)
+                    result = ubx_decoder(this_is_byte, value, start_time, end_time)
+                    this_is_byte += 1
+                    bytes_to_process -= 1
+                    if bytes_to_process == 0:
+                        state = self.looking_for_checksum_A
+                    if result is not None:
+                        emit(result)
+
+                # Process RTCM payload
+                elif state == processing_RTCM_payload:
+                    this_is_byte += 1
+                    rtcm_sum = ((rtcm_sum << 8) & 0xFFFFFF) ^ crc_table[(rtcm_sum >> 16) ^ value]
+                    if this_is_byte == bytes_to_process:
+                        state = self.looking_for_RTCM_csum1
+                    result = rtcm_decoder(this_is_byte, value, start_time, end_time)
+                    if result is not None:
+                        emit(result)
+
+                # Process NMEA payload
+                elif state == looking_for_asterix:
+                    if this_is_byte == 0: # Start of a new NMEA message
+                        del sentence[:]
+                        self.start_time = start_time
+                    sentence.append(value)
+                    this_is_byte += 1
+                    if value != self.asterix:
+                        nmea_sum ^= value # Add value to checksum
+                        if this_is_byte >= nmea_max_chars: # No room for the '*'
+                            state = sync_lost
+                            self.length_error = ('NMEA', this_is_byte + 6, NMEA_MAX_LENGTH) # $, characters, *, checksum, CR LF
+                            failure = "INVALID LENGTH"
+                            break
+                    else:
+                        self.nmea_expected_csum1, self.nmea_expected_csum2 = NMEA_HEX[nmea_sum] # As ASCII hex
+                        state = self.looking_for_csum1
+                        if emit is emit_live:
+                            emit = hold
+                        self.sentence_record = len(pending)
+                        emit(('message', self.start_time, end_time, {'str': sentence.decode('latin-1')}))
+
+                # Check for UBX 0xB5, NMEA $ or RTCM 0xD3
+                elif state == looking_for_B5_dollar_D3 or state == sync_lost:
+                    if emit is hold:
+                        emit = emit_live
+                    if value == sync_char_1:
+                        state = self.looking_for_sync_2
+                        emit(('message', start_time, end_time, {'str': "UBX μ"}))
+                    elif value == dollar:
+                        state = looking_for_asterix
+                        nmea_sum = 0 # Clear the checksum
+                        this_is_byte = 0
+                        emit(('message', start_time, end_time, {'str': "NMEA $"}))
+                    elif value == rtcm_preamble:
+                        state = self.looking_for_RTCM_len1
+                        rtcm_sum = crc_table[value] # CRC seed is 0. Add preamble to rtcm_sum
+                        emit(('message', start_time, end_time, {'str': "RTCM 0xD3"}))
+                    else:
+                        state = sync_lost
+                        bytes_skipped += 1
+                        continue
+                    # Start of a frame. Keep its bytes in lookback until it is complete
+                    self.message_start_time = start_time
+                    lookback.clear()
+                    lookback_append(item)
+                    recovering = source is not live
+
+                # Check for sync char 2
+                elif state == self.looking_for_sync_2:
+                    if value == self.sync_char_2:
+                        state = self.looking_for_class
+                        emit(('message', start_time, end_time, {'str': chr(value)}))
+                    else:
+                        state = sync_lost
+                        failure = ''
+                        break
+
+                # Check for Class
+                elif state == self.looking_for_class:
+                    state = self.looking_for_ID
+                    self.msg_class = value
+                    sum1 = value  # Clear the checksum and add value
+                    sum2 = value
+                    if self.msg_class in self.UBX_CLASS:
+                        class_str = self.UBX_CLASS[value]
+                    else:
+                        class_str = 'Class'
+                    emit(('message', start_time, end_time, {'str': class_str}))
+
+                # Check for ID
+                elif state == self.looking_for_ID:
+                    state = self.looking_for_length_LSB
+                    self.ID = value
+                    sum1 = (sum1 + value) & 0xFF
+                    sum2 = (sum2 + sum1) & 0xFF
+                    if (self.msg_class, self.ID) in self.UBX_ID:
+                        id_str = self.UBX_ID[self.msg_class, self.ID][1]
+                    else:
+                        id_str = 'ID'
+                    emit(('message', start_time, end_time, {'str': id_str}))
+
+                # Check for Length LSB
+                elif state == self.looking_for_length_LSB:
+                    state = self.looking_for_length_MSB
+                    self.length_LSB = value
+                    sum1 = (sum1 + value) & 0xFF
+                    sum2 = (sum2 + sum1) & 0xFF
+                    self.start_time = start_time
+
+                # Check for Length MSB
+                elif state == self.looking_for_length_MSB:
+                    self.length_MSB = value
+                    bytes_to_process = self.length_MSB * 256 + self.length_LSB
+                    this_is_byte = 0
+                    sum1 = (sum1 + value) & 0xFF
+                    sum2 = (sum2 + sum1) & 0xFF
+                    limit = ubx_payload_limit(self.msg_class, self.ID)
+                    if bytes_to_process > limit:
+                        state = sync_lost
+                        self.length_error = ('UBX', bytes_to_process, limit)
+                        failure = "INVALID LENGTH"
+                        break
+                    del payload[:]
+                    if per_message:
+                        ubx_decoder = self.skip_payload
+                    else:
+                        self.field_table = self.get_field_table()
+                        ubx_decoder = self.ubx_decoders.get((self.msg_class, self.ID), self.analyze_fields)
+                    self.ubx_decoder = ubx_decoder
+                    if bytes_to_process > 0:
+                        state = processing_UBX_payload
+                    else:
+                        state = self.looking_for_checksum_A
+                    emit(('field', self.start_time, end_time, {'field': 'Length', 'value': bytes_to_process}))
+
+                # Checksum A
+                elif state == self.looking_for_checksum_A:
+                    if value != sum1:
+                        state = sync_lost
+                        failure = "INVALID CK_A"
+                        break
+                    else:
+                        state = self.looking_for_checksum_B
+                        emit(('message', start_time, end_time, {'str': "Valid CK_A"}))
+
+                # Checksum B
+                elif state == self.looking_for_checksum_B:
+                    if value != sum2:
+                        state = sync_lost
+                        failure = "INVALID CK_B"
+                        break
+                    else:
+                        state = looking_for_B5_dollar_D3
+                        if statistics is not None:
+                            statistics.message(('UBX', self.msg_class, self.ID))
+                        if per_message:
+                            emit_message(self.ubx_message(end_time, 'OK'))
+                        else:
+                            emit(('message', start_time, end_time, {'str': "Valid CK_B"}))
+                            records.extend(pending)
+                            del pending[:]
+                        if recovering:
+                            self.frames_recovered += 1
+
+                # NMEA Checksum 1
+                elif state == self.looking_for_csum1:
+                    if value != self.nmea_expected_csum1:
+                        state = sync_lost
+                        failure = "INVALID CSUM1"
+                        break
+                    else:
+                        state = self.looking_for_csum2
+                        emit(('message', start_time, end_time, {'str': "Valid CSUM1"}))
+
+                # NMEA Checksum 2
+                elif state == self.looking_for_csum2:
+                    if value != self.nmea_expected_csum2:
+                        state = sync_lost
+                        failure = "INVALID CSUM2"
+                        break
+                    else:
+                        state = self.looking_for_term1
+                        if not per_message:
+                            # The checksum is valid. Split the sentence frame into its fields
+                            fields = self.nmea_field_records()
+                            if fields is not None:
+                                pending[self.sentence_record:self.sentence_record + 1] = fields
+                        emit(('message', start_time, end_time, {'str': "Valid CSUM2"}))
+
+                # NMEA Terminator 1 (CR)
+                elif state == self.looking_for_term1:
+                    if value != self.carriage_return:
+                        state = sync_lost
+                        failure = "INVALID CR"
+                        break
+                    else:
+                        state = self.looking_for_term2
+                        emit(('message', start_time, end_time, {'str': "CR"}))
+
+                # NMEA Terminator 2 (LF)
+                elif state == self.looking_for_term2:
+                    if value != self.line_feed:
+                        state = sync_lost
+                        failure = "INVALID LF"
+                        break
+                    else:
+                        state = looking_for_B5_dollar_D3
+                        if statistics is not None:
+                            statistics.nmea(sentence)
+                        if per_message:
+                            emit_message(self.nmea_message(end_time, 'OK'))
+                        else:
+                            emit(('message', start_time, end_time, {'str': "LF"}))
+                            records.extend(pending)
+                            del pending[:]
+                        if recovering:
+                            self.frames_recovered += 1
+
+                # Check for RTCM Length MSB
+                elif state == self.looking_for_RTCM_len1:
+                    state = self.looking_for_RTCM_len2
+                    self.length_MSB = value
+                    rtcm_sum = ((rtcm_sum << 8) & 0xFFFFFF) ^ crc_table[(rtcm_sum >> 16) ^ value]
+                    self.start_time = start_time
+
+                # Check for RTCM Length LSB
+                elif state == self.looking_for_RTCM_len2:
+                    self.length_LSB = value
+                    bytes_to_process = rtcm_length(self.length_MSB, self.length_LSB)
+                    if bytes_to_process > RTCM_MAX_LENGTH: # The 6 reserved bits are not zero
+                        state = sync_lost
+                        self.length_error = ('RTCM', bytes_to_process, RTCM_MAX_LENGTH)
+                        failure = "INVALID LENGTH"
+                        break
+                    this_is_byte = 0
+                    rtcm_sum = ((rtcm_sum << 8) & 0xFFFFFF) ^ crc_table[(rtcm_sum >> 16) ^ value]
+                    if bytes_to_process > 0:
+                        state = self.looking_for_RTCM_type1
+                    else:
+                        state = self.looking_for_RTCM_csum1
+                    emit(('field', self.start_time, end_time, {'field': 'Length', 'value': bytes_to_process}))
+
+                # Check for RTCM Type MSB
+                elif state == self.looking_for_RTCM_type1:
+                    self.rtcm_type = value
+                    this_is_byte += 1
+                    rtcm_sum = ((rtcm_sum << 8) & 0xFFFFFF) ^ crc_table[(rtcm_sum >> 16) ^ value]
+                    self.start_time = start_time
+                    if this_is_byte == bytes_to_process:
+                        state = self.looking_for_RTCM_csum1
+                    else:
+                        state = self.looking_for_RTCM_type2
+
+                # Check for RTCM Type LSB
+                elif state == self.looking_for_RTCM_type2:
+                    self.rtcm_type = (self.rtcm_type << 4) | (value >> 4)
+                    this_is_byte += 1
+                    fields = RTCM_FIELDS.get(self.rtcm_type)
+                    if fields is None:
+                        self.rtcm_reader = None
+                        rtcm_decoder = self.skip_payload if per_message else self.analyze_rtcm_byte
+                    else:
+                        self.rtcm_reader = BitReader(fields, value & 0x0F, 4) # The low 4 bits start the body
+                        self.rtcm_field_start = None
+                        rtcm_decoder = self.feed_rtcm if per_message else self.analyze_rtcm_fields
+                    self.rtcm_decoder = rtcm_decoder
+                    rtcm_sum = ((rtcm_sum << 8) & 0xFFFFFF) ^ crc_table[(rtcm_sum >> 16) ^ value]
+                    if this_is_byte == bytes_to_process:
+                        state = self.looking_for_RTCM_csum1
+                    else:
+                        state = processing_RTCM_payload
+                    emit(('field', self.start_time, end_time, {'field': 'Type', 'value': self.rtcm_type}))
+
+                # RTCM Checksum 1
+                elif state == self.looking_for_RTCM_csum1:
+                    if value != ((rtcm_sum >> 16) & 0xFF):
+                        state = sync_lost
+                        failure = "INVALID CSUM1"
+                        break
+                    else:
+                        state = self.looking_for_RTCM_csum2
+                        emit(('message', start_time, end_time, {'str': "Valid CSUM1"}))
+
+                # RTCM Checksum 2
+                elif state == self.looking_for_RTCM_csum2:
+                    if value != ((rtcm_sum >> 8) & 0xFF):
+                        state = sync_lost
+                        failure = "INVALID CSUM2"
+                        break
+                    else:
+                        state = self.looking_for_RTCM_csum3
+                        emit(('message', start_time, end_time, {'str': "Valid CSUM2"}))
+
+                # RTCM Checksum 3
+                elif state == self.looking_for_RTCM_csum3:
+                    if value != (rtcm_sum & 0xFF):
+                        state = sync_lost
+                        failure = "INVALID CSUM3"
+                        break
+                    else:
+                        state = looking_for_B5_dollar_D3
+                        if statistics is not None:
+                            statistics.message(('RTCM', self.rtcm_type))
+                        if per_message:
+                            emit_message(self.rtcm_message(end_time, bytes_to_process, 'OK'))
+                        else:
+                            emit(('message', start_time, end_time, {'str': "Valid CSUM3"}))
+                            records.extend(pending)
+                            del pending[:]
+                        if recovering:
+                            self.frames_recovered += 1
+
+                # This should never happen...
+                else:
+                    state = sync_lost
+
+            if failure is None:
+                if source is live:
+                    break
+                source = live # The replay is complete. Carry on with the live bytes
+                continue
+
+            # The frame has failed. Re-scan the bytes after its first byte for the next UBX, NMEA or
+            # RTCM header, and decode the bytes from that header onwards again. If there is a header,
+            # the failed frame is shown as one frame which ends just before it (in per-field mode, from
+            # the end of the records already emitted). If not, the failed frame is shown as usual
+            replay = list(lookback)
+            lookback.clear()
+            if statistics is not None and failure:
+                statistics.failure(replay[0][0], failure)
+            for skip in range(1, len(replay)):
+                if replay[skip][0] in header_bytes:
+                    break
+            else:
+                skip = len(replay)
+            bytes_skipped += skip
+            skip_end_time = replay[skip - 1][1][1]
+            if failure == "INVALID LENGTH":
+                protocol, length, limit = self.length_error
+                emit_message(('length_error',) + self.failure_span(replay, skip, records) +
+                             ({'protocol': protocol, 'length': length, 'limit': limit},))
+            elif failure == "TIMEOUT":
+                # The last byte in replay is the one after the gap
+                emit_message(('timeout',) + self.failure_span(replay, skip, records) + ({'bytes': len(replay) - 1},))
+            elif failure:
+                if not per_message:
+                    if skip == len(replay):
+                        records.extend(pending)
+                        emit_message(('message', start_time, end_time, {'str': failure}))
+                    else:
+                        emit_message(('message',) + self.failure_span(replay, skip, records) + ({'str': failure},))
+                elif failure.startswith("INVALID CK"):
+                    emit_message(self.ubx_message(skip_end_time, failure))
+                elif self.rtcm_preamble == replay[0][0]:
+                    emit_message(self.rtcm_message(skip_end_time, bytes_to_process, failure))
+                else:
+                    emit_message(self.nmea_message(skip_end_time, failure))
+            del pending[:]
+            if skip < len(replay):
+                if failure == "TIMEOUT" and skip == len(replay) - 1 and source is live:
+                    source = live = chain(replay[skip:], items) # Only the byte after the gap is left. It is live
+                elif source is live:
+                    source = iter(replay[skip:])
+                else:
+                    source = chain(replay[skip:], source)
+
+        self.decode_state = state
+        self.this_is_byte = this_is_byte
+        self.bytes_to_process = bytes_to_process
+        self.sum1 = sum1
+        self.sum2 = sum2
+        self.nmea_sum = nmea_sum
+        self.rtcm_sum = rtcm_sum
+        self.recovering = recovering
+        self.holding = emit is hold
+        if records:
+            self.last_record_end = records[-1][2]
+        self.bytes_skipped = bytes_skipped
+        self.last_end_time = end_time
+        self.maximum_delay = maximum_delay
+        self.byte_period = byte_period
+        self.period_samples = period_samples
+        return records
+
+    def decode_byte(self, value, start_time, end_time):
+        """
+        Decode one data byte, as decode_many((value,), ((start_time, end_time),)) does. Logic2 gives the
+        analyzer one byte at a time, and most bytes only move through a UBX or RTCM payload or an NMEA
+        sentence, or are skipped between messages. Those are decoded here, without the per-call setup
+        of decode_many. Header bytes, the bytes which end a payload or sentence, the other states and
+        the bytes which need their gap checked are passed to decode_many
+        """
+        state = self.decode_state
+        if (value in self.header_bytes or self.period_samples
+                or (self.maximum_delay is not None and state != self.looking_for_B5_dollar_D3
+                    and state != self.sync_lost and start_time - self.last_end_time > self.maximum_delay)):
+            return self.decode_many((value,), ((start_time, end_time),))
+
+        if state == self.processing_UBX_payload:
+            if self.bytes_to_process == 1:
+                return self.decode_many((value,), ((start_time, end_time),))
+            self.sum1 = sum1 = (self.sum1 + value) & 0xFF
+            self.sum2 = (self.sum2 + sum1) & 0xFF
+            self.payload.append(value)
+            self.lookback.append((value, (start_time, end_time)))
+            self.last_end_time = end_time
+            result = self.ubx_decoder(self.this_is_byte, value, start_time, end_time)
+            self.this_is_byte += 1
+            self.bytes_to_process -= 1
+
+        elif state == self.processing_RTCM_payload:
+            this_is_byte = self.this_is_byte + 1
+            if this_is_byte == self.bytes_to_process:
+                return self.decode_many((value,), ((start_time, end_time),))
+            rtcm_sum = self.rtcm_sum
+            self.rtcm_sum = ((rtcm_sum << 8) & 0xFFFFFF) ^ CRC24Q_TABLE[(rtcm_sum >> 16) ^ value]
+            self.this_is_byte = this_is_byte
+            self.lookback.append((value, (start_time, end_time)))
+            self.last_end_time = end_time
+            result = self.rtcm_decoder(this_is_byte, value, start_time, end_time)
+
+        elif state == self.looking_for_asterix:
+            this_is_byte = self.this_is_byte
+            if this_is_byte == 0 or value == self.asterix or this_is_byte + 1 >= NMEA_MAX_CHARACTERS:
+                return self.decode_many((value,), ((start_time, end_time),))
+            self.sentence.append(value)
+            self.this_is_byte = this_is_byte + 1
+            self.nmea_sum ^= value
+            self.lookback.append((value, (start_time, end_time)))
+            self.last_end_time = end_time
+            return []
+
+        elif state == self.looking_for_B5_dollar_D3 or state == self.sync_lost:
+            self.decode_state = self.sync_lost
+            self.bytes_skipped += 1
+            self.lookback.append((value, (start_time, end_time)))
+            self.last_end_time = end_time
+            return []
+
+        else:
+            return self.decode_many((value,), ((start_time, end_time),))
+
+        if result is None or self.per_message:
+            return []
+        if self.holding:
+            self.pending.append(result)
+            return []
+        self.last_record_end = result[2]
+        return [result]
+
+    def failure_span(self, replay, skip, records):
+        """
+        Return the (start_time, end_time) of the frame which shows a failed frame, up to replay[skip].
+        In per-field mode it starts at the first byte after the records already emitted (the last of
+        records, or of the previous decode_many). If they cover every byte before the header at
+        replay[skip], it fills the gap before the header
+        """
+        end_time = replay[skip - 1][1][1]
+        emitted_end = records[-1][2] if records else self.last_record_end
+        if self.per_message or emitted_end is None:
+            return self.message_start_time, end_time
+        for value, (start_time, byte_end_time) in replay[1:skip]:
+            if start_time >= emitted_end:
+                return start_time, end_time
+        return emitted_end, replay[skip][1][0] if skip < len(replay) else emitted_end
+
+    def flush_frame(self):
+        """
+        Return the records of the frame cut off by the end of the data. As after a failure, the
+        bytes after its first byte are re-scanned for the next header and decoded again. If there
+        is no header, the records held back in pending are returned (per-field mode), or the
+        frame is shown as INCOMPLETE (per-message mode)
+        """
+        records = []
+        while self.decode_state not in (self.looking_for_B5_dollar_D3, self.sync_lost):
+            replay = list(self.lookback)
+            for skip in range(1, len(replay)):
+                if replay[skip][0] in self.header_bytes:
+                    break
+            else:
+                skip = len(replay)
+            self.bytes_skipped += skip
+            if skip < len(replay):
+                records.append(('message',) + self.failure_span(replay, skip, records) + ({'str': 'INCOMPLETE'},))
+            elif self.per_message:
+                records.append(('message', self.message_start_time, self.last_end_time, {'str': 'INCOMPLETE'}))
+            else:
+                records += self.pending
+            del self.pending[:]
+            self.holding = False
+            self.lookback.clear()
+            self.decode_state = self.sync_lost
+            if skip < len(replay):
+                values, timestamps = zip(*replay[skip:])
+                records += self.decode_many(values, timestamps)
+        return records
+
+    def flush(self):
+        """
+        Return the records of the frames cut off by the end of a capture (see flush_frame), from
+        every I2C address and SPI channel
+        """
+        records = []
+        tagged = [(context, {'address': "0x{:02X}".format(address)} if self.tag_address else {})
+                  for address, context in self.i2c_contexts.items()]
+        tagged += [(context, {'channel': channel} if len(self.spi_contexts) > 1 else {})
+                   for channel, context in self.spi_contexts]
+        flushed = []
+        for context, tag in tagged:
+            if context in flushed:
+                continue
+            flushed.append(context)
+            records += [(record_type, record_start, record_end, dict(record_data, **tag))
+                        for record_type, record_start, record_end, record_data in context.flush_frame()]
+        return records
+
+    def report_span(self, start_time):
+        """
+        Return the (start_time, end_time) of a report frame (statistics or instrumentation) which goes just
+        before the data frame which starts at start_time, or None if the report has to wait for a later frame.
+        A report takes half of the gap since the last byte, and only when every context is between messages,
+        so it cannot overlap the frames of a message, or another report in the same gap
+        """
+        gap_start = self.report_end
+        for context in self.contexts:
+            if context.decode_state != self.looking_for_B5_dollar_D3 and context.decode_state != self.sync_lost:
+                return None
+            if context.last_end_time is not None and (gap_start is None or context.last_end_time > gap_start):
+                gap_start = context.last_end_time
+        if gap_start is None or not gap_start < start_time:
+            return None
+        self.report_end = gap_start + self.time_delta(float(start_time - gap_start) / 2)
+        return gap_start, self.report_end
+
+    def decode_frame(self, frame_type, data, start_time, end_time):
+        """
+        Extract the data byte (if any) from an async serial, I2C or SPI frame and decode it
+        with decode_byte. frame_type and data are the type and data of the Logic2 frame.
+        Returns a list of result records
+        """
+
+        value = None
+
+        # handle I2C address frames (read and write)
+        if frame_type == "address":
+            address = data["address"][0]
+            context = self.i2c_contexts.get(address) # Is this one of the addresses we are looking for?
+            self.context = context
+            self.context_address = address
+            if context is not None:
+
+                # Mini state machine to avoid I2C Bytes-Available being decoded as data
+                if data["read"] == False: # If this is a Write to our address
+                    if context.bytes_avail_state == self.decode_normal:
+                        context.bytes_avail_state = self.write_seen_check_FD # Check for 0xFD
+                else: # Else if this is a read from our address
+                    if context.bytes_avail_state == self.FD_seen_check_read:
+                        context.bytes_avail_state = self.ignore_avail_LSB
+                    else:
+                        context.bytes_avail_state = self.decode_normal
+
+            return []
+
+        # exit if we do not have an address match
+        context = self.context
+        if context is None:
+            return []
+
+        # handle serial data and I2C data
+        if frame_type == "data" and "data" in data.keys():
+            value = data["data"][0]
+
+            # Check Bytes-Available state machine
+            # This only applies to I2C
+            # For serial, context.bytes_avail_state will always be self.decode_normal
+            if context.bytes_avail_state == self.write_seen_check_FD:
+                if value == 0xFD:
+                    context.bytes_avail_state = self.FD_seen_check_read
+                    return []
+                else:
+                    context.bytes_avail_state = self.decode_normal
+            elif context.bytes_avail_state == self.ignore_avail_LSB:
+                context.bytes_avail_state = self.ignore_avail_MSB
+                return []
+            elif context.bytes_avail_state == self.ignore_avail_MSB:
+                context.bytes_avail_state = self.decode_normal
+                return []
+
+        # handle SPI bytes: one per channel, each decoded by its own context
+        if frame_type == "result":
+            records = []
+            for channel, context in self.spi_contexts:
+                if channel not in data.keys() or not data[channel]:
+                    continue
+                value = data[channel][0]
+                # u-blox sends 0xFF on MISO when it has no data. Skip it between messages
+                if (value == 0xFF and channel == 'miso'
+                        and (context.decode_state == self.looking_for_B5_dollar_D3 or context.decode_state == self.sync_lost)):
+                    continue
+                channel_records = context.decode_byte(value, start_time, end_time)
+                if len(self.spi_contexts) > 1:
+                    channel_records = [(record_type, record_start, record_end, dict(record_data, channel=channel))
+                                       for record_type, record_start, record_end, record_data in channel_records]
+                records += channel_records
+            return records
+
+        if value is None:
+            return []
+
+        records = context.decode_byte(value, start_time, end_time)
+        if self.tag_address:
+            address = "0x{:02X}".format(self.context_address)
+            records = [(record_type, record_start, record_end, dict(record_data, address=address))
+                       for record_type, record_start, record_end, record_data in records]
+        return records
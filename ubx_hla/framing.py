@@ -0,0 +1,41 @@
+"""
+The UBX, NMEA and RTCM3 framing rules, shared by ubx_hla.core.Decoder (the analyzer's byte-by-byte
+state machine) and ubx_hla.stream.Scanner (bytes.find and whole-message checks), so both accept
+exactly the same messages:
+  UBX:  0xB5 0x62, class, ID, a length within ubx_payload_limit of the class and ID, the payload and
+        a valid Fletcher checksum
+  NMEA: '$', up to NMEA_MAX_CHARACTERS bytes ending with the first '*' (any byte other than '*'
+        is accepted), the two upper case hex checksum characters (NMEA_HEX) and CR LF
+  RTCM: 0xD3, a length of at most RTCM_MAX_LENGTH (see rtcm_length), the payload and a valid CRC-24Q
+
+The checksums are in ubx_hla.checksums. benchmarks/golden.py check cross-checks the two framers on
+spliced and corrupted traffic (benchmarks/framing.py).
+"""
+
+from .messages import UBX_MAX_PAYLOAD, UBX_MAX_PAYLOAD_DEFAULT
+
+UBX_SYNC = b'\xb5\x62' # UBX preamble sync 1 and 2
+NMEA_START = b'$' # NMEA start delimiter
+NMEA_END = b'*' # NMEA checksum delimiter
+NMEA_TERMINATOR = b'\r\n'
+RTCM_PREAMBLE = b'\xd3'
+HEADER_BYTES = (UBX_SYNC[0], NMEA_START[0], RTCM_PREAMBLE[0]) # The bytes which can start a message
+
+NMEA_MAX_LENGTH = 82 # Maximum sentence length, including the '$' and the CR LF
+NMEA_MAX_CHARACTERS = NMEA_MAX_LENGTH - 5 # Characters after the '$', up to and including the '*'
+RTCM_MAX_LENGTH = 1023 # Maximum RTCM3 payload length (10 bits)
+
+NMEA_HEX = [b'%02X' % value for value in range(256)] # Checksum as two ASCII hex characters
+
+def ubx_payload_limit(msg_class, msg_id):
+    """
+    Return the largest valid payload length of a UBX message (see ubx_hla.messages.UBX_MAX_PAYLOAD)
+    """
+    return UBX_MAX_PAYLOAD.get((msg_class, msg_id), UBX_MAX_PAYLOAD_DEFAULT)
+
+def rtcm_length(byte1, byte2):
+    """
+    Return the RTCM3 payload length in the two bytes after the preamble. It is more than
+    RTCM_MAX_LENGTH if the 6 reserved bits are not zero
+    """
+    return (byte1 << 8) | byte2
@@ -0,0 +1,210 @@
+"""
+Message index for large capture files
+
+The capture is memory-mapped and scanned once with ubx_hla.stream. The start offset, length,
+kind (protocol and Class/ID, NMEA address or RTCM type) and checksum status of every message
+are stored in compact arrays, which are saved to a sidecar file (capture + '.idx').
+Re-opening the capture loads the sidecar instead of decoding again, giving instant random
+access, e.g. every NAV-PVT between two offsets.
+
+Usage: python -m ubx_hla.index [--rebuild] [--name NAME] [--start OFFSET] [--end OFFSET] FILE
+"""
+
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from .stream import NMEA, RTCM, UBX, Scanner, open_capture, parse_nmea, parse_rtcm, parse_ubx
+
+INDEX_MAGIC = b'UBXIDX2\n'
+INDEX_SUFFIX = '.idx'
+
+PARSERS = {
+    UBX: parse_ubx,
+    NMEA: parse_nmea,
+    RTCM: parse_rtcm,
+}
+
+class MessageIndex:
+    """
+    Index of the messages in a capture file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = open_capture(path)
+        self.view = memoryview(self.data)
+        self.offsets = array('Q') # Start offset of each message, in file order
+        self.lengths = array('I') # Length of each message, including header and checksum
+        self.kinds = array('I') # Index into self.kind_table. Noise can make many kinds of invalid message
+        self.valid = array('B') # 1 if the checksum is valid
+        self.kind_table = [] # (protocol, ident, name) of each kind of message
+        self.kind_numbers = {} # (protocol, ident) to kind number
+
+    @classmethod
+    def open(cls, path, rebuild=False):
+        """
+        Open a capture, loading its index from the sidecar file if it is up to date.
+        Otherwise build the index and save the sidecar.
+        """
+        index = cls(path)
+        if rebuild or not index.load():
+            index.build()
+            index.save()
+        return index
+
+    @property
+    def sidecar(self):
+        return self.path + INDEX_SUFFIX
+
+    def capture_stamp(self):
+        """
+        The capture size and modification time. The sidecar is stale if these change
+        """
+        stat = os.stat(self.path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def columns(self):
+        """
+        The index arrays, in the order they are saved
+        """
+        return (self.offsets, self.lengths, self.kinds, self.valid)
+
+    def kind_number(self, protocol, ident, name):
+        number = self.kind_numbers.get((protocol, ident))
+        if number is None:
+            number = len(self.kind_table)
+            self.kind_table.append((protocol, ident, name))
+            self.kind_numbers[protocol, ident] = number
+        return number
+
+    def build(self):
+        """
+        Scan the capture and fill the index arrays
+        """
+        offsets = self.offsets
+        lengths = self.lengths
+        kinds = self.kinds
+        valid = self.valid
+        kind_numbers = self.kind_numbers
+        for message in Scanner(include_invalid=True).scan(self.data):
+            kind = kind_numbers.get((message.protocol, message.ident))
+            if kind is None:
+                kind = self.kind_number(message.protocol, message.ident, message.name)
+            offsets.append(message.offset)
+            lengths.append(message.length)
+            kinds.append(kind)
+            valid.append(message.valid)
+
+    def save(self):
+        """
+        Write the index to the sidecar file
+        """
+        header = json.dumps({
+            'capture': self.capture_stamp(),
+            'byteorder': sys.byteorder,
+            'count': len(self.offsets),
+            'itemsizes': [column.itemsize for column in self.columns()],
+            'kinds': [[protocol, list(ident) if isinstance(ident, tuple) else ident, name]
+                      for protocol, ident, name in self.kind_table],
+        }).encode()
+        with open(self.sidecar, 'wb') as sidecar:
+            sidecar.write(INDEX_MAGIC)
+            sidecar.write(struct.pack('<I', len(header)))
+            sidecar.write(header)
+            for column in self.columns():
+                column.tofile(sidecar)
+
+    def load(self):
+        """
+        Load the index from the sidecar file. Return False if it is missing or stale
+        """
+        try:
+            with open(self.sidecar, 'rb') as sidecar:
+                if sidecar.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return False
+                header_length, = struct.unpack('<I', sidecar.read(4))
+                header = json.loads(sidecar.read(header_length))
+                if header['capture'] != self.capture_stamp():
+                    return False
+                count = header['count']
+                if header['itemsizes'] != [column.itemsize for column in self.columns()]:
+                    return False # Written on a platform with different C type sizes
+                for column in self.columns():
+                    del column[:]
+                    column.fromfile(sidecar, count)
+                    if header['byteorder'] != sys.byteorder:
+                        column.byteswap()
+        except (OSError, EOFError, ValueError, KeyError):
+            return False
+        self.kind_table = []
+        self.kind_numbers = {}
+        for protocol, ident, name in header['kinds']:
+            self.kind_number(protocol, tuple(ident) if isinstance(ident, list) else ident, name)
+        return True
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def kind(self, position):
+        """
+        Return the (protocol, ident, name) of the message at this position in the index
+        """
+        return self.kind_table[self.kinds[position]]
+
+    def message(self, position):
+        """
+        Return the ubx_hla.stream.Message at this position in the index, parsed from the capture
+        """
+        protocol = self.kind_table[self.kinds[position]][0]
+        return PARSERS[protocol](self.data, self.view, self.offsets[position], len(self.data))
+
+    def select(self, name=None, protocol=None, ident=None, start=0, end=None, include_invalid=False):
+        """
+        Return the positions in the index of the messages which start at or after offset start,
+        and before offset end, and which match name (e.g. "NAV-PVT"), protocol and ident
+        (e.g. (0x01, 0x07) or 1077) if given
+        """
+        low = bisect_left(self.offsets, start)
+        high = len(self.offsets) if end is None else bisect_left(self.offsets, end)
+        wanted = set(number for number, (kind_protocol, kind_ident, kind_name) in enumerate(self.kind_table)
+                     if (name is None or kind_name == name)
+                     and (protocol is None or kind_protocol == protocol)
+                     and (ident is None or kind_ident == ident))
+        kinds = self.kinds
+        valid = self.valid
+        if len(wanted) == len(self.kind_table) and include_invalid:
+            return list(range(low, high))
+        return [position for position in range(low, high)
+                if kinds[position] in wanted and (include_invalid or valid[position])]
+
+    def messages(self, **criteria):
+        """
+        Yield the ubx_hla.stream.Message for each message matched by select(**criteria)
+        """
+        for position in self.select(**criteria):
+            yield self.message(position)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Index a capture file and list the messages in it')
+    parser.add_argument('file', help='capture file')
+    parser.add_argument('--rebuild', action='store_true', help='ignore any existing index')
+    parser.add_argument('--name', help='only list messages with this name, e.g. NAV-PVT, GNGGA or "RTCM 1077"')
+    parser.add_argument('--start', type=lambda x: int(x, 0), default=0, help='first offset')
+    parser.add_argument('--end', type=lambda x: int(x, 0), default=None, help='last offset (exclusive)')
+    parser.add_argument('--invalid', action='store_true', help='also list messages with a bad checksum')
+    args = parser.parse_args(argv)
+
+    index = MessageIndex.open(args.file, rebuild=args.rebuild)
+    for position in index.select(name=args.name, start=args.start, end=args.end, include_invalid=args.invalid):
+        protocol, ident, name = index.kind(position)
+        print('{:>12} {:<4} {:<20} {:>5} {}'.format(index.offsets[position], protocol, name, index.lengths[position],
+                                                   'OK' if index.valid[position] else 'BAD CHECKSUM'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Decoder instrumentation: the bytes, output frames and decode time of each decode state and of each
+message type (e.g. NAV-PVT, RTCM 1077, GNGSV), and the bytes and time of the UBX payload decoder of
+each message type
+
+Instrumentation is chosen when the Decoder is created. It installs wrappers for decode_many,
+decode_byte, decode_frame and the UBX payload decoders on the decoder instances, so a decoder without
+instrumentation runs exactly the same code as before. The bytes and time of a decode_many or
+decode_byte call are counted against the state the decoder was in when it started, and with the
+frames it returns against the message the bytes belong to. Bytes between messages are counted as
+'(between messages)'. A frame which is held in pending until its message is complete is tagged with
+the state it was decoded in, and is counted against that state when it is returned. Decoding in runs
+of many bytes (decode_many) is instrumented per run, not per byte, so a run is counted against the
+state it started in. Logic2 gives the analyzer one byte at a time (decode_byte).
+
+The UBX payload decoders (analyze_fields and the decoders of UBX_DECODERS and UBX_BLOCKS, or
+field_values in per-message mode) are timed on their own, per UBX class and ID, so the cost of a
+message's field decoding can be told apart from the framing around it.
+
+The counters can be read with report(), and are summarised in an 'instrumentation' frame every
+interval seconds of capture time. The frame goes in the first gap between messages after that
+(Decoder.report_span), so it does not overlap the frames of a message.
+"""
+
+from collections import defaultdict
+from time import perf_counter
+
+BETWEEN_MESSAGES = '(between messages)'
+
+def state_names(decoder_class):
+    """
+    The names of the decode states, keyed by value
+    """
+    return {value: name for name, value in vars(decoder_class).items()
+            if name.startswith(('looking_for_', 'processing_')) or name == 'sync_lost'}
+
+class Instrumentation:
+    """
+    Counters shared by the contexts (I2C addresses, SPI channels) of a decoder.
+    State counters are lists: [bytes, frames, seconds]. Message counters are [bytes, frames, seconds, messages].
+    UBX payload decoder counters, keyed by (class, ID), are [bytes, seconds]
+    """
+
+    def __init__(self, decoder, interval):
+        self.names = state_names(type(decoder))
+        self.states = defaultdict(lambda: [0, 0, 0.0])
+        self.messages = defaultdict(lambda: [0, 0, 0.0, 0])
+        self.ubx_decoders = defaultdict(lambda: [0, 0.0])
+        self.ubx_id = decoder.UBX_ID
+        self.interval = decoder.time_delta(interval)
+        self.next_summary = None  # Capture time of the next summary frame
+
+        cls = type(decoder)
+        self.idle = (cls.looking_for_B5_dollar_D3, cls.sync_lost)
+        self.ubx_states = range(cls.looking_for_sync_2, cls.looking_for_checksum_B + 1)
+        self.ubx_named_states = range(cls.looking_for_length_LSB, cls.looking_for_checksum_B + 1)  # Class and ID known
+        self.nmea_states = range(cls.looking_for_asterix, cls.looking_for_term2 + 1)
+        self.nmea_named_states = range(cls.looking_for_csum1, cls.looking_for_term2 + 1)  # Sentence complete
+        self.rtcm_named_states = range(cls.processing_RTCM_payload, cls.looking_for_RTCM_csum3 + 1)  # Type known
+
+    def message_name(self, context, state):
+        """
+        The name of the message the context was decoding, from the state of its last byte
+        """
+        if state in self.ubx_states:
+            if state not in self.ubx_named_states:
+                return 'UBX'
+            return self.ubx_name((context.msg_class, context.ID))
+        if state in self.nmea_states:
+            if state not in self.nmea_named_states:
+                return 'NMEA'
+            return bytes(context.sentence).split(b',')[0].rstrip(b'*').decode('latin-1')
+        if state in self.rtcm_named_states:
+            return 'RTCM {}'.format(context.rtcm_type)
+        return 'RTCM'
+
+    def ubx_name(self, key):
+        names = self.ubx_id.get(key)
+        if names is None:
+            return 'UBX 0x{:02X} 0x{:02X}'.format(*key)
+        return '-'.join(names)
+
+    def install(self, decoder, contexts):
+        """
+        Instrument decoder.decode_frame, and the decode_many, decode_byte and UBX payload decoders of each context
+        """
+        for context in contexts:
+            context.decode_many, context.decode_byte = self.instrumented_decoders(context)
+            for key, ubx_decoder in context.ubx_decoders.items():
+                context.ubx_decoders[key] = self.timed_ubx_decoder(context, ubx_decoder)
+            context.analyze_fields = self.timed_ubx_decoder(context, context.analyze_fields)
+            context.field_values = self.timed_field_values(context)
+        decoder.decode_frame = self.instrumented_decode_frame(decoder)
+
+    def timed_ubx_decoder(self, context, ubx_decoder):
+        counters = self.ubx_decoders
+
+        def timed(index, value, start_time, end_time):
+            if context.ubx_decoder is not timed:  # Called by the payload decoder of the message, which is timed
+                return ubx_decoder(index, value, start_time, end_time)
+            start = perf_counter()
+            result = ubx_decoder(index, value, start_time, end_time)
+            elapsed = perf_counter() - start
+            decoder_counters = counters[context.msg_class, context.ID]
+            decoder_counters[0] += 1
+            decoder_counters[1] += elapsed
+            return result
+
+        return timed
+
+    def timed_field_values(self, context):
+        field_values = context.field_values
+        counters = self.ubx_decoders
+
+        def timed():
+            start = perf_counter()
+            values = field_values()
+            elapsed = perf_counter() - start
+            decoder_counters = counters[context.msg_class, context.ID]
+            decoder_counters[0] += len(context.payload)
+            decoder_counters[1] += elapsed
+            return values
+
+        return timed
+
+    def instrumented_decoders(self, context):
+        """
+        Return instrumented versions of context.decode_many and context.decode_byte. decode_byte passes
+        some bytes on to decode_many: those are only counted once, by decode_byte
+        """
+        decode_many = context.decode_many
+        decode_byte = context.decode_byte
+        states = self.states
+        messages = self.messages
+        idle = self.idle
+        message = [0, 0, 0.0]  # The counters of the message in progress
+        held = {}  # The state each record held in context.pending was decoded in, keyed by id(record)
+        running = []  # Not empty during an instrumented call
+
+        def instrumented_many(values, timestamps):
+            if running:
+                return decode_many(values, timestamps)
+            state = context.decode_state
+            running.append(state)
+            start = perf_counter()
+            try:
+                records = decode_many(values, timestamps)
+            finally:
+                running.pop()
+            return count(state, len(values), records, perf_counter() - start)
+
+        def instrumented_byte(value, start_time, end_time):
+            state = context.decode_state
+            running.append(state)
+            start = perf_counter()
+            try:
+                records = decode_byte(value, start_time, end_time)
+            finally:
+                running.pop()
+            return count(state, 1, records, perf_counter() - start)
+
+        def count(state, size, records, elapsed):
+            counters = states[state]
+            counters[0] += size
+            counters[2] += elapsed
+            if held:
+                for record in records:
+                    states[held.get(id(record), state)][1] += 1
+                held_now = {id(record): held.get(id(record), state) for record in context.pending}
+                held.clear()
+                held.update(held_now)
+            else:
+                counters[1] += len(records)
+                for record in context.pending:
+                    held[id(record)] = state
+
+            if state in idle:
+                if context.decode_state in idle:
+                    counters = messages[BETWEEN_MESSAGES]
+                    counters[0] += size
+                    counters[1] += len(records)
+                    counters[2] += elapsed
+                    return records
+                message[:] = 0, 0, 0.0  # A message has started
+            message[0] += size
+            message[1] += len(records)
+            message[2] += elapsed
+            if context.decode_state in idle:  # The message is complete, or has failed
+                counters = messages[self.message_name(context, state)]
+                counters[0] += message[0]
+                counters[1] += message[1]
+                counters[2] += message[2]
+                counters[3] += 1
+            return records
+
+        return instrumented_many, instrumented_byte
+
+    def instrumented_decode_frame(self, decoder):
+        decode_frame = decoder.decode_frame
+
+        def instrumented(frame_type, data, start_time, end_time):
+            if self.next_summary is None:
+                self.next_summary = start_time + self.interval
+            elif start_time >= self.next_summary:
+                span = decoder.report_span(start_time)  # In the first gap between messages
+                if span is not None:
+                    self.next_summary = start_time + self.interval
+                    report = ('instrumentation', span[0], span[1], self.summary())
+                    return [report] + decode_frame(frame_type, data, start_time, end_time)
+            return decode_frame(frame_type, data, start_time, end_time)
+
+        return instrumented
+
+    def report(self):
+        """
+        The counters, as dictionaries keyed by state name, message name and UBX message name
+        """
+        return {
+            'states': {self.names.get(state, str(state)): {'bytes': counters[0], 'frames': counters[1],
+                                                            'seconds': round(counters[2], 6)}
+                       for state, counters in sorted(self.states.items())},
+            'messages': {name: {'count': counters[3], 'bytes': counters[0], 'frames': counters[1],
+                                'seconds': round(counters[2], 6)}
+                         for name, counters in sorted(self.messages.items(), key=lambda item: -item[1][2])},
+            'ubx_decoders': {self.ubx_name(key): {'bytes': counters[0], 'seconds': round(counters[1], 6)}
+                             for key, counters in sorted(self.ubx_decoders.items(), key=lambda item: -item[1][1])},
+        }
+
+    def summary(self, top=5):
+        """
+        The data of an 'instrumentation' frame: totals, and the message types which took the most time
+        """
+        total_bytes = sum(counters[0] for counters in self.states.values())
+        total_seconds = sum(counters[2] for counters in self.states.values())
+        busiest = sorted(self.messages.items(), key=lambda item: -item[1][2])[:top]
+        return {
+            'bytes': total_bytes,
+            'frames': sum(counters[1] for counters in self.messages.values()),  # Of the messages completed
+            'seconds': round(total_seconds, 6),
+            'summary': ', '.join('{} {:.0%}'.format(name, counters[2] / total_seconds)
+                                 for name, counters in busiest) if total_seconds else '',
+        }
@@ -0,0 +1,387 @@
+"""
+UBX message Class and ID names
+"""
+
+# UBX Class (Numerical order)
+UBX_CLASS = {
+    0x01: "NAV",
+    0x02: "RXM",
+    0x04: "INF",
+    0x05: "ACK",
+    0x06: "CFG",
+    0x09: "UPD",
+    0x0a: "MON",
+    0x0b: "AID",
+    0x0c: "DBG",
+    0x0d: "TIM",
+    0x10: "ESF",
+    0x13: "MGA",
+    0x21: "LOG",
+    0x27: "SEC",
+    0x28: "HNR",
+    0x29: "NAV2",
+    0xF0: "NMEA",
+    0xF1: "PUBX",
+    0xF4: "RTCM2",
+    0xF5: "RTCM3",
+    0xF6: "SPARTN",
+    0xF7: "NMEA-NAV2"
+}
+
+# UBX ID (Alphabetical order - as per the interface description)
+UBX_ID = {
+    # ACK
+    (0x05, 0x01): ("ACK", "ACK"),
+    (0x05, 0x00): ("ACK", "NACK"),
+    # CFG
+    (0x06, 0x13): ("CFG", "ANT"),
+    (0x06, 0x93): ("CFG", "BATCH"),
+    (0x06, 0x09): ("CFG", "CFG"),
+    (0x06, 0x06): ("CFG", "DAT"),
+    (0x06, 0x70): ("CFG", "DGNSS"),
+    (0x06, 0x4c): ("CFG", "ESFA"),
+    (0x06, 0x56): ("CFG", "ESFALG"),
+    (0x06, 0x4d): ("CFG", "ESFG"),
+    (0x06, 0x69): ("CFG", "GEOFENCE"),
+    (0x06, 0x3e): ("CFG", "GNSS"),
+    (0x06, 0x5c): ("CFG", "HNR"),
+    (0x06, 0x02): ("CFG", "INF"),
+    (0x06, 0x39): ("CFG", "ITFM"),
+    (0x06, 0x47): ("CFG", "LOGFILTER"),
+    (0x06, 0x01): ("CFG", "MSG"),
+    (0x06, 0x24): ("CFG", "NAV5"),
+    (0x06, 0x23): ("CFG", "NAVX5"),
+    (0x06, 0x17): ("CFG", "NMEA"),
+    (0x06, 0x1e): ("CFG", "ODO"),
+    (0x06, 0x3b): ("CFG", "PM2"),
+    (0x06, 0x86): ("CFG", "PMS"),
+    (0x06, 0x00): ("CFG", "PRT"),
+    (0x06, 0x57): ("CFG", "PWR"),
+    (0x06, 0x08): ("CFG", "RATE"),
+    (0x06, 0x34): ("CFG", "RINV"),  # poll contents of remote inventory
+    (0x06, 0x04): ("CFG", "RST"),
+    (0x06, 0x16): ("CFG", "SBAS"),
+    (0x06, 0x71): ("CFG", "TMODE3"),
+    (0x06, 0x31): ("CFG", "TP5"),
+    (0x06, 0x1b): ("CFG", "USB"),
+    (0x06, 0x8c): ("CFG", "VALDEL"),
+    (0x06, 0x8b): ("CFG", "VALGET"),
+    (0x06, 0x8a): ("CFG", "VALSET"),
+    # ESF
+    (0x10, 0x14): ("ESF", "ALG"),
+    (0x10, 0x15): ("ESF", "INS"),
+    (0x10, 0x02): ("ESF", "MEAS"),
+    (0x10, 0x03): ("ESF", "RAW"),
+    (0x10, 0x13): ("ESF", "RESETALG"),
+    (0x10, 0x10): ("ESF", "STATUS"),
+    # HNR
+    (0x28, 0x01): ("HNR", "ATT"),
+    (0x28, 0x02): ("HNR", "INS"),
+    (0x28, 0x00): ("HNR", "PVT"),
+    # INF
+    (0x04, 0x04): ("INF", "DEBUG"),
+    (0x04, 0x00): ("INF", "ERROR"),
+    (0x04, 0x02): ("INF", "NOTICE"),
+    (0x04, 0x03): ("INF", "TEST"),
+    (0x04, 0x01): ("INF", "WARNING"),
+    # LOG
+    (0x21, 0x07): ("LOG", "CREATE"),
+    (0x21, 0x03): ("LOG", "ERASE"),
+    (0x21, 0x0e): ("LOG", "FINDTIME"),
+    (0x21, 0x08): ("LOG", "INFO"),
+    (0x21, 0x09): ("LOG", "RETRIEVE"),
+    (0x21, 0x0b): ("LOG", "RETRIEVEPOS"),
+    (0x21, 0x0f): ("LOG", "RETRIEVEPOSEXTRA"),
+    (0x21, 0x0d): ("LOG", "RETRIEVESTRING"),
+    (0x21, 0x04): ("LOG", "STRING"),
+    # MGA
+    (0x13, 0x60): ("MGA", "ACK"),
+    (0x13, 0x20): ("MGA", "ANO"),
+    (0x13, 0x03): ("MGA", "BDS"),
+    (0x13, 0x80): ("MGA", "DBD"),
+    (0x13, 0x21): ("MGA", "FLASH"),
+    (0x13, 0x02): ("MGA", "GAL"),
+    (0x13, 0x06): ("MGA", "GLO"),
+    (0x13, 0x00): ("MGA", "GPS"),
+    (0x13, 0x40): ("MGA", "INI"),
+    (0x13, 0x05): ("MGA", "QZSS"),
+    # MON
+    (0x0a, 0x36): ("MON", "COMMS"),
+    (0x0a, 0x28): ("MON", "GNSS"),
+    (0x0a, 0x09): ("MON", "HW"),
+    (0x0a, 0x0b): ("MON", "HW2"),
+    (0x0a, 0x37): ("MON", "HW3"),
+    (0x0a, 0x02): ("MON", "IO"),
+    (0x0a, 0x06): ("MON", "MSGPP"),
+    (0x0a, 0x27): ("MON", "PATCH"),
+    (0x0a, 0x35): ("MON", "PMP"),
+    (0x0a, 0x2b): ("MON", "PT2"),
+    (0x0a, 0x38): ("MON", "RF"),
+    (0x0a, 0x07): ("MON", "RXBUF"),
+    (0x0a, 0x21): ("MON", "RXR"),
+    (0x0a, 0x2e): ("MON", "SMGR"),
+    (0x0a, 0x31): ("MON", "SPAN"),
+    (0x0a, 0x39): ("MON", "SYS"),
+    (0x0a, 0x0e): ("MON", "TEMP"),
+    (0x0a, 0x08): ("MON", "TXBUF"),
+    (0x0a, 0x04): ("MON", "VER"),
+    # NAV
+    (0x01, 0x05): ("NAV", "ATT"),
+    (0x01, 0x60): ("NAV", "AOPSTATUS"),
+    (0x01, 0x22): ("NAV", "CLOCK"),
+    (0x01, 0x36): ("NAV", "COV"),
+    (0x01, 0x31): ("NAV", "DGPS"),
+    (0x01, 0x04): ("NAV", "DOP"),
+    (0x01, 0x3d): ("NAV", "EELL"),
+    (0x01, 0x61): ("NAV", "EOE"),
+    (0x01, 0x39): ("NAV", "GEOFENCE"),
+    (0x01, 0x37): ("NAV", "HNR"),
+    (0x01, 0x13): ("NAV", "HPPOSECEF"),
+    (0x01, 0x14): ("NAV", "HPPOSLLH"),
+    (0x01, 0x28): ("NAV", "NMI"),
+    (0x01, 0x09): ("NAV", "ODO"),
+    (0x01, 0x34): ("NAV", "ORB"),
+    (0x01, 0x62): ("NAV", "PL"),
+    (0x01, 0x01): ("NAV", "POSECEF"),
+    (0x01, 0x02): ("NAV", "POSLLH"),
+    (0x01, 0x17): ("NAV", "PVAT"),
+    (0x01, 0x07): ("NAV", "PVT"),
+    (0x01, 0x3C): ("NAV", "RELPOSNED"),
+    (0x01, 0x10): ("NAV", "RESETODO"),
+    (0x01, 0x35): ("NAV", "SAT"),
+    (0x01, 0x32): ("NAV", "SBAS"),
+    (0x01, 0x43): ("NAV", "SIG"),
+    (0x01, 0x42): ("NAV", "SLAS"),
+    (0x01, 0x06): ("NAV", "SOL"),
+    (0x01, 0x03): ("NAV", "STATUS"),
+    (0x01, 0x3B): ("NAV", "SVIN"),
+    (0x01, 0x30): ("NAV", "SVINFO"),
+    (0x01, 0x24): ("NAV", "TIMEBDS"),
+    (0x01, 0x25): ("NAV", "TIMEGAL"),
+    (0x01, 0x23): ("NAV", "TIMEGLO"),
+    (0x01, 0x20): ("NAV", "TIMEGPS"),
+    (0x01, 0x26): ("NAV", "TIMELS"),
+    (0x01, 0x21): ("NAV", "TIMEUTC"),
+    (0x01, 0x63): ("NAV", "TIMENAVIC"),
+    (0x01, 0x27): ("NAV", "TIMEQZSS"),
+    (0x01, 0x64): ("NAV", "TIMETRUSTED"),
+    (0x01, 0x11): ("NAV", "VELECEF"),
+    (0x01, 0x12): ("NAV", "VELNED"),
+    # NAV2
+    (0x29, 0x22): ("NAV2", "CLOCK"),
+    (0x29, 0x36): ("NAV2", "COV"),
+    (0x29, 0x31): ("NAV2", "DGPS"),
+    (0x29, 0x04): ("NAV2", "DOP"),
+    (0x29, 0x61): ("NAV2", "EOE"),
+    (0x29, 0x3d): ("NAV2", "EELL"),
+    (0x29, 0x09): ("NAV2", "ODO"),
+    (0x29, 0x01): ("NAV2", "POSECEF"),
+    (0x29, 0x02): ("NAV2", "POSLLH"),
+    (0x29, 0x17): ("NAV2", "PVAT"),
+    (0x29, 0x07): ("NAV2", "PVT"),
+    (0x29, 0x35): ("NAV2", "SAT"),
+    (0x29, 0x32): ("NAV2", "SBAS"),
+    (0x29, 0x43): ("NAV2", "SIG"),
+    (0x29, 0x42): ("NAV2", "SLAS"),
+    (0x29, 0x03): ("NAV2", "STATUS"),
+    (0x29, 0x3b): ("NAV2", "SVIN"),
+    (0x29, 0x24): ("NAV2", "TIMEBDS"),
+    (0x29, 0x25): ("NAV2", "TIMEGAL"),
+    (0x29, 0x23): ("NAV2", "TIMEGLO"),
+    (0x29, 0x20): ("NAV2", "TIMEGPS"),
+    (0x29, 0x26): ("NAV2", "TIMELS"),
+    (0x29, 0x63): ("NAV2", "TIMENAVIC"),
+    (0x29, 0x21): ("NAV2", "TIMEUTC"),
+    (0x29, 0x27): ("NAV2", "TIMEQZSS"),
+    (0x29, 0x11): ("NAV2", "VELECEF"),
+    (0x29, 0x12): ("NAV2", "VELNED"),
+    # RXM
+    (0x02, 0x34): ("RXM", "COR"),
+    (0x02, 0x84): ("RXM", "MEAS20"),
+    (0x02, 0x86): ("RXM", "MEAS50"),
+    (0x02, 0x82): ("RXM", "MEASC12"),
+    (0x02, 0x80): ("RXM", "MEASD12"),
+    (0x02, 0x14): ("RXM", "MEASX"),
+    (0x02, 0x72): ("RXM", "PMP"),
+    (0x02, 0x41): ("RXM", "PMREQ"),
+    (0x02, 0x73): ("RXM", "QZSSL6"),
+    (0x02, 0x15): ("RXM", "RAWX"),
+    (0x02, 0x59): ("RXM", "RLM"),
+    (0x02, 0x32): ("RXM", "RTCM"),
+    (0x02, 0x13): ("RXM", "SFRBX"),
+    (0x02, 0x33): ("RXM", "SPARTN"),
+    (0x02, 0x36): ("RXM", "SPARTNKEY"),
+    # SEC
+    (0x27, 0x04): ("SEC", "ECSIGN"),
+    (0x27, 0x0A): ("SEC", "OSNMA"),
+    (0x27, 0x05): ("SEC", "SESSID"),
+    (0x27, 0x09): ("SEC", "SIG"),
+    (0x27, 0x10): ("SEC", "SIGLOG"),
+    (0x27, 0x01): ("SEC", "SIGN"),
+    (0x27, 0x03): ("SEC", "UNIQID"),
+    # TIM
+    (0x0d, 0x11): ("TIM", "DOSC"),
+    (0x0d, 0x16): ("TIM", "FCHG"),
+    (0x0d, 0x17): ("TIM", "HOC"),
+    (0x0d, 0x13): ("TIM", "SMEAS"),
+    (0x0d, 0x04): ("TIM", "SVIN"),
+    (0x0d, 0x05): ("TIM", "SYNC"),
+    (0x0d, 0x03): ("TIM", "TM2"),
+    (0x0d, 0x12): ("TIM", "TOS"),
+    (0x0d, 0x01): ("TIM", "TP"),
+    (0x0d, 0x15): ("TIM", "VCOCAL"),
+    (0x0d, 0x06): ("TIM", "VRFY"),
+    # UPD
+    (0x09, 0x14): ("UPD", "SOS" )
+}
+
+# Reverse lookups: name to UBX Class, and (Class name, ID name) to (Class, ID)
+UBX_CLASS_BY_NAME = {class_name: msg_class for msg_class, class_name in UBX_CLASS.items()}
+UBX_ID_BY_NAME = {names: class_and_id for class_and_id, names in UBX_ID.items()}
+
+# Maximum payload lengths, from the u-blox interface descriptions. The largest of all versions
+# and protocol generations. Messages with a repeated block use the largest possible block count
+# (N is a U1 for all of these). Messages which are not listed are limited to UBX_MAX_PAYLOAD_DEFAULT
+def repeated(header, block, count=255):
+    return header + block * count
+
+UBX_MAX_PAYLOAD_BY_NAME = {
+    # ACK
+    ("ACK", "ACK"): 2,
+    ("ACK", "NACK"): 2,
+    # CFG
+    ("CFG", "ANT"): 4,
+    ("CFG", "BATCH"): 8,
+    ("CFG", "CFG"): 13,
+    ("CFG", "DAT"): 52,
+    ("CFG", "DGNSS"): 4,
+    ("CFG", "ESFALG"): 12,
+    ("CFG", "GEOFENCE"): repeated(8, 12, 4),
+    ("CFG", "HNR"): 4,
+    ("CFG", "ITFM"): 8,
+    ("CFG", "LOGFILTER"): 12,
+    ("CFG", "MSG"): 8,
+    ("CFG", "NAV5"): 36,
+    ("CFG", "NAVX5"): 44,
+    ("CFG", "NMEA"): 20,
+    ("CFG", "ODO"): 20,
+    ("CFG", "PM2"): 48,
+    ("CFG", "PMS"): 8,
+    ("CFG", "PRT"): 20,
+    ("CFG", "PWR"): 8,
+    ("CFG", "RATE"): 6,
+    ("CFG", "RINV"): 31,
+    ("CFG", "RST"): 4,
+    ("CFG", "SBAS"): 8,
+    ("CFG", "TMODE3"): 40,
+    ("CFG", "TP5"): 32,
+    ("CFG", "USB"): 108,
+    ("CFG", "VALDEL"): repeated(4, 4, 64), # Up to 64 keys
+    ("CFG", "VALGET"): repeated(4, 12, 64), # Up to 64 keys and values
+    ("CFG", "VALSET"): repeated(4, 12, 64),
+    # ESF
+    ("ESF", "ALG"): 16,
+    ("ESF", "INS"): 36,
+    ("ESF", "MEAS"): repeated(8, 4, 31) + 4, # numMeas is 5 bits. Optional calibTtag
+    ("ESF", "RESETALG"): 0,
+    ("ESF", "RAW"): repeated(4, 8), # No block count. Assume 255 blocks
+    ("ESF", "STATUS"): repeated(16, 4),
+    # HNR
+    ("HNR", "ATT"): 32,
+    ("HNR", "INS"): 36,
+    ("HNR", "PVT"): 72,
+    # MON
+    ("MON", "COMMS"): repeated(8, 40),
+    ("MON", "GNSS"): 8,
+    ("MON", "HW"): 68,
+    ("MON", "HW2"): 28,
+    ("MON", "HW3"): repeated(22, 6),
+    ("MON", "MSGPP"): 120,
+    ("MON", "RF"): repeated(4, 24),
+    ("MON", "RXBUF"): 24,
+    ("MON", "RXR"): 1,
+    ("MON", "SYS"): 24,
+    ("MON", "TXBUF"): 28,
+    # NAV
+    ("NAV", "AOPSTATUS"): 16,
+    ("NAV", "ATT"): 32,
+    ("NAV", "CLOCK"): 20,
+    ("NAV", "COV"): 64,
+    ("NAV", "DGPS"): repeated(16, 12),
+    ("NAV", "DOP"): 18,
+    ("NAV", "EELL"): 16,
+    ("NAV", "EOE"): 4,
+    ("NAV", "GEOFENCE"): repeated(8, 2),
+    ("NAV", "HPPOSECEF"): 28,
+    ("NAV", "HPPOSLLH"): 36,
+    ("NAV", "ODO"): 20,
+    ("NAV", "ORB"): repeated(8, 6),
+    ("NAV", "POSECEF"): 20,
+    ("NAV", "POSLLH"): 28,
+    ("NAV", "PVAT"): 116,
+    ("NAV", "PVT"): 92,
+    ("NAV", "RELPOSNED"): 64,
+    ("NAV", "RESETODO"): 0,
+    ("NAV", "SAT"): repeated(8, 12),
+    ("NAV", "SBAS"): repeated(12, 12),
+    ("NAV", "SIG"): repeated(8, 16),
+    ("NAV", "SLAS"): repeated(20, 8),
+    ("NAV", "SOL"): 52,
+    ("NAV", "STATUS"): 16,
+    ("NAV", "SVIN"): 40,
+    ("NAV", "SVINFO"): repeated(8, 12),
+    ("NAV", "TIMEBDS"): 20,
+    ("NAV", "TIMEGAL"): 20,
+    ("NAV", "TIMEGLO"): 20,
+    ("NAV", "TIMEGPS"): 16,
+    ("NAV", "TIMELS"): 24,
+    ("NAV", "TIMENAVIC"): 20,
+    ("NAV", "TIMEQZSS"): 20,
+    ("NAV", "TIMEUTC"): 20,
+    ("NAV", "VELECEF"): 20,
+    ("NAV", "VELNED"): 36,
+    # RXM
+    ("RXM", "COR"): 12,
+    ("RXM", "MEASX"): repeated(44, 24),
+    ("RXM", "PMP"): 528,
+    ("RXM", "PMREQ"): 16,
+    ("RXM", "QZSSL6"): 264,
+    ("RXM", "RAWX"): repeated(16, 32),
+    ("RXM", "RLM"): 32,
+    ("RXM", "RTCM"): 8,
+    ("RXM", "SFRBX"): repeated(8, 4),
+    # SEC
+    ("SEC", "UNIQID"): 10,
+    # TIM
+    ("TIM", "SVIN"): 28,
+    ("TIM", "TM2"): 28,
+    ("TIM", "TOS"): 56,
+    ("TIM", "TP"): 16,
+    ("TIM", "VRFY"): 20,
+}
+# NAV2 messages have the same layout as the NAV messages with the same name
+UBX_MAX_PAYLOAD_BY_NAME.update({("NAV2", id_name): length for (class_name, id_name), length
+                                in list(UBX_MAX_PAYLOAD_BY_NAME.items())
+                                if class_name == "NAV" and ("NAV2", id_name) in UBX_ID_BY_NAME})
+
+UBX_MAX_PAYLOAD_DEFAULT = 8192 # For messages which are not listed. RXM-RAWX is at most 8176
+
+# Maximum payload length keyed by (Class, ID)
+UBX_MAX_PAYLOAD = {UBX_ID_BY_NAME[names]: length for names, length in UBX_MAX_PAYLOAD_BY_NAME.items()}
+
+UBX_NAMES = {} # Cache of ubx_name results
+
+def ubx_name(msg_class, msg_id):
+    """
+    Return the name of a UBX message, e.g. "NAV-PVT", or the Class and ID in hex if it is not known
+    """
+    name = UBX_NAMES.get((msg_class, msg_id))
+    if name is None:
+        if (msg_class, msg_id) in UBX_ID:
+            name = "-".join(UBX_ID[msg_class, msg_id])
+        elif msg_class in UBX_CLASS:
+            name = "{}-0x{:02X}".format(UBX_CLASS[msg_class], msg_id)
+        else:
+            name = "0x{:02X}-0x{:02X}".format(msg_class, msg_id)
+        UBX_NAMES[msg_class, msg_id] = name
+    return name
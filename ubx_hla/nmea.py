@@ -0,0 +1,191 @@
+"""
+NMEA 0183 sentence decoding
+
+A sentence is only split into its comma-separated fields once its checksum is valid. The talker
+(e.g. "GN") and the sentence type (e.g. "GGA") are looked up in NMEA_TALKERS and NMEA_SENTENCES.
+
+Each field is described by a tuple: (name, kind)
+  kind: 'C' text, 'U' unsigned, 'S' signed, 'R' real, 'H' hexadecimal or 'L' latitude / longitude.
+        An 'L' field is followed by its hemisphere (N, S, E or W) and is converted to signed degrees
+A name of None is a field which is not returned (e.g. the units of the GGA altitude).
+Empty fields are not returned, and nor are fields missing from the end of a sentence
+(e.g. the NMEA 4.10 system and signal IDs, which older receivers do not send).
+"""
+
+NMEA_TALKERS = {
+    'GP': 'GPS',
+    'GL': 'GLONASS',
+    'GA': 'Galileo',
+    'GB': 'BeiDou',
+    'BD': 'BeiDou',
+    'GQ': 'QZSS',
+    'GI': 'NavIC',
+    'GN': 'GNSS', # More than one GNSS
+}
+
+GGA_FIELDS = (
+    ('time', 'C'),
+    ('lat', 'L'),
+    ('lon', 'L'),
+    ('quality', 'U'),
+    ('numSV', 'U'),
+    ('HDOP', 'R'),
+    ('alt', 'R'), # Metres
+    (None, 'C'), # 'M'
+    ('sep', 'R'), # Geoid separation, metres
+    (None, 'C'), # 'M'
+    ('diffAge', 'R'),
+    ('diffStation', 'C'),
+)
+
+RMC_FIELDS = (
+    ('time', 'C'),
+    ('status', 'C'),
+    ('lat', 'L'),
+    ('lon', 'L'),
+    ('spd', 'R'), # Knots
+    ('cog', 'R'),
+    ('date', 'C'),
+    ('mv', 'R'),
+    ('mvEW', 'C'),
+    ('posMode', 'C'),
+    ('navStatus', 'C'), # NMEA 4.10
+)
+
+GSA_FIELDS = (
+    ('opMode', 'C'),
+    ('navMode', 'U'),
+) + tuple(('svid{}'.format(sv), 'U') for sv in range(1, 13)) + (
+    ('PDOP', 'R'),
+    ('HDOP', 'R'),
+    ('VDOP', 'R'),
+    ('systemId', 'H'), # NMEA 4.10, optional
+)
+
+GST_FIELDS = (
+    ('time', 'C'),
+    ('rangeRms', 'R'),
+    ('stdMajor', 'R'),
+    ('stdMinor', 'R'),
+    ('orient', 'R'),
+    ('stdLat', 'R'),
+    ('stdLong', 'R'),
+    ('stdAlt', 'R'),
+)
+
+VTG_FIELDS = (
+    ('cogt', 'R'),
+    (None, 'C'), # 'T'
+    ('cogm', 'R'),
+    (None, 'C'), # 'M'
+    ('sogn', 'R'), # Knots
+    (None, 'C'), # 'N'
+    ('sogk', 'R'), # km/h
+    (None, 'C'), # 'K'
+    ('posMode', 'C'),
+)
+
+GNS_FIELDS = (
+    ('time', 'C'),
+    ('lat', 'L'),
+    ('lon', 'L'),
+    ('posMode', 'C'),
+    ('numSV', 'U'),
+    ('HDOP', 'R'),
+    ('alt', 'R'),
+    ('sep', 'R'),
+    ('diffAge', 'R'),
+    ('diffStation', 'C'),
+    ('navStatus', 'C'), # NMEA 4.10
+)
+
+ZDA_FIELDS = (
+    ('time', 'C'),
+    ('day', 'U'),
+    ('month', 'U'),
+    ('year', 'U'),
+    ('ltzh', 'S'),
+    ('ltzn', 'U'),
+)
+
+def gsv_fields(count):
+    """
+    GSV carries one to four satellites, and (NMEA 4.10) a signal ID. count is the number of fields
+    """
+    fields = (
+        ('numMsg', 'U'),
+        ('msgNum', 'U'),
+        ('numSV', 'U'),
+    )
+    for sv in range(1, (count - 3) // 4 + 1):
+        fields += (
+            ('svid{}'.format(sv), 'U'),
+            ('elv{}'.format(sv), 'U'),
+            ('az{}'.format(sv), 'U'),
+            ('cno{}'.format(sv), 'U'),
+        )
+    return fields + (('signalId', 'H'),) # NMEA 4.10, optional
+
+# Field schemas keyed by sentence type. A function is passed the number of fields in the sentence
+NMEA_SENTENCES = {
+    'GGA': GGA_FIELDS,
+    'RMC': RMC_FIELDS,
+    'GSA': GSA_FIELDS,
+    'GSV': gsv_fields,
+    'GST': GST_FIELDS,
+    'VTG': VTG_FIELDS,
+    'GNS': GNS_FIELDS,
+    'ZDA': ZDA_FIELDS,
+}
+
+def nmea_value(kind, text, hemisphere=''):
+    """
+    Convert the text of a field. Text which cannot be converted is returned as it is
+    """
+    try:
+        if kind == 'U' or kind == 'S':
+            return int(text)
+        if kind == 'R':
+            return float(text)
+        if kind == 'H':
+            return int(text, 16)
+        if kind == 'L': # ddmm.mmmm or dddmm.mmmm
+            point = text.index('.')
+            degrees = int(text[:point - 2]) + float(text[point - 2:]) / 60
+            return round(-degrees if hemisphere in ('S', 'W') else degrees, 9)
+    except ValueError:
+        pass
+    return text
+
+def parse_sentence(sentence):
+    """
+    Split a sentence (the characters between the '$' and the '*') and decode its fields.
+    Return the talker, the sentence type and a list of the (first, last, name, value) of each field,
+    where first and last are the indices of the comma-separated fields it was decoded from
+    (the address is field 0). Return None if the talker or the sentence type is not known
+    """
+    parts = sentence.decode('latin-1').split(',')
+    address = parts[0]
+    talker = NMEA_TALKERS.get(address[:2])
+    fields = NMEA_SENTENCES.get(address[2:])
+    if talker is None or fields is None:
+        return None
+    if callable(fields):
+        fields = fields(len(parts) - 1)
+
+    decoded = []
+    index = 1
+    for name, kind in fields:
+        if index >= len(parts):
+            break
+        first = index
+        text = parts[index]
+        if kind == 'L':
+            hemisphere = parts[index + 1] if index + 1 < len(parts) else ''
+            index += 2
+        else:
+            hemisphere = ''
+            index += 1
+        if name is not None and text:
+            decoded.append((first, index - 1, name, nmea_value(kind, text, hemisphere)))
+    return talker, address[2:], decoded
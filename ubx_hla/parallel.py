@@ -0,0 +1,112 @@
+"""
+Parallel decoding of large capture files
+
+The capture is split into chunks which are scanned by a pool of processes. A message belongs
+to the chunk it starts in: a worker finishes any message which runs past the end of its chunk,
+and starts scanning from the beginning of its chunk. If the previous chunk's last message ran
+into this chunk, the two scans are resynchronised in the parent: the parent re-scans from the
+end of that message until it reaches a valid message the worker also found. From there on
+the two scans are identical, so the output is the same as single-process decoding with
+ubx_hla.stream.read_file.
+
+Usage: python -m ubx_hla.parallel [--processes N] [--chunk-mb MB] [--summary] FILE
+"""
+
+import mmap
+from collections import Counter
+from multiprocessing import Pool
+
+from .stream import NMEA, RTCM, UBX, Message, Scanner, open_capture
+
+CHUNK_SIZE = 64 << 20 # Default chunk size: 64 MiB
+
+# Payload position within each kind of message: (bytes before, bytes after)
+PAYLOAD_BOUNDS = {
+    UBX: (6, 2), # Sync chars, Class, ID and length. Checksum
+    NMEA: (1, 5), # '$'. '*', checksum and CR LF
+    RTCM: (3, 3), # Preamble and length. CRC
+}
+
+def scan_chunk(task):
+    """
+    Worker: scan the messages which start in data[start:stop].
+    Returns the messages without their payloads, and the position the scan stopped at.
+    """
+    path, start, stop, include_invalid = task
+    scanner = Scanner(include_invalid)
+    with open(path, 'rb') as capture, mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        messages = [message[:-1] for message in scanner.scan(data, start, stop=stop)]
+    return messages, scanner.position
+
+def chunk_bounds(size, chunk_size):
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+def decode_file(path, processes=None, chunk_size=CHUNK_SIZE, include_invalid=False):
+    """
+    Yield the messages in a capture file, in file order, decoding chunks in a process pool.
+    Payloads are memoryviews of the memory-mapped capture. The capture is closed when the
+    generator finishes, unless payloads are still held, in which case it closes with the last of them.
+    """
+    data = open_capture(path)
+    view = memoryview(data)
+    chunks = chunk_bounds(len(data), chunk_size)
+    tasks = [(path, start, stop, include_invalid) for start, stop in chunks]
+
+    def with_payload(fields):
+        offset, protocol, length = fields[0], fields[1], fields[4]
+        before, after = PAYLOAD_BOUNDS[protocol]
+        return Message(*fields, payload=view[offset + before:offset + length - after])
+
+    try:
+        with Pool(processes) as pool:
+            position = 0 # Where a single process scan would be now
+            for (start, stop), (messages, resume) in zip(chunks, pool.imap(scan_chunk, tasks)):
+                if position > start:
+                    # The previous chunk's last message ran into this chunk. Re-scan from its end
+                    # until we reach a valid message the worker found too
+                    worker_offsets = set(fields[0] for fields in messages if fields[5] and fields[0] >= position)
+                    scanner = Scanner(include_invalid)
+                    converged = None
+                    for message in scanner.scan(data, position, stop=stop):
+                        if message.valid and message.offset in worker_offsets:
+                            converged = message.offset
+                            break
+                        yield message
+                    if converged is None:
+                        position = scanner.position
+                        continue
+                    messages = [fields for fields in messages if fields[0] >= converged]
+                for fields in messages:
+                    yield with_payload(fields)
+                position = resume
+    finally:
+        view.release()
+        if isinstance(data, mmap.mmap): # b'' for an empty file
+            try:
+                data.close()
+            except BufferError: # Payload views are still held by the caller
+                pass
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Decode a large capture file using several processes')
+    parser.add_argument('file', help='capture file')
+    parser.add_argument('--processes', type=int, default=None, help='number of processes (default: one per CPU)')
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_SIZE / (1 << 20), help='chunk size in MiB')
+    parser.add_argument('--invalid', action='store_true', help='also show messages with a bad checksum')
+    parser.add_argument('--summary', action='store_true', help='only show the number of each message')
+    args = parser.parse_args(argv)
+
+    counts = Counter()
+    for message in decode_file(args.file, args.processes, int(args.chunk_mb * (1 << 20)), args.invalid):
+        if args.summary:
+            counts[message.name, message.valid] += 1
+        else:
+            print('{:>12} {:<4} {:<20} {:>5} {}'.format(message.offset, message.protocol, message.name,
+                                                       message.length, 'OK' if message.valid else 'BAD CHECKSUM'))
+    for (name, valid), count in sorted(counts.items()):
+        print('{:<20} {:>10}{}'.format(name, count, '' if valid else ' BAD CHECKSUM'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+RTCM3 message body decoding
+
+The payload is read MSB first by a BitReader, which is fed one byte at a time and returns the
+fields completed by each byte. Only the bits which have not been consumed yet are kept, so the
+payload is never re-scanned.
+
+Each field is described by a tuple: (name, bits, kind, scale, format)
+  bits:   the field width, or a function of the values read so far (0 skips the field)
+  kind:   'U' unsigned, 'S' signed (two's complement)
+  scale:  multiplier for the raw value, or None. A field with 0 bits and a function as its scale
+          is computed from the values read so far (e.g. a count of the bits set in a mask)
+  format: 'hex' or 'dec'
+Logic2 frame data holds 64-bit signed integers, so a field of 64 bits or more (e.g. the MSM
+satellite mask) is given to the frames as a hex string by frame_value. values keeps the int.
+A name of None is a reserved field: it is read but not returned.
+The schemas start after the 12-bit message type (DF002).
+"""
+
+def count_bits(value):
+    return bin(value).count('1')
+
+# 1005 / 1006: Stationary RTK Reference Station ARP (with Antenna Height)
+ARP_FIELDS = (
+    ('stationId', 12, 'U', None, 'dec'), # DF003
+    ('itrfYear', 6, 'U', None, 'dec'), # DF021
+    ('gps', 1, 'U', None, 'dec'), # DF022
+    ('glonass', 1, 'U', None, 'dec'), # DF023
+    ('galileo', 1, 'U', None, 'dec'), # DF024
+    ('referenceStation', 1, 'U', None, 'dec'), # DF141
+    ('ecefX', 38, 'S', 0.0001, 'dec'), # DF025, metres
+    ('singleOscillator', 1, 'U', None, 'dec'), # DF142
+    (None, 1, 'U', None, 'dec'), # DF001
+    ('ecefY', 38, 'S', 0.0001, 'dec'), # DF026, metres
+    ('quarterCycle', 2, 'U', None, 'dec'), # DF364
+    ('ecefZ', 38, 'S', 0.0001, 'dec'), # DF027, metres
+)
+
+ARP_HEIGHT_FIELDS = ARP_FIELDS + (
+    ('antennaHeight', 16, 'U', 0.0001, 'dec'), # DF028, metres
+)
+
+# MSM1 to MSM7 header. The cell mask has one bit per satellite and signal
+def msm_header_fields(epoch_fields):
+    return (
+        ('stationId', 12, 'U', None, 'dec'), # DF003
+    ) + epoch_fields + (
+        ('multipleMessage', 1, 'U', None, 'dec'), # DF393
+        ('iods', 3, 'U', None, 'dec'), # DF409
+        (None, 7, 'U', None, 'dec'), # DF001
+        ('clockSteering', 2, 'U', None, 'dec'), # DF411
+        ('externalClock', 2, 'U', None, 'dec'), # DF412
+        ('smoothing', 1, 'U', None, 'dec'), # DF417
+        ('smoothingInterval', 3, 'U', None, 'dec'), # DF418
+        ('satMask', 64, 'U', None, 'hex'), # DF394
+        ('sigMask', 32, 'U', None, 'hex'), # DF395
+        ('satellites', 0, 'U', lambda values: count_bits(values['satMask']), 'dec'),
+        ('signals', 0, 'U', lambda values: count_bits(values['sigMask']), 'dec'),
+        ('cellMask', lambda values: values['satellites'] * values['signals'], 'U', None, 'hex'), # DF396
+        ('cells', 0, 'U', lambda values: count_bits(values.get('cellMask', 0)), 'dec'), # No cell mask if either mask is 0
+    )
+
+MSM_FIELDS = msm_header_fields((
+    ('epoch', 30, 'U', None, 'dec'), # GNSS epoch time, ms
+))
+
+MSM_GLONASS_FIELDS = msm_header_fields((
+    ('day', 3, 'U', None, 'dec'), # DF416
+    ('epoch', 27, 'U', None, 'dec'), # DF034, ms
+))
+
+# 1230: GLONASS L1 and L2 Code-Phase Biases. A bias is only present if its signal mask bit is set
+def glonass_bias(mask_bit):
+    return lambda values: 16 if values['signalMask'] & mask_bit else 0
+
+GLONASS_BIAS_FIELDS = (
+    ('stationId', 12, 'U', None, 'dec'), # DF003
+    ('biasIndicator', 1, 'U', None, 'dec'), # DF421
+    (None, 3, 'U', None, 'dec'), # DF001
+    ('signalMask', 4, 'U', None, 'hex'), # DF422
+    ('L1CA', glonass_bias(8), 'S', 0.02, 'dec'), # DF423, metres
+    ('L1P', glonass_bias(4), 'S', 0.02, 'dec'), # DF424, metres
+    ('L2CA', glonass_bias(2), 'S', 0.02, 'dec'), # DF425, metres
+    ('L2P', glonass_bias(1), 'S', 0.02, 'dec'), # DF426, metres
+)
+
+RTCM_FIELDS = {
+    1005: ARP_FIELDS,
+    1006: ARP_HEIGHT_FIELDS,
+    1230: GLONASS_BIAS_FIELDS,
+}
+for msm_base in (1070, 1080, 1090, 1100, 1110, 1120, 1130): # GPS, GLONASS, Galileo, SBAS, QZSS, BeiDou, NavIC
+    for msm in range(1, 8):
+        RTCM_FIELDS[msm_base + msm] = MSM_GLONASS_FIELDS if msm_base == 1080 else MSM_FIELDS
+
+class BitReader:
+    """
+    Read the fields of an RTCM3 message body from bytes fed one at a time
+    """
+
+    __slots__ = ('fields', 'position', 'bits', 'count', 'values', 'wide')
+
+    def __init__(self, fields, bits=0, count=0):
+        self.fields = fields
+        self.position = 0 # Index of the next field to be read
+        self.bits = bits # The bits which have not been consumed yet
+        self.count = count # The number of bits in self.bits
+        self.values = {} # The values of the fields read so far, keyed by name
+        self.wide = set() # The names of the fields of 64 bits or more read so far
+
+    @property
+    def finished(self):
+        return self.position >= len(self.fields)
+
+    def feed(self, value):
+        """
+        Add a byte. Return a list of the (name, value, format) of the fields it completes
+        """
+        fields = self.fields
+        if self.position >= len(fields):
+            return []
+        bits = (self.bits << 8) | value
+        count = self.count + 8
+        values = self.values
+        done = []
+        while self.position < len(fields):
+            name, width, kind, scale, fmt = fields[self.position]
+            if callable(width):
+                width = width(values)
+            if width > count:
+                break
+            self.position += 1
+            if width == 0:
+                if callable(scale): # A computed field
+                    values[name] = scale(values)
+                    done.append((name, values[name], fmt))
+                continue
+            count -= width
+            raw = bits >> count
+            bits &= (1 << count) - 1
+            if name is None:
+                continue
+            if kind == 'S' and raw >> (width - 1):
+                raw -= 1 << width
+            if scale is not None:
+                raw = round(raw * scale, 6)
+            elif width >= 64:
+                self.wide.add(name)
+            values[name] = raw
+            done.append((name, raw, fmt))
+        self.bits = bits
+        self.count = count
+        return done
+
+    def frame_value(self, name, value):
+        """
+        The value of a field in frame data: a hex string for a field of 64 bits or more
+        """
+        return hex(value) if name in self.wide else value
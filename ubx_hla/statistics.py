@@ -0,0 +1,106 @@
+"""
+Stream statistics: message rates, checksum and framing errors, and bytes lost between messages
+
+The decoder counts each valid message (by UBX class and ID, RTCM type or NMEA address) and each
+failed frame (by protocol and failure) as it completes. Every interval seconds of capture time a
+'statistics' frame shows the rates and counts since the previous one, and the counters start again,
+so the memory used does not grow with the capture. The bytes skipped while the decoder was looking
+for a header, and the messages recovered by re-scanning failed frames, come from the decoder
+contexts' bytes_skipped and frames_recovered.
+
+Statistics are chosen when the Decoder is created: decode_frame is wrapped on the decoder instance
+to emit the frames, and the counting is only done at the end of each message.
+"""
+
+PROTOCOLS = {0xB5: 'UBX', 0x24: 'NMEA', 0xD3: 'RTCM'}  # By the first byte of the frame
+
+class StreamStatistics:
+    """
+    Counters shared by the contexts (I2C addresses, SPI channels) of a decoder
+    """
+
+    def __init__(self, decoder, contexts, interval):
+        self.decoder = decoder
+        self.contexts = contexts
+        self.interval = decoder.time_delta(interval)
+        self.messages = {}  # Valid messages, keyed by ('UBX', class, ID), ('RTCM', type) or ('NMEA', address)
+        self.failures = {}  # Failed frames, keyed by (protocol, failure), e.g. ('UBX', 'INVALID CK_A')
+        self.window_start = None  # Capture time of the start of the current interval
+        self.bytes_skipped = 0  # The contexts' totals at the start of the current interval
+        self.frames_recovered = 0
+
+    def message(self, key):
+        self.messages[key] = self.messages.get(key, 0) + 1
+
+    def nmea(self, sentence):
+        """
+        Count a valid sentence. sentence runs from after the '$' up to and including the '*'
+        """
+        self.message(('NMEA', bytes(sentence).split(b',')[0].rstrip(b'*').decode('latin-1')))
+
+    def failure(self, first_byte, failure):
+        """
+        Count a failed frame. first_byte is its header byte (0xB5, '$' or 0xD3)
+        """
+        key = (PROTOCOLS.get(first_byte, '?'), failure)
+        self.failures[key] = self.failures.get(key, 0) + 1
+
+    def message_name(self, key):
+        if key[0] == 'UBX':
+            names = self.decoder.UBX_ID.get(key[1:])
+            if names is None:
+                return 'UBX 0x{:02X} 0x{:02X}'.format(*key[1:])
+            return '-'.join(names)
+        if key[0] == 'RTCM':
+            return 'RTCM {}'.format(key[1])
+        return key[1]
+
+    def install(self, decoder):
+        """
+        Emit a statistics frame from decoder.decode_frame every interval, in the first gap between
+        messages after the interval has passed (see Decoder.report_span)
+        """
+        decode_frame = decoder.decode_frame
+
+        def decode_frame_with_statistics(frame_type, data, start_time, end_time):
+            if self.window_start is None:
+                self.window_start = start_time
+            elif start_time - self.window_start >= self.interval:
+                span = decoder.report_span(start_time)
+                if span is not None:
+                    report = ('statistics', span[0], span[1], self.summary(start_time))
+                    return [report] + decode_frame(frame_type, data, start_time, end_time)
+            return decode_frame(frame_type, data, start_time, end_time)
+
+        decoder.decode_frame = decode_frame_with_statistics
+
+    def summary(self, time):
+        """
+        Return the data of a statistics frame for the interval which ends at time, and start a new interval
+        """
+        seconds = float(time - self.window_start)
+        bytes_skipped = sum(context.bytes_skipped for context in self.contexts)
+        frames_recovered = sum(context.frames_recovered for context in self.contexts)
+
+        rates = sorted(((self.message_name(key), count / seconds) for key, count in self.messages.items()),
+                       key=lambda item: -item[1])
+        failures = sorted((protocol + ' ' + failure, count) for (protocol, failure), count in self.failures.items())
+        data = {
+            'seconds': round(seconds, 6),
+            'messages': sum(self.messages.values()),
+            'errors': sum(self.failures.values()),
+            'skipped': bytes_skipped - self.bytes_skipped,
+            'recovered': frames_recovered - self.frames_recovered,
+        }
+        data.update((name + ' Hz', round(rate, 3)) for name, rate in rates)
+        data.update(failures)
+        data['summary'] = ', '.join(['{} {:.3g} Hz'.format(name, rate) for name, rate in rates]
+                                    + ['{} {}'.format(name, count) for name, count in failures]
+                                    + ['{} bytes skipped'.format(data['skipped'])])
+
+        self.messages = {}
+        self.failures = {}
+        self.window_start = time
+        self.bytes_skipped = bytes_skipped
+        self.frames_recovered = frames_recovered
+        return data
@@ -0,0 +1,273 @@
+"""
+Offline decoding of raw receiver output (u-center .ubx logs, UART dumps, ...) without Logic2
+
+The UBX, NMEA and RTCM3 start bytes (0xB5 0x62, '$' and 0xD3) are located with bytes.find,
+rather than by stepping through the Hla state machine byte by byte. Each candidate is then
+checked for a sane length (see ubx_hla.messages.UBX_MAX_PAYLOAD) and a valid checksum.
+If a candidate is not a valid message, the search continues from the byte after its start
+byte, so a real message hidden inside a corrupt one is not lost.
+
+The framing rules are in ubx_hla.framing, which ubx_hla.core.Decoder uses byte by byte, so both
+accept exactly the same messages.
+
+Usage: python -m ubx_hla.stream [--invalid] [--summary] FILE
+"""
+
+import mmap
+import sys
+from collections import Counter, namedtuple
+
+from .checksums import crc24q, nmea_checksum, ubx_checksum
+from .framing import (NMEA_END, NMEA_HEX, NMEA_MAX_CHARACTERS, NMEA_MAX_LENGTH, NMEA_START, NMEA_TERMINATOR,
+                      RTCM_MAX_LENGTH, RTCM_PREAMBLE, UBX_SYNC, rtcm_length, ubx_payload_limit)
+from .messages import ubx_name
+
+UBX = 'UBX'
+NMEA = 'NMEA'
+RTCM = 'RTCM'
+
+Message = namedtuple('Message', ['offset', 'protocol', 'ident', 'name', 'length', 'valid', 'payload'])
+Message.__doc__ = """
+A message found in a buffer of raw receiver output
+
+offset:   position of the first byte (0xB5, '$' or 0xD3) in the buffer
+protocol: UBX, NMEA or RTCM
+ident:    UBX (Class, ID), NMEA address (e.g. "GPGGA") or RTCM message type (None if the payload is too short)
+name:     e.g. "NAV-PVT", "GPGGA" or "RTCM 1077"
+length:   length of the whole message, including the header, checksum and (NMEA) CR LF
+valid:    True if the checksum is correct
+payload:  memoryview of the UBX payload, the NMEA characters between '$' and '*', or the RTCM payload
+"""
+
+INCOMPLETE = object() # Returned by the parse functions when the buffer ends part way through a candidate
+
+def parse_ubx(data, view, offset, end):
+    """
+    Parse the UBX message candidate starting at offset. Return a Message, INCOMPLETE or None
+    """
+    if offset + 6 > end:
+        return INCOMPLETE
+    msg_class = data[offset + 2]
+    msg_id = data[offset + 3]
+    length = data[offset + 4] | (data[offset + 5] << 8)
+    if length > ubx_payload_limit(msg_class, msg_id):
+        return None
+    stop = offset + 8 + length
+    if stop > end:
+        return INCOMPLETE
+    valid = ubx_checksum(view[offset + 2:stop - 2]) == (data[stop - 2], data[stop - 1])
+    return Message(offset, UBX, (msg_class, msg_id), ubx_name(msg_class, msg_id), length + 8, valid,
+                   view[offset + 6:stop - 2])
+
+def parse_nmea(data, view, offset, end):
+    """
+    Parse the NMEA sentence candidate starting at offset. Return a Message, INCOMPLETE or None
+    """
+    limit = offset + 1 + NMEA_MAX_CHARACTERS # The '*' must leave room for the checksum and CR LF
+    asterix = data.find(NMEA_END, offset + 1, min(limit, end))
+    if asterix < 0:
+        return INCOMPLETE if limit > end else None
+    if asterix + 5 > end:
+        return INCOMPLETE
+    sentence = data[offset + 1:asterix]
+    if data[asterix + 3:asterix + 5] != NMEA_TERMINATOR:
+        return None
+    valid = data[asterix + 1:asterix + 3] == NMEA_HEX[nmea_checksum(sentence)]
+    address = sentence.split(b',', 1)[0].decode('latin-1')
+    return Message(offset, NMEA, address, address, asterix + 5 - offset, valid, view[offset + 1:asterix])
+
+def parse_rtcm(data, view, offset, end):
+    """
+    Parse the RTCM3 message candidate starting at offset. Return a Message, INCOMPLETE or None
+    """
+    if offset + 3 > end:
+        return INCOMPLETE
+    length = rtcm_length(data[offset + 1], data[offset + 2])
+    if length > RTCM_MAX_LENGTH: # The 6 reserved bits are not zero
+        return None
+    stop = offset + 6 + length
+    if stop > end:
+        return INCOMPLETE
+    valid = crc24q(view[offset:stop - 3]) == int.from_bytes(view[stop - 3:stop], 'big')
+    if length >= 2:
+        msg_type = (data[offset + 3] << 4) | (data[offset + 4] >> 4)
+        name = 'RTCM {}'.format(msg_type)
+    else:
+        msg_type = None
+        name = 'RTCM'
+    return Message(offset, RTCM, msg_type, name, length + 6, valid, view[offset + 3:stop - 3])
+
+class Scanner:
+    """
+    Find the UBX, NMEA and RTCM messages in a buffer (bytes, bytearray or mmap)
+    """
+
+    def __init__(self, include_invalid=False):
+        self.include_invalid = include_invalid # Also yield messages which fail their checksum
+        self.position = 0 # Where the next scan should start
+        self.skipped = 0 # Number of bytes which were not part of a valid message
+
+    def scan(self, data, start=0, end=None, final=True, stop=None):
+        """
+        Yield the messages in data[start:end]. If final is False, stop at the first candidate
+        which runs past end - self.position is left pointing at it, ready for more data.
+        If stop is given, only messages which start before stop are yielded (they may run past it).
+        """
+        if not hasattr(data, 'find'):
+            data = bytes(data) # memoryview has no find
+        if end is None:
+            end = len(data)
+        if stop is None:
+            stop = end
+        find = data.find
+        view = memoryview(data)
+        include_invalid = self.include_invalid
+
+        pos = start
+        next_ubx = find(UBX_SYNC, pos, end)
+        next_nmea = find(NMEA_START, pos, end)
+        next_rtcm = find(RTCM_PREAMBLE, pos, end)
+        while True:
+            # Update any candidate the previous message has consumed. -1 means there are no more
+            if 0 <= next_ubx < pos:
+                next_ubx = find(UBX_SYNC, pos, end)
+            if 0 <= next_nmea < pos:
+                next_nmea = find(NMEA_START, pos, end)
+            if 0 <= next_rtcm < pos:
+                next_rtcm = find(RTCM_PREAMBLE, pos, end)
+
+            candidate = end
+            parse = None
+            if 0 <= next_ubx < candidate:
+                candidate, parse = next_ubx, parse_ubx
+            if 0 <= next_nmea < candidate:
+                candidate, parse = next_nmea, parse_nmea
+            if 0 <= next_rtcm < candidate:
+                candidate, parse = next_rtcm, parse_rtcm
+            if parse is None:
+                last = end
+                if not final and end > pos and data[end - 1] == UBX_SYNC[0]:
+                    last = end - 1 # Keep a trailing 0xB5 - it could be the start of the next UBX message
+                self.skipped += last - pos
+                pos = last
+                break
+            if candidate >= stop:
+                if stop > pos:
+                    self.skipped += stop - pos
+                    pos = stop
+                break
+
+            message = parse(data, view, candidate, end)
+            if message is INCOMPLETE:
+                if not final:
+                    self.skipped += candidate - pos
+                    pos = candidate
+                    break
+                message = None
+
+            if message is not None and message.valid:
+                self.skipped += candidate - pos
+                pos = candidate + message.length
+                yield message
+            else:
+                # Not a (valid) message. Resync from the byte after the start byte
+                self.skipped += candidate + 1 - pos
+                pos = candidate + 1
+                if message is not None and include_invalid:
+                    yield message
+
+        self.position = pos
+
+def iter_messages(data, start=0, end=None, include_invalid=False):
+    """
+    Yield the messages in a complete buffer: bytes, bytearray, memoryview or mmap
+    """
+    return Scanner(include_invalid).scan(data, start, end)
+
+def open_capture(path):
+    """
+    Memory-map a capture file, read-only. Returns b'' for an empty file
+    """
+    with open(path, 'rb') as capture:
+        try:
+            return mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Cannot map an empty file
+            return b''
+
+def read_file(path, include_invalid=False):
+    """
+    Yield the messages in a capture file. The file is memory-mapped, not read into memory
+    """
+    return iter_messages(open_capture(path), include_invalid=include_invalid)
+
+class StreamDecoder:
+    """
+    Incremental decoder for data which arrives in chunks (pipes, sockets, file objects).
+    Message offsets are relative to the first byte fed. Payloads are copies, not views.
+    """
+
+    def __init__(self, include_invalid=False):
+        self.scanner = Scanner(include_invalid)
+        self.buffer = bytearray()
+        self.offset = 0 # Stream offset of self.buffer[0]
+
+    def _scan(self, final):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        messages = [message._replace(offset=message.offset + self.offset, payload=bytes(message.payload))
+                    for message in self.scanner.scan(data, final=final)]
+        self.buffer += data[self.scanner.position:]
+        self.offset += self.scanner.position
+        return messages
+
+    def feed(self, chunk):
+        """
+        Add a chunk of data and return the list of messages which are now complete
+        """
+        self.buffer += chunk
+        return self._scan(False)
+
+    def flush(self):
+        """
+        Return any messages left in the buffer at the end of the stream
+        """
+        return self._scan(True)
+
+def read_stream(stream, chunk_size=1 << 20, include_invalid=False):
+    """
+    Yield the messages read from a binary file object
+    """
+    decoder = StreamDecoder(include_invalid)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Decode the UBX, NMEA and RTCM messages in a raw capture file')
+    parser.add_argument('file', help="capture file, or '-' for stdin")
+    parser.add_argument('--invalid', action='store_true', help='also show messages with a bad checksum')
+    parser.add_argument('--summary', action='store_true', help='only show the number of each message')
+    args = parser.parse_args(argv)
+
+    if args.file == '-':
+        messages = read_stream(sys.stdin.buffer, include_invalid=args.invalid)
+    else:
+        messages = read_file(args.file, include_invalid=args.invalid)
+
+    counts = Counter()
+    for message in messages:
+        if args.summary:
+            counts[message.name, message.valid] += 1
+        else:
+            print('{:>12} {:<4} {:<20} {:>5} {}'.format(message.offset, message.protocol, message.name,
+                                                       message.length, 'OK' if message.valid else 'BAD CHECKSUM'))
+    for (name, valid), count in sorted(counts.items()):
+        print('{:<20} {:>10}{}'.format(name, count, '' if valid else ' BAD CHECKSUM'))
+
+if __name__ == '__main__':
+    main()